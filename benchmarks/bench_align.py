@@ -0,0 +1,75 @@
+"""
+Benchmark market alignment: the old chain of outer joins vs vix_align's single pass.
+
+For each market count, builds a multi-decade history on a business-day calendar.
+Each market gets its own holidays and a staggered start, as new markets join later.
+The history is split into per-market frames, as the collector returns them, and
+then aligned both ways. The benchmark checks that both produce the same frame, and
+also times vix_align with forward fill.
+
+Usage:
+    python benchmarks/bench_align.py [--years 40] [--markets 3 10 25 50] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.join(bench_dir, '..'))
+
+import numpy as np
+import pandas as pd
+
+import vix_align
+from synthetic import synthetic_history
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - t0)
+    return min(timings), result
+
+
+def join_loop(frames):
+    """The merge loop collect_vix_data.merge_sources used before vix_align."""
+    merged_df = pd.DataFrame()
+    for df in frames.values():
+        if not df.empty:
+            if merged_df.empty:
+                merged_df = df.copy()
+            else:
+                merged_df = merged_df.join(df, how='outer')
+    return merged_df
+
+
+def market_frames(years, markets):
+    history = synthetic_history(years=years, markets=markets)
+    starts = np.linspace(0, len(history) // 2, markets).astype(int)
+    return {col: history.iloc[start:][[col]].dropna() for col, start in zip(history.columns, starts)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=int, default=40)
+    parser.add_argument('--markets', type=int, nargs='*', default=[3, 10, 25, 50])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.years} years of business days per market")
+    print(f"  {'markets':>7} {'rows':>7} {'join loop':>10} {'align':>9} {'speedup':>8} {'align+ffill':>12}  match")
+    all_match = True
+    for markets in args.markets:
+        frames = market_frames(args.years, markets)
+        join_time, joined = best_of(lambda: join_loop(frames), args.repeat)
+        align_time, aligned = best_of(lambda: vix_align.align_frames(frames), args.repeat)
+        fill_time, _ = best_of(lambda: vix_align.align_frames(frames, fill='all', limit=5), args.repeat)
+        match = aligned.equals(joined)
+        all_match &= match
+        print(f"  {markets:7d} {len(aligned):7d} {join_time * 1000:8.1f}ms {align_time * 1000:7.1f}ms "
+              f"{join_time / align_time:7.1f}x {fill_time * 1000:10.1f}ms  {'yes' if match else 'NO'}")
+    sys.exit(0 if all_match else 1)
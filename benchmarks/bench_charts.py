@@ -0,0 +1,73 @@
+"""
+Benchmark batch chart rendering (vix_charts.py): serial vs process pool.
+
+Renders the default chart set over synthetic history: every market over every window,
+plus the comparison charts. It runs in-process first, then with pools of increasing
+size. It also reports what crosses the process boundary per task (the spec) against
+pickling the dataset, and the one-off cost of a worker's matplotlib and font setup.
+Runs in a scratch directory so no stored rollups are picked up.
+
+Usage:
+    python benchmarks/bench_charts.py [--years 30] [--markets 8] [--workers 1 2 4] [--format svg]
+"""
+import argparse
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.join(bench_dir, '..'))
+
+import vix_charts
+import vix_store
+from run_benchmarks import quiet
+from synthetic import synthetic_history
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=int, default=30)
+    parser.add_argument('--markets', type=int, default=8)
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 2, 4])
+    parser.add_argument('--format', choices=['svg', 'png'], default='svg')
+    args = parser.parse_args()
+    vix_charts.chart_format = args.format
+
+    history = synthetic_history(years=args.years, markets=args.markets)
+    store = vix_store.VixStore.from_frame(history)
+    specs = vix_charts.default_specs(store.names)
+    print(f"{len(specs)} charts ({args.markets} markets x {len(vix_charts.chart_windows)} windows + comparisons), "
+          f"{len(history):,} rows, {os.cpu_count()} CPUs")
+    print(f"  per-task payload: {max(len(pickle.dumps(s)) for s in specs)} bytes (spec); "
+          f"the dataset pickled would be {len(pickle.dumps(history)):,} bytes per task")
+
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix='vix_charts_bench_')
+    try:
+        os.chdir(workdir)
+        # What one fresh worker pays before its first chart
+        snapshot = os.path.join(workdir, 'snapshot')
+        vix_charts.write_snapshot(store, snapshot)
+        probe = ("import time; t0 = time.perf_counter(); import vix_charts; "
+                 f"vix_charts._init_worker({snapshot!r}, {{}}); print(time.perf_counter() - t0)")
+        env = dict(os.environ, PYTHONPATH=os.path.join(bench_dir, '..'))
+        setup_time = float(subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, env=env,
+                                          check=True).stdout.split()[-1])
+        print(f"  worker setup (imports, fonts, mapping the snapshot): {setup_time * 1000:.0f} ms, once per worker")
+
+        serial = None
+        for workers in args.workers:
+            t0 = time.perf_counter()
+            written = quiet(vix_charts.render_batch, store, specs, os.path.join(workdir, f'charts_{workers}'), workers)
+            elapsed = time.perf_counter() - t0
+            serial = serial or elapsed
+            print(f"  {workers} worker{'s' if workers > 1 else ' '}: {elapsed:7.2f}s  ({len(written)} charts, "
+                  f"{elapsed / len(specs) * 1000:6.0f} ms/chart, {serial / elapsed:.1f}x)")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
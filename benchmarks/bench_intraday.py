@@ -0,0 +1,104 @@
+"""
+Benchmark the intraday store (vix_intraday.py) on synthetic minute-level Taiwan VIX.
+
+Generates one point per minute of the TAIFEX session (08:45-13:45) over N years of
+business days, ingests it month by month, then reports:
+disk size, the cost of a daily append, full and one-day range reads, and the same
+data loaded from CSV and built from per-row dicts for comparison.
+
+Usage:
+    python benchmarks/bench_intraday.py [--years 10] [--repeat 3]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.join(bench_dir, '..'))
+
+import numpy as np
+import pandas as pd
+
+import vix_intraday
+
+
+def minute_ticks(years, end="2025-12-31", seed=0):
+    """(int64 epoch ms, float32 values): one point per session minute, random-walk values."""
+    days = pd.bdate_range(pd.Timestamp(end) - pd.DateOffset(years=years) + pd.Timedelta(days=1), end)
+    minutes = np.arange(301, dtype=np.int64) * 60_000  # 08:45 .. 13:45 inclusive
+    opens = vix_intraday.to_epoch_ms(days + pd.Timedelta(hours=8, minutes=45))
+    ts = (opens[:, None] + minutes[None, :]).ravel()
+    rng = np.random.default_rng(seed)
+    values = 18 + np.cumsum(rng.normal(0, 0.02, len(ts)))
+    return ts, np.clip(values, 9, 80).astype(np.float32)
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - t0)
+    return min(timings), result
+
+
+def directory_bytes(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    ts, values = minute_ticks(args.years)
+    workdir = tempfile.mkdtemp(prefix='vix_intraday_bench_')
+    try:
+        store = os.path.join(workdir, 'intraday')
+        months = pd.DatetimeIndex(ts.astype('datetime64[ms]')).to_period('M').asi8
+        bounds = np.flatnonzero(np.r_[True, months[1:] != months[:-1], True])
+        day = 301
+        t0 = time.perf_counter()
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            vix_intraday.append('Taiwan_VIX_tick', ts[lo:hi - day], values[lo:hi - day], store)
+            vix_intraday.append('Taiwan_VIX_tick', ts[hi - day:hi], values[hi - day:hi], store)
+        ingest_time = time.perf_counter() - t0
+        stats = vix_intraday.stats(store)['Taiwan_VIX_tick']
+        print(f"Synthetic minutes: {args.years} years, {len(ts):,} points")
+        print(f"  store:            {directory_bytes(store) / 1024 / 1024:8.2f} MB in {stats['chunks']} chunks "
+              f"({directory_bytes(store) / len(ts):.1f} bytes/point)")
+        print(f"  ingest:           {ingest_time:8.3f} s  ({len(bounds) - 1} months, two appends each)")
+
+        # One more trading day, as the daily collector would append it
+        next_day = ts[-day:] + 7 * 24 * 3600 * 1000
+        daily_time, _ = best_of(lambda: vix_intraday.append('Taiwan_VIX_tick', next_day, values[-day:], store), 1)
+        print(f"  daily append:     {daily_time * 1000:8.2f} ms")
+
+        full_time, (read_ts, read_values) = best_of(lambda: vix_intraday.read('Taiwan_VIX_tick', directory=store),
+                                                    args.repeat)
+        assert np.array_equal(read_ts[:len(ts)], ts) and np.array_equal(read_values[:len(ts)], values)
+        last_day = pd.Timestamp(ts[-1], unit='ms', tz='UTC').tz_convert(vix_intraday.exchange_tz).date()
+        day_time, (day_ts, _) = best_of(
+            lambda: vix_intraday.read('Taiwan_VIX_tick', str(last_day), f"{last_day} 23:59", directory=store), args.repeat)
+        series_time, _ = best_of(lambda: vix_intraday.read_series('Taiwan_VIX_tick', directory=store), args.repeat)
+        print(f"  read all:         {full_time * 1000:8.2f} ms  ({read_ts.nbytes + read_values.nbytes:,} bytes in memory)")
+        print(f"  read one day:     {day_time * 1000:8.2f} ms  ({len(day_ts)} points)")
+        print(f"  read as Series:   {series_time * 1000:8.2f} ms")
+
+        # The same data as CSV text, and as one dict per row
+        csv_path = os.path.join(workdir, 'ticks.csv')
+        frame = pd.DataFrame({'Time': ts.astype('datetime64[ms]'), 'Taiwan_VIX': values.astype(np.float64)})
+        frame.to_csv(csv_path, index=False)
+        csv_time, csv_df = best_of(lambda: pd.read_csv(csv_path, parse_dates=['Time']), 1)
+        rows = frame.head(len(frame) // 10).to_dict('records')
+        dict_time, dict_df = best_of(lambda: pd.DataFrame(rows).set_index('Time'), 1)
+        print(f"\n  CSV file:         {os.path.getsize(csv_path) / 1024 / 1024:8.2f} MB, read {csv_time * 1000:8.1f} ms "
+              f"({csv_df.memory_usage(deep=True).sum():,} bytes in memory)")
+        print(f"  per-row dicts:    {dict_time * 1000 * 10:8.1f} ms (extrapolated from a tenth)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
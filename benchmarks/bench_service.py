@@ -0,0 +1,136 @@
+"""
+Benchmark the local VIX HTTP service (vix_service.py) against a synthetic store.
+
+Builds a columnar store, the rollups and the regime index from synthetic history in a
+temporary directory and serves them on a random local port. It then times keep-alive
+requests per endpoint, both cold and revalidated with If-None-Match (304). Finally it
+appends a day to the store and measures how long the hot reload takes to serve it.
+Nothing touches the outside network.
+
+Usage:
+    python benchmarks/bench_service.py [--years 15] [--markets 3] [--requests 500]
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.join(bench_dir, '..'))
+
+import numpy as np
+import pandas as pd
+
+import vix_columnar
+import vix_regimes
+import vix_rollups
+import vix_service
+from run_benchmarks import quiet
+from synthetic import synthetic_history
+
+endpoints = [
+    '/latest',
+    '/asof?date={mid}',
+    '/range?start={year_ago}&end={end}',
+    '/rollups/weekly?start={start}&end={end}',
+    '/regimes?year={year}',
+]
+
+
+def serve_in_thread(service):
+    """Start the service on a free port in a background event loop; returns the port."""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    state = {}
+
+    def run():
+        asyncio.set_event_loop(loop)
+        state['server'] = loop.run_until_complete(service.start('127.0.0.1', 0))
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return state['server'].sockets[0].getsockname()[1]
+
+
+def timed_requests(conn, path, count, etag=None):
+    """Latencies (seconds) of `count` GETs on one keep-alive connection, plus the last status/ETag."""
+    headers = {'If-None-Match': etag} if etag else {}
+    latencies = []
+    for _ in range(count):
+        t0 = time.perf_counter()
+        conn.request('GET', path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - t0)
+    return np.array(latencies), response.status, response.getheader('ETag')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=int, default=15)
+    parser.add_argument('--markets', type=int, default=3)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='vix_service_bench_')
+    try:
+        history = synthetic_history(years=args.years, markets=args.markets)
+        store_dir = os.path.join(workdir, 'store')
+        rollup_dir = os.path.join(workdir, 'rollups')
+        regimes_file = os.path.join(workdir, 'regimes.json')
+        quiet(vix_columnar.write_store, history, store_dir)
+        quiet(vix_rollups.update, history, rollup_dir, full=True)
+        quiet(vix_regimes.update, history, regimes_file, full=True)
+
+        vix_service.reload_interval = 0.05
+        service = vix_service.VixService(store_dir, rollup_dir, regimes_file,
+                                         fallback_csv=os.path.join(workdir, 'missing.csv'))
+        t0 = time.perf_counter()
+        quiet(service.load)
+        print(f"Synthetic store: {args.years} years x {args.markets} markets, {len(history)} rows; "
+              f"loaded in {(time.perf_counter() - t0) * 1000:.0f} ms")
+        port = serve_in_thread(service)
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+
+        end = history.index[-1]
+        fields = {'start': history.index[0].date(), 'end': end.date(), 'year': end.year,
+                  'mid': history.index[len(history) // 2].date(),
+                  'year_ago': (end - pd.Timedelta(days=365)).date()}
+
+        print(f"\n  {'endpoint':<48} {'first':>9} {'p50':>9} {'p99':>9} {'304 p50':>9} {'bytes':>8}")
+        for template in endpoints:
+            path = template.format(**fields)
+            first, _, _ = timed_requests(conn, path, 1)
+            latencies, status, etag = timed_requests(conn, path, args.requests)
+            revalidated, status_304, _ = timed_requests(conn, path, args.requests, etag)
+            assert status == 200 and status_304 == 304, (path, status, status_304)
+            conn.request('GET', path)
+            size = len(conn.getresponse().read())
+            print(f"  {path:<48} {first[0] * 1000:7.2f}ms {np.median(latencies) * 1000:7.3f}ms "
+                  f"{np.percentile(latencies, 99) * 1000:7.3f}ms {np.median(revalidated) * 1000:7.3f}ms {size:8d}")
+
+        # Hot reload: the collector appends a day; how long until the service serves it?
+        new_day = end + pd.Timedelta(days=1)
+        row = pd.DataFrame({col: [20.0] for col in history.columns},
+                           index=pd.DatetimeIndex([new_day], name=vix_columnar.date_column))
+        t0 = time.perf_counter()
+        quiet(vix_columnar.append_rows, row, store_dir)
+        while True:
+            conn.request('GET', '/health')
+            if json.loads(conn.getresponse().read())['last'] == str(new_day.date()):
+                break
+            time.sleep(0.005)
+        print(f"\n  hot reload: new day served {(time.perf_counter() - t0) * 1000:.0f} ms after the write "
+              f"(poll interval {vix_service.reload_interval * 1000:.0f} ms)")
+        conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
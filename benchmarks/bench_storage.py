@@ -0,0 +1,127 @@
+"""
+Measure the stored-value encoding: float64 at full precision vs float32 at each
+source's declared decimals.
+
+For the real merged history (global_vix_merged.csv) and a synthetic one, writes both
+encodings and reports, for each:
+    - the columnar store and CSV export sizes;
+    - load times;
+    - the loaded frame's memory;
+    - peak traced allocations while loading.
+"before" mimics the old files: float64 arrays, and a CSV holding yfinance's float32
+closes at full repr (19.350000381469727).
+
+Usage:
+    python benchmarks/bench_storage.py [--years 50] [--markets 24] [--repeat 5]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.join(bench_dir, '..'))
+
+import numpy as np
+import pandas as pd
+
+import vix_columnar
+from synthetic import synthetic_history
+
+repo_dir = os.path.join(bench_dir, '..')
+
+
+def directory_bytes(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def timed_load(fn, repeat):
+    """(best seconds, peak traced MB of one call, result)."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return min(timings), peak, result
+
+
+def write_before(df, workdir):
+    """Old encoding: float64 store at 4 decimals, CSV of float32 noise at full repr."""
+    store = os.path.join(workdir, 'store_before')
+    dtype = vix_columnar.value_dtype
+    vix_columnar.value_dtype = np.float64
+    try:
+        vix_columnar.write_store(df, store)
+    finally:
+        vix_columnar.value_dtype = dtype
+    csv = os.path.join(workdir, 'before.csv')
+    df.astype(np.float32).astype(np.float64).to_csv(csv)
+    return store, csv
+
+
+def write_after(df, workdir):
+    store = os.path.join(workdir, 'store_after')
+    decimals = {col: 2 for col in df.columns}
+    vix_columnar.write_store(df, store, decimals)
+    csv = os.path.join(workdir, 'after.csv')
+    vix_columnar.export_csv(df, csv, decimals=decimals)
+    return store, csv
+
+
+def measure(name, df, workdir, repeat):
+    before_store, before_csv = write_before(df, workdir)
+    after_store, after_csv = write_after(df, workdir)
+
+    def read_csv_before():
+        return pd.read_csv(before_csv, index_col=vix_columnar.date_column, parse_dates=True)
+
+    def read_csv_after():
+        return vix_columnar.load_merged(directory=os.path.join(workdir, 'missing'), fallback_csv=after_csv)
+
+    rows = [
+        ('store', before_store, after_store,
+         lambda: vix_columnar.read_store(before_store), lambda: vix_columnar.read_store(after_store)),
+        ('csv', before_csv, after_csv, read_csv_before, read_csv_after),
+    ]
+    print(f"\n{name}: {len(df):,} rows x {len(df.columns)} markets")
+    print(f"  {'':<6} {'':<7} {'size':>10} {'load':>9} {'frame':>10} {'peak':>9}")
+    for label, before_path, after_path, load_before, load_after in rows:
+        for tag, path, load in (('before', before_path, load_before), ('after', after_path, load_after)):
+            size = directory_bytes(path) if os.path.isdir(path) else os.path.getsize(path)
+            seconds, peak, frame = timed_load(load, repeat)
+            print(f"  {label:<6} {tag:<7} {size / 1024:8.0f}KB {seconds * 1000:7.1f}ms "
+                  f"{frame.memory_usage(deep=True).sum() / 1024:8.0f}KB {peak:7.2f}MB")
+
+    # Same canonical values either way
+    before = vix_columnar.read_store(before_store)
+    after = vix_columnar.read_store(after_store)
+    same = np.array_equal(np.round(before.to_numpy(dtype=np.float64), 2), np.round(after.to_numpy(dtype=np.float64), 2),
+                          equal_nan=True)
+    print(f"  values equal at 2 decimals: {same}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=int, default=50)
+    parser.add_argument('--markets', type=int, default=24)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='vix_storage_bench_')
+    try:
+        real_csv = os.path.join(repo_dir, vix_columnar.csv_file)
+        if os.path.exists(real_csv):
+            real = pd.read_csv(real_csv, index_col=vix_columnar.date_column, parse_dates=True)
+            measure("Full merged history", real, workdir, args.repeat)
+        synthetic = synthetic_history(years=args.years, markets=args.markets).round(2)
+        measure(f"Synthetic {args.years} years", synthetic, workdir, args.repeat)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
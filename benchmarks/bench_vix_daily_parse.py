@@ -0,0 +1,90 @@
+"""
+Benchmark the vixDaily3M table parser: regex fast path vs the BeautifulSoup path.
+
+Parses each saved page in benchmarks/fixtures/ with both extractors and checks that
+they agree on every cell. A fixture the fast path declines (returns None) shows as
+"fallback". Then it times the alternative collector, serial vs concurrent month
+queries, against the local TAIFEX stand-in. Nothing touches the outside network.
+
+Usage:
+    python benchmarks/bench_vix_daily_parse.py [--repeat 20] [--years 3] [--latency 0.02]
+"""
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.join(bench_dir, '..'))
+
+import collect_vix_data
+import vix_cache
+import vix_http
+from collect_vix_data import extract_table_f_rows, extract_table_f_rows_soup
+from fake_sources import TaifexStandIn
+from run_benchmarks import quiet
+from synthetic import synthetic_history
+
+fixtures_dir = os.path.join(bench_dir, 'fixtures')
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - t0)
+    return min(timings), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--years', type=int, default=3, help="Months of history queried by the collector run")
+    parser.add_argument('--latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    print(f"  {'fixture':<36} {'KB':>6} {'rows':>5} {'soup':>9} {'fast':>9} {'speedup':>8}  match")
+    all_match = True
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, 'vixDaily3M_*.html'))):
+        with open(path, 'rb') as f:
+            content = f.read()
+        soup_time, soup_rows = best_of(lambda: extract_table_f_rows_soup(content), args.repeat)
+        fast_time, fast_rows = best_of(lambda: extract_table_f_rows(content), args.repeat)
+        if fast_rows is None:
+            match = 'fallback'
+        else:
+            match = 'yes' if fast_rows == soup_rows else 'NO'
+            all_match &= fast_rows == soup_rows
+        print(f"  {os.path.basename(path):<36} {len(content) / 1024:6.1f} {len(soup_rows):5d} "
+              f"{soup_time * 1000:7.2f}ms {fast_time * 1000:7.3f}ms "
+              f"{'-' if fast_rows is None else f'{soup_time / fast_time:.0f}x':>8}  {match}")
+
+    workdir = tempfile.mkdtemp(prefix='vix_daily_bench_')
+    try:
+        series = synthetic_history(years=args.years, markets=3)['Taiwan_VIX']
+        start, end = series.index[0].strftime('%Y-%m-%d'), series.index[-1].strftime('%Y-%m-%d')
+        vix_cache.cache_dir = os.path.join(workdir, 'cache')
+        vix_http.min_request_interval = 0
+        with TaifexStandIn(series, latency=args.latency) as taifex:
+            collect_vix_data.taifex_base_url = taifex.base_url
+
+            def cold_collect(workers):
+                shutil.rmtree(vix_cache.cache_dir, ignore_errors=True)
+                return quiet(collect_vix_data.collect_taiwan_vix_alternative, start, end, workers=workers)
+
+            serial_time, serial_df = best_of(lambda: cold_collect(1), 2)
+            concurrent_time, concurrent_df = best_of(lambda: cold_collect(None), 2)
+        same = serial_df.equals(concurrent_df) and len(serial_df) == len(series.dropna())
+        print(f"\n  alternative collector, {args.years} years ({len(serial_df)} rows, {args.latency * 1000:.0f} ms latency):")
+        print(f"    serial months:     {serial_time:7.3f}s")
+        print(f"    concurrent months: {concurrent_time:7.3f}s  ({serial_time / concurrent_time:.1f}x faster)")
+        print(f"    outputs match: {same}")
+        all_match &= same
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(0 if all_match else 1)
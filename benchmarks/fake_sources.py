@@ -0,0 +1,137 @@
+"""
+Local stand-ins for the external VIX sources, so benchmarks run with no outside network.
+
+- TaifexStandIn: a threaded local HTTP server serving synthetic
+  `/file/taifex/Dailydownload/vix/log2data_eng/YYYYMMnew.txt` files and the
+  `/cht/3/vixDaily3M` POST page, with optional per-request latency.
+- FakeYFinance: a drop-in for the `yfinance` module's `Ticker(...).history(...)`.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pandas as pd
+
+from synthetic import taifex_month_text, vix_daily_html
+
+
+class TaifexStandIn:
+    """Serve a Date-indexed Taiwan VIX series the way TAIFEX publishes it."""
+
+    def __init__(self, series, latency=0.0):
+        self.series = series.dropna()
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def _month(self, year, month):
+        index = self.series.index
+        return self.series[(index.year == year) & (index.month == month)]
+
+    def _make_handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=b'', content_type='text/plain'):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _count(self):
+                with stand_in._lock:
+                    stand_in.requests += 1
+                if stand_in.latency:
+                    time.sleep(stand_in.latency)
+
+            def do_GET(self):
+                self._count()
+                name = self.path.rsplit('/', 1)[-1]
+                if '/log2data_eng/' in self.path and name.endswith('new.txt') and name[:6].isdigit():
+                    month = stand_in._month(int(name[:4]), int(name[4:6]))
+                    if not month.empty:
+                        return self._send(200, taifex_month_text(month).encode('utf-8'))
+                self._send(404, b'not found')
+
+            def do_POST(self):
+                self._count()
+                length = int(self.headers.get('Content-Length', 0))
+                form = parse_qs(self.rfile.read(length).decode('utf-8'))
+                if self.path.startswith('/cht/3/vixDaily3M'):
+                    year = int(form.get('queryYear', ['0'])[0])
+                    month = int(form.get('queryMonth', ['0'])[0])
+                    html = vix_daily_html(stand_in._month(year, month))
+                    return self._send(200, html.encode('utf-8'), 'text/html; charset=utf-8')
+                self._send(404, b'not found')
+
+        return Handler
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeYFinance:
+    """Minimal stand-in for the yfinance module: Ticker(symbol).history(start, end, period)."""
+
+    def __init__(self, frames, latency=0.0):
+        # frames: {symbol: Series of closes indexed by date}
+        self.frames = frames
+        self.latency = latency
+        self.calls = 0
+
+    def Ticker(self, symbol):
+        return _FakeTicker(self, symbol)
+
+
+class _FakeTicker:
+    def __init__(self, provider, symbol):
+        self.provider = provider
+        self.symbol = symbol
+
+    def history(self, start=None, end=None, period=None):
+        self.provider.calls += 1
+        if self.provider.latency:
+            time.sleep(self.provider.latency)
+        closes = self.provider.frames.get(self.symbol, pd.Series(dtype=float)).dropna()
+        if period is not None:
+            closes = closes.iloc[-1:]
+        else:
+            if start is not None:
+                closes = closes[closes.index >= pd.Timestamp(start)]
+            if end is not None:
+                # yfinance treats `end` as exclusive
+                closes = closes[closes.index < pd.Timestamp(end)]
+        index = closes.index.tz_localize('America/New_York')
+        return pd.DataFrame({'Open': closes.values, 'High': closes.values, 'Low': closes.values,
+                             'Close': closes.values, 'Volume': 0}, index=index)
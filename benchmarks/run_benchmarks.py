@@ -0,0 +1,207 @@
+"""
+Offline benchmark suite for the VIX pipeline.
+
+Times collection (against local TAIFEX and yfinance stand-ins), TAIFEX parsing,
+merging, SVG render and HTML render over synthetic history, then compares the
+results with a JSON baseline so regressions in collect_vix_data.py and the
+visualizers show up. Nothing touches the outside network.
+
+Usage:
+    python benchmarks/run_benchmarks.py                       # 15 years, 3 markets
+    python benchmarks/run_benchmarks.py --years 100 --markets 24
+    python benchmarks/run_benchmarks.py --save-baseline       # record current timings
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, bench_dir)
+sys.path.insert(0, os.path.join(bench_dir, '..'))
+
+import pandas as pd
+
+import collect_vix_data
+import vix_cache
+import vix_http
+from fake_sources import FakeYFinance, TaifexStandIn
+from synthetic import synthetic_history, taifex_text
+
+# Configuration
+baseline_file = os.path.join(bench_dir, 'baseline.json')
+default_tolerance = 0.25  # Allowed slowdown vs baseline before a stage counts as a regression
+min_regression_seconds = 0.05  # Ignore slowdowns smaller than this (timer noise)
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return min(timings)
+
+
+def quiet(fn, *args, **kwargs):
+    """Call fn with stdout silenced (the collectors and plotters print progress)."""
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def run_suite(years, markets, repeat, latency, workdir):
+    history = synthetic_history(years=years, markets=markets)
+    start = history.index[0].strftime('%Y-%m-%d')
+    end = history.index[-1].strftime('%Y-%m-%d')
+    results = {}
+
+    # Route every source to the local stand-ins
+    vix_cache.cache_dir = os.path.join(workdir, 'cache')
+    vix_http.min_request_interval = 0
+    collect_vix_data.yf = FakeYFinance({'^VIX': history['US_VIX']}, latency=latency)
+
+    with TaifexStandIn(history['Taiwan_VIX'], latency=latency) as taifex:
+        collect_vix_data.taifex_base_url = taifex.base_url
+
+        def cold_collect(workers):
+            shutil.rmtree(vix_cache.cache_dir, ignore_errors=True)
+            return quiet(collect_vix_data.collect_taiwan_vix_auto, start, end, workers=workers)
+
+        results['collect_taiwan_serial'] = best_of(lambda: cold_collect(1), repeat)
+        results['collect_taiwan'] = best_of(lambda: cold_collect(None), repeat)
+        cold_requests = taifex.requests // (2 * repeat)
+        results['collect_taiwan_cached'] = best_of(
+            lambda: quiet(collect_vix_data.collect_taiwan_vix_auto, start, end), repeat)
+        results['cold_requests'] = cold_requests
+        results['cached_requests'] = (taifex.requests - cold_requests * 2 * repeat) // repeat
+
+        # Every registered source at once: as slow as the slowest source, not the sum
+        collect_vix_data.history_start_date = start
+
+        def collect_all():
+            shutil.rmtree(vix_cache.cache_dir, ignore_errors=True)
+            return quiet(collect_vix_data.collect_sources, pd.DataFrame())
+
+        results['collect_all'] = best_of(collect_all, repeat)
+
+    shutil.rmtree(vix_cache.cache_dir, ignore_errors=True)
+    results['collect_us'] = best_of(lambda: quiet(collect_vix_data.collect_us_vix, start, end), repeat)
+
+    text = taifex_text(history['Taiwan_VIX'])
+    results['parse_taifex'] = best_of(lambda: collect_vix_data.parse_taifex_txt(text), repeat)
+
+    # Merge the last month of every market into the rest of the history
+    cutoff = history.index[-1] - pd.Timedelta(days=31)
+    stored = history[history.index <= cutoff]
+    frames = {col: history.loc[history.index > cutoff - pd.Timedelta(days=7), [col]].dropna()
+              for col in history.columns}
+    results['merge'] = best_of(lambda: quiet(collect_vix_data.merge_sources, stored, frames), repeat)
+
+    import matplotlib.pyplot as plt
+    import visualize_vix
+    import visualize_vix_interactive
+
+    visualize_vix.output_image = os.path.join(workdir, 'vix_chart.svg')
+    visualize_vix_interactive.output_html = os.path.join(workdir, 'vix_chart_interactive.html')
+
+    def render_svg():
+        quiet(visualize_vix.plot_vix, history)
+        plt.close('all')
+
+    results['render_svg'] = best_of(render_svg, repeat)
+    results['render_html'] = best_of(lambda: quiet(visualize_vix_interactive.plot_vix_interactive, history), repeat)
+    results['svg_bytes'] = os.path.getsize(visualize_vix.output_image)
+    results['html_bytes'] = os.path.getsize(visualize_vix_interactive.output_html)
+    return results
+
+
+def config_key(years, markets):
+    return f"years={years},markets={markets}"
+
+
+def load_baseline(path=baseline_file):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of (stage, baseline, current) for timed stages that regressed."""
+    regressions = []
+    for stage, current in results.items():
+        if stage.endswith('_bytes') or stage.endswith('_requests') or stage not in baseline:
+            continue
+        previous = baseline[stage]
+        if current > previous * (1 + tolerance) and current - previous > min_regression_seconds:
+            regressions.append((stage, previous, current))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the VIX pipeline.")
+    parser.add_argument('--years', type=int, default=15)
+    parser.add_argument('--markets', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help="Simulated per-request latency of the stand-ins, in seconds")
+    parser.add_argument('--baseline', default=baseline_file)
+    parser.add_argument('--tolerance', type=float, default=default_tolerance)
+    parser.add_argument('--save-baseline', action='store_true', help="Record these results as the new baseline")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='vix_bench_')
+    try:
+        print(f"Benchmarking {args.years} years x {args.markets} markets (best of {args.repeat})...")
+        results = run_suite(args.years, args.markets, args.repeat, args.latency, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    key = config_key(args.years, args.markets)
+    all_baselines = load_baseline(args.baseline)
+    baseline = all_baselines.get(key, {}).get('results', {})
+
+    print(f"\n  {'stage':<24} {'current':>10} {'baseline':>10}")
+    for stage, value in results.items():
+        previous = baseline.get(stage)
+        unit = '' if stage.endswith('_bytes') or stage.endswith('_requests') else 's'
+        fmt = (lambda v: f"{v:>9}{unit}" if unit == '' else f"{v:9.3f}{unit}")
+        print(f"  {stage:<24} {fmt(value)} {fmt(previous) if previous is not None else '         -':>10}")
+
+    if args.save_baseline:
+        all_baselines[key] = {
+            'recorded': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'latency': args.latency,
+            'results': results,
+        }
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(all_baselines, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline} [{key}]")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\nREGRESSIONS (> {args.tolerance:.0%} slower than baseline):")
+        for stage, previous, current in regressions:
+            print(f"  {stage}: {previous:.3f}s -> {current:.3f}s")
+        return 1
+    print("\nNo regressions." if baseline else "\nNo baseline for this configuration; run with --save-baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
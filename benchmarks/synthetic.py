@@ -0,0 +1,79 @@
+"""
+Synthetic VIX history for offline benchmarks.
+
+Generates mean-reverting, spiky volatility series on a business-day calendar for any
+number of years and markets, plus TAIFEX-format TXT and vixDaily3M HTML bodies.
+"""
+import numpy as np
+import pandas as pd
+
+base_markets = ['US_VIX', 'Japan_VIX', 'Taiwan_VIX']
+
+
+def market_names(count):
+    """The three real markets first, then synthetic MKT_NN columns."""
+    names = base_markets[:count]
+    names += [f'MKT_{i:02d}' for i in range(len(names), count)]
+    return names
+
+
+def synthetic_series(days, seed=0, level=18.0):
+    """Mean-reverting log-volatility walk with occasional spikes, rounded to 2 decimals."""
+    rng = np.random.default_rng(seed)
+    n = len(days)
+    shocks = rng.normal(0, 0.06, n) + (rng.random(n) < 0.01) * rng.uniform(0.3, 0.9, n)
+    log_level = np.empty(n)
+    x = np.log(level)
+    for i in range(n):
+        x += 0.05 * (np.log(level) - x) + shocks[i]
+        log_level[i] = x
+    return np.round(np.exp(log_level), 2)
+
+
+def synthetic_history(years=15, markets=3, end="2025-12-31", seed=0, holiday_rate=0.03):
+    """
+    Merged-style frame: business days over `years` years, one column per market,
+    with each market missing a random `holiday_rate` of days (its own holidays).
+    """
+    end_ts = pd.Timestamp(end)
+    start_ts = pd.Timestamp(end_ts.year - years + 1, 1, 1)
+    days = pd.bdate_range(start_ts, end_ts, name='Date')
+    rng = np.random.default_rng(seed)
+
+    data = {}
+    for i, name in enumerate(market_names(markets)):
+        values = synthetic_series(days, seed=seed + i + 1, level=rng.uniform(14, 24))
+        values[rng.random(len(days)) < holiday_rate] = np.nan
+        data[name] = values
+    return pd.DataFrame(data, index=days)
+
+
+def taifex_month_text(series):
+    """TAIFEX log2data_eng TXT body for one month of a Date-indexed series."""
+    lines = ["Date\t\tClosing Time\t\tDaily Index\t\tLast 1 min AVG"]
+    for date, value in series.dropna().items():
+        lines.append(f"{date:%Y%m%d}\t\t13:45:00\t\t{value:.2f}\t\t{value:.2f}")
+    return '\n'.join(lines) + '\n'
+
+
+def taifex_text(series):
+    """All months of a series as concatenated TAIFEX TXT bodies (as the collector parses them)."""
+    index = series.index
+    return '\n'.join(taifex_month_text(month) for _, month in series.groupby([index.year, index.month]))
+
+
+def vix_daily_html(series):
+    """vixDaily3M-style HTML page with a table_f table of Date/Open/High/Low/Close rows."""
+    rows = []
+    for date, close in series.dropna().items():
+        rows.append(
+            f"<tr><td align=\"center\">{date:%Y/%m/%d}</td><td>{close + 0.3:,.2f}</td>"
+            f"<td>{close + 0.8:,.2f}</td><td>{close - 0.6:,.2f}</td><td>{close:,.2f}</td></tr>")
+    return (
+        "<html><head><title>VIX Daily</title></head><body>"
+        "<div class=\"section\"><table class=\"table_c\"><tr><td>nav</td></tr></table>"
+        "<table class=\"table_f\" width=\"100%\">"
+        "<tr><th>Date</th><th>Open</th><th>High</th><th>Low</th><th>Close</th></tr>"
+        + ''.join(rows) +
+        "</table></div></body></html>"
+    )
@@ -1,235 +1,423 @@
 import pandas as pd
+import numpy as np
 import yfinance as yf
 import os
+import io
+import json
+import hashlib
+import html
+import re
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import time
+import argparse
+
+import vix_cache
+import vix_align
+import vix_columnar
+import vix_http
+import vix_metrics
+import vix_sources
+
+# Configuration
+merged_file = vix_columnar.csv_file
+store_dir = vix_columnar.store_dir
+taifex_base_url = "https://www.taifex.com.tw"
+history_start_date = "2010-01-01"
+# Re-fetch this many days before each watermark so late revisions are picked up
+overlap_days = 7
+# Also keep the TAIFEX closing-time values in the intraday store (vix_intraday); --intraday
+collect_intraday = False
+
+def fetch_us_vix(start_date, end_date):
+    """Raw yfinance ^VIX history through the response cache."""
+    # Ranges ending before today are settled; today's range is refreshed after the TTL
+    settled = pd.to_datetime(end_date) < pd.Timestamp.now().normalize()
+    return vix_cache.cached_call(
+        f"yfinance:^VIX:history:{start_date}:{end_date}",
+        lambda: yf.Ticker("^VIX").history(start=start_date, end=end_date),
+        immutable=settled)
+
+def parse_us_vix(raw):
+    """yfinance history -> Date-indexed US_VIX frame."""
+    if raw is None or raw.empty:
+        print("  No data found for US VIX.")
+        return pd.DataFrame()
+    df = raw[['Close']].rename(columns={'Close': 'US_VIX'})
+    df.index = df.index.tz_localize(None)
+    vix_metrics.count('rows_parsed', len(df))
+    print(f"  Got {len(df)} rows.")
+    return df
 
+@vix_metrics.instrument('collect', source='US_VIX')
 def collect_us_vix(start_date, end_date):
-    print("Collecting US VIX (^VIX)...")
-    try:
-        vix = yf.Ticker("^VIX")
-        df = vix.history(start=start_date, end=end_date)
-        if df.empty:
-            print("  No data found for US VIX.")
-            return pd.DataFrame()
-            
-        df = df[['Close']].rename(columns={'Close': 'US_VIX'})
-        df.index = df.index.tz_localize(None) 
-        print(f"  Got {len(df)} rows.")
-        return df
-    except Exception as e:
-        print(f"  Error collecting US VIX: {e}")
-        return pd.DataFrame()
+    return USVixSource().collect(start_date, end_date)
 
-def load_japan_vix_local(file_path, start_date, end_date):
+nikkei_columns = ['Date', 'Open', 'High', 'Low', 'Close']
+
+def parse_nikkei_csv(raw, has_header=True):
+    """
+    Parse Shift-JIS Nikkei VI CSV bytes into a Date-indexed OHLC frame.
+    Returns (df, rejected_count); non-data rows (headers, footers, blanks) are rejected.
+    """
+    # Nikkei CSV is usually Shift-JIS
+    # Expected: 日付, 始値, 高値, 安値, 終値 (Date, Open, High, Low, Close)
+    # Sometimes there's a header line to skip or footer
+    try:
+        df = pd.read_csv(io.BytesIO(raw), encoding='shift-jis', header=0 if has_header else None)
+    except pd.errors.EmptyDataError:
+        # Nothing but blank lines (e.g. a trailing newline appended to the file)
+        return pd.DataFrame(columns=nikkei_columns[1:], index=pd.DatetimeIndex([], name='Date'), dtype=float), 0
+
+    # Rename columns based on position to be safe if headers vary
+    df = df.iloc[:, :5]
+    df.columns = nikkei_columns[:df.shape[1]]
+
+    # Drop rows that are not data (e.g. empty or headers repeated)
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    rejected = int(df['Date'].isna().sum())
+    df = df.dropna(subset=['Date']).set_index('Date')
+    for col in nikkei_columns[1:]:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype(float) if col in df.columns else float('nan')
+    return df[nikkei_columns[1:]], rejected
+
+def _nikkei_cache_paths(file_path):
+    folder = os.path.join(vix_cache.cache_dir, 'nikkei')
+    name = os.path.basename(file_path)
+    return os.path.join(folder, name + '.npz'), os.path.join(folder, name + '.json')
+
+def load_japan_vix_ohlc(file_path):
+    """
+    Load the Nikkei VI file as a typed OHLC frame, using a parsed cache keyed by the
+    file's size, mtime and content hash. An unchanged file is not re-parsed; a file
+    that was only appended to has just its new tail parsed.
+    """
+    data_path, meta_path = _nikkei_cache_paths(file_path)
+    st = os.stat(file_path)
+    meta, cached = None, None
+    if os.path.exists(meta_path) and os.path.exists(data_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with np.load(data_path) as arrays:
+            cached = pd.DataFrame({col: arrays[col] for col in nikkei_columns[1:]},
+                                  index=pd.DatetimeIndex(arrays['Date'], name='Date'))
+
+    if meta is not None and meta['size'] == st.st_size and meta['mtime'] == st.st_mtime:
+        vix_metrics.count('cache_hits')
+        return cached
+
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    content_hash = hashlib.sha256(raw).hexdigest()
+    # Bytes up to the last newline are complete lines; anything after may still grow
+    parsed_bytes = raw.rfind(b'\n') + 1
+
+    if meta is not None and meta['sha256'] == content_hash:
+        # Touched but unchanged
+        vix_metrics.count('cache_hits')
+        df = cached
+    elif (meta is not None and len(raw) > meta['parsed_bytes']
+          and hashlib.sha256(raw[:meta['parsed_bytes']]).hexdigest() == meta['prefix_sha256']):
+        vix_metrics.count('cache_hits')
+        if not raw[meta['parsed_bytes']:].strip():
+            # Only blank lines appended: nothing new to parse, but record the new size
+            df = cached
+        else:
+            # Appended: parse only the new tail
+            tail, rejected = parse_nikkei_csv(raw[meta['parsed_bytes']:], has_header=False)
+            vix_metrics.count('rows_parsed', len(tail))
+            vix_metrics.count('rows_rejected', rejected)
+            df = pd.concat([cached, tail])
+            df = df[~df.index.duplicated(keep='last')].sort_index()
+    else:
+        vix_metrics.count('cache_misses')
+        df, rejected = parse_nikkei_csv(raw)
+        vix_metrics.count('rows_parsed', len(df))
+        vix_metrics.count('rows_rejected', rejected)
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    np.savez(data_path, Date=df.index.values.astype('datetime64[D]'),
+             **{col: df[col].to_numpy(dtype=np.float64) for col in nikkei_columns[1:]})
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({'size': st.st_size, 'mtime': st.st_mtime, 'sha256': content_hash,
+                   'parsed_bytes': parsed_bytes,
+                   'prefix_sha256': hashlib.sha256(raw[:parsed_bytes]).hexdigest()}, f)
+    return df
+
+def read_japan_vix_file(file_path):
+    """The local Nikkei VI file as an OHLC frame, or None if it has not been downloaded."""
     print(f"Checking for local Japan VIX file: {file_path}...")
     if not os.path.exists(file_path):
         print(f"  File not found. Please download it from Nikkei website.")
         print(f"  URL: https://indexes.nikkei.co.jp/nkave/archives/data/nk225vi_daily_jp.csv (or similar)")
+        return None
+    return load_japan_vix_ohlc(file_path)
+
+def parse_japan_vix(ohlc, start_date, end_date):
+    """Nikkei VI OHLC frame -> Japan_VIX closes within the date range."""
+    if ohlc is None:
         return pd.DataFrame()
-    
-    try:
-        # Nikkei CSV is usually Shift-JIS
-        df = pd.read_csv(file_path, encoding='shift-jis')
-        
-        # Clean columns
-        # Expected: 日付, 始値, 高値, 安値, 終値 (Date, Open, High, Low, Close)
-        # Sometimes there's a header line to skip or footer
-        
-        # Rename columns based on position to be safe if headers vary
-        # Assuming format: Date, Open, High, Low, Close
-        df = df.iloc[:, :5] # Keep first 5 cols
-        df.columns = ['Date', 'Open', 'High', 'Low', 'Close']
-        
-        # Drop rows that are not data (e.g. empty or headers repeated)
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        df = df.dropna(subset=['Date'])
-        
-        df = df.set_index('Date')
-        df = df[['Close']].rename(columns={'Close': 'Japan_VIX'})
-        
-        # Filter
-        mask = (df.index >= pd.to_datetime(start_date)) & (df.index <= pd.to_datetime(end_date))
-        df = df.loc[mask]
-        print(f"  Loaded {len(df)} rows from local file.")
-        return df
-    except Exception as e:
-        print(f"  Error reading local Japan VIX: {e}")
-        return pd.DataFrame()
+    df = ohlc[['Close']].rename(columns={'Close': 'Japan_VIX'})
 
-def collect_taiwan_vix_auto(start_date, end_date):
-    """
-    Automatically download Taiwan VIX data from TAIFEX website.
-    Downloads directly from TAIFEX TXT files.
-    """
-    print("Collecting Taiwan VIX (TAIFEX) automatically...")
+    # Filter
+    mask = (df.index >= pd.to_datetime(start_date)) & (df.index <= pd.to_datetime(end_date))
+    df = df.loc[mask]
+    print(f"  Loaded {len(df)} rows from local file.")
+    return df
 
-    try:
-        start_dt = pd.to_datetime(start_date)
-        end_dt = pd.to_datetime(end_date)
-        all_data = []
-
-        # Calculate months to fetch
-        current_date = end_dt
-        months_to_fetch = []
-
-        # Go back to start date, collecting all months
-        while current_date >= start_dt:
-            months_to_fetch.append((current_date.year, current_date.month))
-            # Move to previous month
-            if current_date.month == 1:
-                current_date = pd.Timestamp(current_date.year - 1, 12, 1)
-            else:
-                current_date = pd.Timestamp(current_date.year, current_date.month - 1, 1)
-
-        months_to_fetch.reverse()  # Process chronologically
-
-        print(f"  Downloading data for {len(months_to_fetch)} months...")
-
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-
-        for year, month in months_to_fetch:
-            try:
-                # Direct download URL pattern found on TAIFEX website
-                # Format: https://www.taifex.com.tw/file/taifex/Dailydownload/vix/log2data_eng/YYYYMMnew.txt
-                month_str = f"{year}{str(month).zfill(2)}"
-                url = f"https://www.taifex.com.tw/file/taifex/Dailydownload/vix/log2data_eng/{month_str}new.txt"
-
-                response = requests.get(url, headers=headers, timeout=30)
-
-                if response.status_code == 200:
-                    # Parse the TXT file
-                    # Format: Date\t\tClosing Time\t\tDaily Index\t\tLast 1 min AVG
-                    # Date format: YYYYMMDD
-                    lines = response.text.strip().split('\n')
-
-                    data_rows = []
-                    for line in lines:
-                        # Skip empty lines, headers, and separator lines
-                        if not line.strip() or 'Date' in line or '---' in line:
-                            continue
-
-                        # Split by tabs
-                        parts = [p.strip() for p in line.split('\t') if p.strip()]
-
-                        if len(parts) >= 3:
-                            try:
-                                date_str = parts[0]  # YYYYMMDD format
-                                vix_val_str = parts[2]  # Daily Index (3rd column)
-
-                                # Parse date (format: YYYYMMDD)
-                                date_obj = pd.to_datetime(date_str, format='%Y%m%d')
-                                vix_val = float(vix_val_str)
-
-                                data_rows.append({
-                                    'Date': date_obj,
-                                    'Taiwan_VIX': vix_val
-                                })
-                            except:
-                                continue
-
-                    if data_rows:
-                        all_data.extend(data_rows)
-                        print(f"    Downloaded {year}/{str(month).zfill(2)}: {len(data_rows)} rows")
-
-            except requests.exceptions.RequestException:
-                # File might not exist for this month (too old or future month)
-                pass
-            except Exception as e:
-                print(f"    Warning: Could not fetch {year}/{month}: {str(e)[:50]}")
-                continue
+@vix_metrics.instrument('collect', source='Japan_VIX')
+def load_japan_vix_local(file_path, start_date, end_date):
+    return JapanVixSource(file_path).collect(start_date, end_date)
 
-        # Process collected data
-        if all_data:
-            df = pd.DataFrame(all_data)
-            df = df.set_index('Date')
-            df = df.sort_index()
-            df = df[~df.index.duplicated(keep='first')]
+def taifex_month_url(year, month):
+    # Direct download URL pattern found on TAIFEX website
+    # Format: https://www.taifex.com.tw/file/taifex/Dailydownload/vix/log2data_eng/YYYYMMnew.txt
+    month_str = f"{year}{str(month).zfill(2)}"
+    return f"{taifex_base_url}/file/taifex/Dailydownload/vix/log2data_eng/{month_str}new.txt"
 
-            # Filter by date range
-            mask = (df.index >= start_dt) & (df.index <= end_dt)
-            df = df.loc[mask]
+def fetch_taifex_month(year, month):
+    """
+    Download one TAIFEX monthly TXT file through the response cache; None if unavailable.
+    Closed months never change, so they are cached as immutable.
+    """
+    today = pd.Timestamp.now()
+    closed = (year, month) < (today.year, today.month)
+    body = vix_cache.fetch(taifex_month_url(year, month), immutable=closed)
+    if body is None:
+        return None
+    return body.decode('utf-8', errors='replace')
+
+def parse_taifex_txt(text):
+    """
+    Parse a TAIFEX VIX TXT body (one or more months concatenated) in one vectorized pass.
 
-            if not df.empty:
-                print(f"  Successfully downloaded {len(df)} rows from TAIFEX")
-                return df
+    Format: Date\t\tClosing Time\t\tDaily Index\t\tLast 1 min AVG, with dates as YYYYMMDD.
+    Returns (df, rejected): df is indexed by Date with columns Taiwan_VIX (Daily Index),
+    Closing_Time (timestamp of the close) and Last_1min_AVG; rejected lists the data
+    lines that could not be parsed.
+    """
+    columns = ['Taiwan_VIX', 'Closing_Time', 'Last_1min_AVG']
+    lines = pd.Series(text.split('\n'), dtype=object).str.strip()
+
+    # Skip empty lines, headers, and separator lines
+    keep = (lines != '') & ~lines.str.contains('Date', regex=False) & ~lines.str.contains('---', regex=False)
+    lines = lines[keep]
+    if lines.empty:
+        return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name='Date')), []
+
+    # Split by runs of tabs; missing trailing fields become None
+    parts = lines.str.split(r'\s*\t+\s*', regex=True, expand=True)
+    for i in range(4):
+        if i not in parts.columns:
+            parts[i] = None
+
+    dates = pd.to_datetime(parts[0], format='%Y%m%d', errors='coerce')
+    values = pd.to_numeric(parts[2], errors='coerce')
+    close_times = pd.to_timedelta(parts[1], errors='coerce')
+    last_avg = pd.to_numeric(parts[3], errors='coerce')
+
+    valid = dates.notna() & values.notna()
+    rejected = lines[~valid].tolist()
+
+    df = pd.DataFrame({
+        'Taiwan_VIX': values[valid].astype(float).to_numpy(),
+        'Closing_Time': (dates[valid] + close_times[valid]).to_numpy(),
+        'Last_1min_AVG': last_avg[valid].astype(float).to_numpy(),
+    }, index=pd.DatetimeIndex(dates[valid].to_numpy(), name='Date'))
+    return df, rejected
+
+def fetch_taifex_texts(start_date, end_date, workers=None):
+    """
+    Download the TAIFEX TXT files of every month in the date range, fetching months
+    concurrently (`workers` threads, default vix_http.max_workers) over one keep-alive
+    session. Returns the bodies in month order; missing months are skipped.
+    """
+    start_dt = pd.to_datetime(start_date)
+    end_dt = pd.to_datetime(end_date)
+    texts = []
+
+    # Calculate months to fetch
+    current_date = end_dt
+    months_to_fetch = []
+
+    # Go back to start date, collecting all months
+    while current_date >= start_dt:
+        months_to_fetch.append((current_date.year, current_date.month))
+        # Move to previous month
+        if current_date.month == 1:
+            current_date = pd.Timestamp(current_date.year - 1, 12, 1)
+        else:
+            current_date = pd.Timestamp(current_date.year, current_date.month - 1, 1)
+
+    months_to_fetch.reverse()  # Process chronologically
+
+    print(f"  Downloading data for {len(months_to_fetch)} months...")
+
+    results = vix_http.fetch_all(months_to_fetch, lambda ym: fetch_taifex_month(*ym), workers=workers)
+
+    # Results come back in request order, so output matches the serial path
+    for (year, month), (text, error) in zip(months_to_fetch, results):
+        if isinstance(error, requests.exceptions.RequestException):
+            # File might not exist for this month (too old or future month)
+            continue
+        if error is not None:
+            print(f"    Warning: Could not fetch {year}/{month}: {str(error)[:50]}")
+            continue
+        if text is None:
+            continue
+
+        texts.append(text)
+    return texts
+
+def parse_taifex_texts(texts, start_date, end_date):
+    """Parse downloaded TAIFEX month bodies into a Taiwan_VIX frame for the date range."""
+    if not texts:
+        return pd.DataFrame()
 
-        print("  No data downloaded, trying local file...")
-        return load_taiwan_vix_local('taifex_vix.csv', start_date, end_date)
+    # Parse every downloaded month in one vectorized pass
+    parsed, rejected = parse_taifex_txt('\n'.join(texts))
+    vix_metrics.count('rows_parsed', len(parsed))
+    vix_metrics.count('rows_rejected', len(rejected))
+    if rejected:
+        print(f"    Warning: skipped {len(rejected)} malformed TAIFEX lines, e.g. {rejected[0][:60]!r}")
+    for (year, month), count in parsed.groupby([parsed.index.year, parsed.index.month]).size().items():
+        print(f"    Downloaded {year}/{str(month).zfill(2)}: {count} rows")
+    df = parsed[['Taiwan_VIX']]
+
+    # Process collected data
+    df = df.sort_index(kind='stable')
+    df = df[~df.index.duplicated(keep='first')]
+
+    # Filter by date range
+    mask = (df.index >= pd.to_datetime(start_date)) & (df.index <= pd.to_datetime(end_date))
+    df = df.loc[mask]
+    if not df.empty:
+        print(f"  Successfully downloaded {len(df)} rows from TAIFEX")
+    return df
+
+@vix_metrics.instrument('collect', source='Taiwan_VIX')
+def collect_taiwan_vix_auto(start_date, end_date, workers=None):
+    """
+    Automatically download Taiwan VIX data from TAIFEX website.
+    Downloads directly from TAIFEX TXT files, falling back to the local export.
+    """
+    return TaiwanVixSource().collect(start_date, end_date, workers=workers)
 
-    except Exception as e:
-        print(f"  Error in automatic download: {e}")
-        print("  Falling back to local file method...")
-        return load_taiwan_vix_local('taifex_vix.csv', start_date, end_date)
 
+_table_tag = re.compile(r'<table\b([^>]*)>', re.I)
+_table_end = re.compile(r'</table\s*>', re.I)
+_class_attr = re.compile(r'\bclass\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.I)
+_row_tag = re.compile(r'<tr\b[^>]*>(.*?)</tr\s*>', re.I | re.S)
+_data_cell = re.compile(r'<td\b[^>]*>(.*?)</td\s*>', re.I | re.S)
+_any_tag = re.compile(r'<[^>]*>')
 
-def collect_taiwan_vix_alternative(start_date, end_date):
+def extract_table_f_rows(content):
+    """
+    Fast path: the cell texts of each data row of the page's `table_f` table, found
+    with regular expressions instead of building a DOM. Returns None when the markup
+    is not the simple shape this handles (nested tables, comments, unclosed rows), so
+    the caller can fall back to BeautifulSoup.
+    """
+    text = content.decode('utf-8', errors='replace') if isinstance(content, bytes) else content
+    for tag in _table_tag.finditer(text):
+        attr = _class_attr.search(tag.group(1))
+        if attr is None or 'table_f' not in ''.join(g for g in attr.groups() if g).split():
+            continue
+        end = _table_end.search(text, tag.end())
+        if end is None:
+            return None
+        body = text[tag.end():end.start()]
+        lowered = body.lower()
+        if '<table' in lowered or '<!--' in lowered or lowered.count('<tr') != lowered.count('</tr'):
+            return None
+        rows = _row_tag.findall(body)
+        if lowered.count('<td') != sum(row.lower().count('</td') for row in rows):
+            return None
+        return [[html.unescape(_any_tag.sub('', cell)).strip() for cell in _data_cell.findall(row)]
+                for row in rows[1:]]  # Skip header
+    return []
+
+def extract_table_f_rows_soup(content):
+    """BeautifulSoup path: the cell texts of each data row of the `table_f` table."""
+    soup = BeautifulSoup(content, 'html.parser')
+    table = soup.find('table', {'class': 'table_f'})
+    if not table:
+        return []
+    return [[td.text.strip() for td in row.find_all('td')] for row in table.find_all('tr')[1:]]
+
+def parse_vix_daily_html(content):
+    """
+    Parse one vixDaily3M page (Date, Open, High, Low, Close rows of its `table_f` table).
+    Uses the regex fast path and falls back to BeautifulSoup for markup it rejects.
+    Returns (df, rejected): df is indexed by Date with a Taiwan_VIX (Close) column;
+    rejected lists the rows with an unparseable date or close.
+    """
+    rows = extract_table_f_rows(content)
+    if rows is None:
+        vix_metrics.count('parse_fallbacks')
+        rows = extract_table_f_rows_soup(content)
+    rows = [cols for cols in rows if len(cols) >= 5]  # Date, Open, High, Low, Close
+    if not rows:
+        return pd.DataFrame(columns=['Taiwan_VIX'], index=pd.DatetimeIndex([], name='Date')), []
+
+    date_text = pd.Series([cols[0] for cols in rows], dtype=object)
+    close_text = pd.Series([cols[4].replace(',', '') for cols in rows], dtype=object)
+    dates = pd.to_datetime(date_text, format='%Y/%m/%d', errors='coerce')
+    unusual = dates.isna()
+    if unusual.any():
+        dates[unusual] = pd.to_datetime(date_text[unusual], format='mixed', errors='coerce')
+    values = pd.to_numeric(close_text, errors='coerce')
+
+    valid = dates.notna() & values.notna()
+    rejected = [rows[i] for i in np.flatnonzero(~valid.to_numpy())]
+    df = pd.DataFrame({'Taiwan_VIX': values[valid].astype(float).to_numpy()},
+                      index=pd.DatetimeIndex(dates[valid].to_numpy(), name='Date'))
+    return df, rejected
+
+def fetch_vix_daily_month(year, month):
+    """POST one vixDaily3M month query through the response cache; None if unavailable."""
+    today = pd.Timestamp.now()
+    closed = (year, month) < (today.year, today.month)
+    params = {
+        'queryYear': str(year),
+        'queryMonth': str(month).zfill(2),
+    }
+    return vix_cache.fetch(f"{taifex_base_url}/cht/3/vixDaily3M", method='POST', data=params, immutable=closed)
+
+def collect_taiwan_vix_alternative(start_date, end_date, workers=None):
     """
     Alternative method to fetch Taiwan VIX data using monthly queries.
+    Months are queried concurrently (`workers` threads) over the shared keep-alive session.
     """
     print("  Using alternative download method (monthly queries)...")
 
     try:
-        all_data = []
         start_dt = pd.to_datetime(start_date)
         end_dt = pd.to_datetime(end_date)
 
         # Query by month to avoid TAIFEX limitations
-        current_date = start_dt
-
-        while current_date <= end_dt:
-            year = current_date.year
-            month = current_date.month
-
-            # TAIFEX daily VIX URL pattern
-            url = f"https://www.taifex.com.tw/cht/3/vixDaily3M"
-
-            params = {
-                'queryYear': str(year),
-                'queryMonth': str(month).zfill(2),
-            }
-
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-
-            response = requests.post(url, data=params, headers=headers, timeout=30)
-
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                table = soup.find('table', {'class': 'table_f'})
-
-                if table:
-                    rows = table.find_all('tr')
-                    for row in rows[1:]:  # Skip header
-                        cols = row.find_all('td')
-                        if len(cols) >= 5:  # Date, Open, High, Low, Close
-                            try:
-                                date_str = cols[0].text.strip()
-                                close_value = cols[4].text.strip().replace(',', '')
-
-                                date_obj = pd.to_datetime(date_str)
-                                all_data.append({
-                                    'Date': date_obj,
-                                    'Taiwan_VIX': float(close_value)
-                                })
-                            except:
-                                continue
-
-            # Move to next month
-            if month == 12:
-                current_date = pd.Timestamp(year + 1, 1, 1)
-            else:
-                current_date = pd.Timestamp(year, month + 1, 1)
-
-        if all_data:
-            df = pd.DataFrame(all_data)
-            df = df.set_index('Date')
-            df = df.sort_index()
+        months = [(p.year, p.month) for p in pd.period_range(start_dt, end_dt, freq='M')]
+        results = vix_http.fetch_all(months, lambda ym: fetch_vix_daily_month(*ym), workers=workers)
+
+        frames = []
+        for (year, month), (content, error) in zip(months, results):
+            if isinstance(error, requests.exceptions.RequestException):
+                continue
+            if error is not None:
+                print(f"    Warning: Could not query {year}/{month}: {str(error)[:50]}")
+                continue
+            if content is None:
+                continue
+            parsed, rejected = parse_vix_daily_html(content)
+            vix_metrics.count('rows_parsed', len(parsed))
+            vix_metrics.count('rows_rejected', len(rejected))
+            frames.append(parsed)
+
+        if frames:
+            df = pd.concat(frames)
+            df = df.sort_index(kind='stable')
             df = df[~df.index.duplicated(keep='first')]
 
             # Filter by date range
@@ -291,41 +479,135 @@ def load_taiwan_vix_local(file_path, start_date, end_date):
         print(f"  Error reading local Taiwan VIX: {e}")
         return pd.DataFrame()
 
-def main():
-    start_date = "2010-01-01"
-    end_date = pd.Timestamp.now().strftime("%Y-%m-%d")
-    
-    # 1. US VIX (Auto)
-    us_df = collect_us_vix(start_date, end_date)
-    
-    # 2. Japan VIX (Local File)
+class USVixSource(vix_sources.Source):
+    """US VIX (^VIX) from yfinance."""
+    column = 'US_VIX'
+    description = 'US VIX (^VIX)'
+    timeout = 120
+
+    def fetch(self, start_date, end_date, workers=None):
+        return fetch_us_vix(start_date, end_date)
+
+    def parse(self, raw, start_date, end_date):
+        return parse_us_vix(raw)
+
+class JapanVixSource(vix_sources.Source):
+    """Japan VIX (Nikkei VI) from the locally downloaded Nikkei CSV."""
+    column = 'Japan_VIX'
+    description = 'Japan VIX (Nikkei VI, local file)'
+    timeout = 60
+
     # User should download: https://indexes.nikkei.co.jp/nkave/archives/data/nk225vi_daily_jp.csv
-    jp_file = "nk225vi_daily_jp.csv"
-    jp_df = load_japan_vix_local(jp_file, start_date, end_date)
-    
-    # 3. Taiwan VIX (Automatic Download)
-    # Automatically download from TAIFEX website
-    tw_df = collect_taiwan_vix_auto(start_date, end_date)
-    
-    # Merge
+    def __init__(self, file_path="nk225vi_daily_jp.csv"):
+        self.file_path = file_path
+
+    def fetch(self, start_date, end_date, workers=None):
+        return read_japan_vix_file(self.file_path)
+
+    def parse(self, raw, start_date, end_date):
+        return parse_japan_vix(raw, start_date, end_date)
+
+class TaiwanVixSource(vix_sources.Source):
+    """Taiwan VIX from the TAIFEX monthly TXT files, else a local TAIFEX export."""
+    column = 'Taiwan_VIX'
+    description = 'Taiwan VIX (TAIFEX) automatically'
+    timeout = 600  # A full-history run downloads ~200 monthly files
+
+    def fetch(self, start_date, end_date, workers=None):
+        return fetch_taifex_texts(start_date, end_date, workers=workers)
+
+    def parse(self, raw, start_date, end_date):
+        if collect_intraday and raw:
+            import vix_intraday
+            vix_intraday.ingest(raw, 'taifex')
+        return parse_taifex_texts(raw, start_date, end_date)
+
+    def fallback(self, start_date, end_date):
+        print("  No data downloaded, falling back to local file...")
+        return load_taiwan_vix_local('taifex_vix.csv', start_date, end_date)
+
+vix_sources.register(USVixSource())
+vix_sources.register(JapanVixSource())
+vix_sources.register(TaiwanVixSource())
+
+def load_history(directory=store_dir, fallback_csv=merged_file):
+    """Load the stored merged history (columnar store, else CSV export), or an empty frame."""
+    try:
+        return vix_columnar.load_merged(directory=directory, fallback_csv=fallback_csv)
+    except Exception as e:
+        print(f"  Error reading stored history {directory}: {e}")
+        return pd.DataFrame()
+
+def incremental_start(watermarks, column, default_start):
+    """Start date for a source: its watermark minus the overlap window, or the full-history start."""
+    if column not in watermarks:
+        return default_start
+    start = watermarks[column] - timedelta(days=overlap_days)
+    return max(start, pd.to_datetime(default_start)).strftime("%Y-%m-%d")
+
+def merge_into_history(history_df, new_df):
+    """Merge freshly collected rows into the stored history; new values win on overlap."""
+    if history_df.empty:
+        return new_df
+    if new_df.empty:
+        return history_df
+    merged = new_df.combine_first(history_df)
+    return merged[list(history_df.columns) + [c for c in new_df.columns if c not in history_df.columns]]
+
+def collect_sources(history_df, workers=None):
+    """
+    Collect every registered source concurrently from its watermark in `history_df`;
+    returns {column: DataFrame}. See vix_sources for adding a market.
+    """
+    start_date = history_start_date
+    end_date = pd.Timestamp.now().strftime("%Y-%m-%d")
+    sources = vix_sources.load_sources()
+
+    # Incremental mode: only fetch from each column's last stored date onward
+    watermarks = {}
+    for source in sources:
+        date = source.watermark(history_df)
+        if date is not None:
+            watermarks[source.column] = date
+    if watermarks:
+        print("Incremental mode, watermarks:")
+        for col, date in watermarks.items():
+            print(f"  {col}: {date.strftime('%Y-%m-%d')}")
+    else:
+        print(f"Full collection from {start_date}")
+
+    jobs = [(source, incremental_start(watermarks, source.column, start_date)) for source in sources]
+    return vix_sources.run_all(jobs, end_date, workers=workers)
+
+def merge_sources(history_df, frames):
+    """Align freshly collected per-market frames in one pass and merge them into the stored history."""
     print("\nMerging all available data...")
-    merged_df = pd.DataFrame()
-    
-    if not us_df.empty:
-        merged_df = us_df.copy()
-        
-    for df in [jp_df, tw_df]:
-        if not df.empty:
-            if merged_df.empty:
-                merged_df = df
-            else:
-                merged_df = merged_df.join(df, how='outer')
-    
+    merged_df = vix_align.align_frames(frames)
+    merged_df = merge_into_history(history_df, merged_df)
     if not merged_df.empty:
-        merged_df = merged_df.sort_index()
-        output_file = "global_vix_merged.csv"
-        merged_df.to_csv(output_file)
-        print(f"\nSUCCESS! Data saved to {output_file}")
+        merged_df = merged_df.sort_index().astype(vix_columnar.value_dtype)
+        merged_df.index.name = 'Date'
+    return merged_df
+
+def save_merged(merged_df, history_df=None):
+    """
+    Persist the merged dataset. With a stored history, only new or revised rows are
+    appended to the affected year partitions; otherwise the store is written fresh.
+    The CSV export is appended to (or rewritten when older rows were revised).
+    Each source's column is kept at the precision it quotes.
+    """
+    decimals = vix_sources.decimals()
+    if not merged_df.empty:
+        if history_df is None or history_df.empty or not vix_columnar.store_exists(store_dir):
+            vix_columnar.write_store(merged_df, store_dir, decimals)
+            vix_columnar.export_csv(merged_df, merged_file, decimals=decimals)
+            print(f"\nSUCCESS! Data saved to {store_dir}/ (exported to {merged_file})")
+        else:
+            changed = vix_columnar.changed_rows(history_df, merged_df, decimals)
+            years = vix_columnar.append_rows(changed, store_dir, decimals)
+            vix_columnar.export_csv(merged_df, merged_file, changed=changed, decimals=decimals)
+            print(f"\nSUCCESS! {len(changed)} new or revised rows saved to {store_dir}/ "
+                  f"(partitions: {', '.join(map(str, years)) or 'none'}; exported to {merged_file})")
         print("Data Summary:")
         print(merged_df.describe())
         print("\nHead:")
@@ -333,5 +615,29 @@ def main():
     else:
         print("\nNo data collected.")
 
+def main(full=False, workers=None, offline=False, intraday=False):
+    global collect_intraday
+    collect_intraday = collect_intraday or intraday
+    if offline:
+        vix_cache.offline = True
+        print(f"Offline mode: serving all sources from {vix_cache.cache_dir}")
+
+    history_df = pd.DataFrame() if full else load_history()
+    frames = collect_sources(history_df, workers=workers)
+    merged_df = merge_sources(history_df, frames)
+    save_merged(merged_df, history_df)
+    vix_cache.evict()
+    return merged_df
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Collect and merge global VIX data.")
+    parser.add_argument('--full', action='store_true',
+                        help=f"Refetch the whole history from {history_start_date} instead of from the stored watermarks")
+    parser.add_argument('--workers', type=int, default=None,
+                        help=f"Concurrent TAIFEX downloads (default {vix_http.max_workers}, 1 = serial)")
+    parser.add_argument('--offline', action='store_true',
+                        help="Serve every source from the local response cache without touching the network")
+    parser.add_argument('--intraday', action='store_true',
+                        help="Also store TAIFEX closing-time values in the intraday store (vix_intraday.py)")
+    args = parser.parse_args()
+    main(full=args.full, workers=args.workers, offline=args.offline, intraday=args.intraday)
@@ -0,0 +1,142 @@
+"""
+Single-process daily pipeline: collect -> merge -> analytics -> rollups -> regimes -> SVG -> HTML -> README.
+
+Loads the stored history once and passes one in-memory dataset through every stage,
+so pandas, matplotlib, plotly and yfinance are imported once and no stage re-reads
+the CSV or repeats a network call. Prints a per-stage timing report at the end.
+
+The render stages (svg, html, readme) are skipped when the content hash of their inputs
+matches the one in build_manifest.json and their outputs are untouched (see vix_build);
+--force renders them anyway. --charts also renders the per-market/per-window chart set
+in a process pool (see vix_charts).
+
+Usage:
+    python run_pipeline.py [--full] [--workers N] [--offline] [--skip STAGE ...] [--force]
+                           [--intraday] [--charts] [--metrics FILE] [--profile DIR] [--trace-memory]
+"""
+import argparse
+import time
+
+import vix_build
+import vix_metrics
+
+stage_names = ['collect', 'merge', 'analytics', 'rollups', 'regimes', 'svg', 'html', 'readme']
+
+
+def run_stage(timings, name, fn, *args, **kwargs):
+    print(f"\n=== [{name}] ===")
+    t0 = time.perf_counter()
+    try:
+        with vix_metrics.stage(name):
+            return fn(*args, **kwargs)
+    finally:
+        timings.append((name, time.perf_counter() - t0))
+
+
+def run_render_stage(timings, name, key, outputs, fn, *args, force=False):
+    """run_stage for a render step, skipped when vix_build says its outputs are current."""
+    if not force and vix_build.is_current(name, key, outputs):
+        print(f"\n=== [{name}] ===\n  Inputs unchanged, skipped")
+        timings.append((name, 0.0))
+        return None
+    result = run_stage(timings, name, fn, *args)
+    vix_build.record(name, key, outputs)
+    return result
+
+
+def print_timing_report(timings):
+    total = sum(seconds for _, seconds in timings)
+    print("\nStage timing report")
+    print(f"  {'stage':<10} {'seconds':>9} {'share':>7}")
+    for name, seconds in timings:
+        share = seconds / total * 100 if total else 0.0
+        print(f"  {name:<10} {seconds:9.2f} {share:6.1f}%")
+    print(f"  {'total':<10} {total:9.2f}")
+
+
+def run_pipeline(full=False, workers=None, offline=False, skip=(), force=False, intraday=False, charts=False):
+    timings = []
+
+    t0 = time.perf_counter()
+    import pandas as pd
+    import collect_vix_data
+    import update_current_vix
+    import visualize_vix
+    import visualize_vix_interactive
+    import vix_analytics
+    import vix_charts
+    import vix_regimes
+    import vix_rollups
+    import vix_store
+    import vix_cache
+    timings.append(('imports', time.perf_counter() - t0))
+
+    if offline:
+        vix_cache.offline = True
+    if intraday:
+        collect_vix_data.collect_intraday = True
+
+    history_df = pd.DataFrame() if full else run_stage(timings, 'load', collect_vix_data.load_history)
+
+    frames = {}
+    if 'collect' not in skip:
+        frames = run_stage(timings, 'collect', collect_vix_data.collect_sources, history_df, workers=workers)
+
+    merged_df = history_df
+    if 'merge' not in skip:
+        merged_df = run_stage(timings, 'merge', collect_vix_data.merge_sources, history_df, frames)
+        run_stage(timings, 'save', collect_vix_data.save_merged, merged_df, history_df)
+    if 'analytics' not in skip:
+        run_stage(timings, 'analytics', vix_analytics.update, merged_df, full=full)
+    if 'rollups' not in skip:
+        run_stage(timings, 'rollups', vix_rollups.update, merged_df, full=full)
+    if 'regimes' not in skip:
+        run_stage(timings, 'regimes', vix_regimes.update, merged_df, full=full)
+
+    # One array-backed view of the merged data for every renderer (range slices, latest values, maxima)
+    store = vix_store.VixStore.from_frame(merged_df)
+    if 'svg' not in skip:
+        run_render_stage(timings, 'svg', visualize_vix.build_key(store), visualize_vix.build_outputs(),
+                         visualize_vix.plot_vix, store, force=force)
+    if charts:
+        specs = vix_charts.default_specs(store.names)
+        run_render_stage(timings, 'charts', vix_charts.build_key(store, specs), vix_charts.build_outputs(specs),
+                         vix_charts.render_batch, store, specs, force=force)
+    if 'html' not in skip:
+        run_render_stage(timings, 'html', visualize_vix_interactive.build_key(store),
+                         visualize_vix_interactive.build_outputs(),
+                         visualize_vix_interactive.plot_vix_interactive, store, force=force)
+    if 'readme' not in skip:
+        # The US value comes from the data just collected instead of a second yfinance call
+        us_value, _ = update_current_vix.get_latest_value(store, 'US_VIX')
+        tw_value, tw_date = update_current_vix.get_latest_value(store, 'Taiwan_VIX')
+        run_render_stage(timings, 'readme', update_current_vix.build_key(us_value, tw_value, tw_date),
+                         update_current_vix.build_outputs(), update_current_vix.update_readme_with_vix,
+                         us_value, tw_value, tw_date, force=force)
+
+    vix_cache.evict()
+    print_timing_report(timings)
+    return merged_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the whole VIX update in one process.")
+    parser.add_argument('--full', action='store_true', help="Refetch the whole history instead of from watermarks")
+    parser.add_argument('--workers', type=int, default=None, help="Concurrent TAIFEX downloads")
+    parser.add_argument('--offline', action='store_true', help="Serve all sources from the local response cache")
+    parser.add_argument('--skip', nargs='*', default=[], choices=stage_names, help="Stages to skip")
+    parser.add_argument('--force', action='store_true', help="Render even if the build manifest says nothing changed")
+    parser.add_argument('--intraday', action='store_true', help="Also ingest TAIFEX closing-time values into the intraday store")
+    parser.add_argument('--charts', action='store_true', help="Also render every market over every window (vix_charts)")
+    parser.add_argument('--metrics', help="Append per-stage JSON-lines metrics to this file")
+    parser.add_argument('--profile', help="Write a cProfile dump per stage into this directory")
+    parser.add_argument('--trace-memory', action='store_true', help="Record peak Python allocations per stage")
+    args = parser.parse_args()
+    if args.metrics:
+        vix_metrics.metrics_file = args.metrics
+    if args.profile:
+        vix_metrics.profile_dir = args.profile
+    if args.trace_memory:
+        vix_metrics.trace_memory = True
+    run_pipeline(full=args.full, workers=args.workers, offline=args.offline, skip=set(args.skip), force=args.force,
+                 intraday=args.intraday, charts=args.charts)
@@ -1,12 +1,17 @@
-import yfinance as yf
-import pandas as pd
 import re
 from datetime import datetime
 import pytz
 import os
+import vix_build
+import vix_columnar
+import vix_store
+
+# Configuration
+readme_path = "README.md"
 
 def get_latest_us_vix():
     try:
+        import yfinance as yf  # Imported lazily: only this standalone path needs it
         vix = yf.Ticker("^VIX")
         # Fetching the last day's data
         df = vix.history(period="1d")
@@ -18,25 +23,32 @@ def get_latest_us_vix():
     except Exception as e:
         return f"Error: {e}"
 
+def get_latest_value(data, column):
+    """Latest valid value of `column` in a VixStore (or merged DataFrame), as (value, date) strings."""
+    latest = vix_store.as_store(data).latest(column)
+    if latest is None:
+        return "N/A", "N/A"
+    date, value = latest
+    return f"{value:.2f}", str(date)
+
 def get_latest_taiwan_vix():
-    """Get the latest Taiwan VIX value from the merged CSV file."""
+    """Get the latest Taiwan VIX value from the merged dataset (columnar store or CSV export)."""
     try:
-        if os.path.exists("global_vix_merged.csv"):
-            df = pd.read_csv("global_vix_merged.csv", index_col='Date', parse_dates=True)
-            if 'Taiwan_VIX' in df.columns:
-                # Get the last non-NaN value
-                taiwan_vix = df['Taiwan_VIX'].dropna()
-                if not taiwan_vix.empty:
-                    latest_value = taiwan_vix.iloc[-1]
-                    latest_date = taiwan_vix.index[-1].strftime('%Y-%m-%d')
-                    return f"{latest_value:.2f}", latest_date
+        if vix_columnar.store_exists() or os.path.exists(vix_columnar.csv_file):
+            return get_latest_value(vix_store.VixStore.load(columns=['Taiwan_VIX']), 'Taiwan_VIX')
         return "N/A", "N/A"
     except Exception as e:
         return f"Error: {e}", "N/A"
 
-def update_readme_with_vix(us_vix_value, taiwan_vix_value, taiwan_vix_date):
-    readme_path = "README.md"
+def build_outputs():
+    return [readme_path]
+
+def build_key(us_vix_value, taiwan_vix_value, taiwan_vix_date):
+    """Content hash of the README update's inputs: the values written and this file."""
+    data = {'us': us_vix_value, 'taiwan': taiwan_vix_value, 'taiwan_date': taiwan_vix_date}
+    return vix_build.stage_key(data=data, code=[__file__])
 
+def update_readme_with_vix(us_vix_value, taiwan_vix_value, taiwan_vix_date):
     with open(readme_path, 'r', encoding='utf-8') as f:
         content = f.read()
 
@@ -1,10 +1,17 @@
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import os
 import yfinance as yf
 from datetime import datetime, timedelta
 import matplotlib
 import platform
+import vix_build
+import vix_columnar
+import vix_metrics
+import vix_regimes
+import vix_rollups
+import vix_store
 
 # Configure Chinese font support
 if platform.system() == 'Windows':
@@ -14,21 +21,27 @@ elif platform.system() == 'Linux':
 else:  # macOS
     matplotlib.rcParams['font.sans-serif'] = ['Heiti TC', 'PingFang TC', 'Arial Unicode MS']
 matplotlib.rcParams['axes.unicode_minus'] = False  # Fix minus sign display
+matplotlib.rcParams['svg.hashsalt'] = 'vix_chart'  # Stable element ids, so identical charts give identical files
 
 # Configuration
-csv_file = "global_vix_merged.csv"
+csv_file = vix_columnar.csv_file
+store_dir = vix_columnar.store_dir
 output_image = "vix_chart.svg"
 years_back = 2
+auto_rollup = True  # Windows longer than 3 years are drawn from the weekly/monthly rollups (vix_rollups)
+shade_regimes = None  # Market (e.g. 'US_VIX') whose actual risk-zone periods are shaded instead of static bands
 
 def get_data():
-    # 1. Try to load merged CSV
-    if os.path.exists(csv_file):
-        print(f"Loading data from {csv_file}...")
+    """Load the plotted window as a VixStore (columnar store, else CSV, else a fresh US VIX fetch)."""
+    # 1. Try to load the columnar store (only the plotted window), else the merged CSV
+    if vix_columnar.store_exists(store_dir) or os.path.exists(csv_file):
+        print(f"Loading data from {store_dir if vix_columnar.store_exists(store_dir) else csv_file}...")
         try:
-            df = pd.read_csv(csv_file, index_col='Date', parse_dates=True)
-            return df
+            last = vix_columnar.latest_date(store_dir) if vix_columnar.store_exists(store_dir) else None
+            start = None if last is None else last - np.timedelta64(years_back * 365, 'D')
+            return vix_store.VixStore.load(start=start, directory=store_dir, fallback_csv=csv_file)
         except Exception as e:
-            print(f"Error reading CSV: {e}")
+            print(f"Error reading stored data: {e}")
     
     # 2. Fallback: Fetch US VIX directly if CSV is missing or broken
     print("CSV not found or unreadable. Fetching fresh US VIX data...")
@@ -38,64 +51,98 @@ def get_data():
         vix = yf.Ticker("^VIX")
         df = vix.history(start=start_date, end=end_date)
         df = df[['Close']].rename(columns={'Close': 'US_VIX'})
-        return df
+        df.index = df.index.tz_localize(None)
+        return vix_store.VixStore.from_frame(df)
     except Exception as e:
         print(f"Error fetching US VIX: {e}")
-        return pd.DataFrame()
+        return vix_store.VixStore.from_frame(pd.DataFrame())
 
-def plot_vix(df):
-    if df.empty:
-        print("No data to plot.")
-        return
+def build_outputs():
+    return [output_image]
 
-    # Filter for last 2 years
-    end_date = df.index.max()
-    start_date = end_date - timedelta(days=years_back * 365)
-    df_filtered = df.loc[start_date:end_date]
+def plot_window(store):
+    """(start, end) of the plotted window: the last `years_back` years up to the latest date."""
+    end_date = pd.Timestamp(store.last_date)
+    return end_date - timedelta(days=years_back * 365), end_date
 
-    if df_filtered.empty:
-        print("No data in the last 2 years.")
-        return
+def build_key(data):
+    """Content hash of everything plot_vix(data) depends on: plotted window, settings and this file."""
+    store = vix_store.as_store(data)
+    window = store.frame(*plot_window(store)) if not store.empty else store.frame()
+    config = {'output_image': output_image, 'years_back': years_back, 'auto_rollup': auto_rollup,
+              'shade_regimes': shade_regimes, 'bands': vix_regimes.bands,
+              'fonts': matplotlib.rcParams['font.sans-serif'], 'matplotlib': matplotlib.__version__}
+    return vix_build.stage_key(data=window, config=config, code=[__file__, vix_rollups.__file__, vix_regimes.__file__,
+                                                                  vix_store.__file__])
+
+# Line styles of the known markets; others get matplotlib's color cycle
+styles = {
+    'US_VIX': {'color': 'blue', 'label': 'US VIX (^VIX)', 'linewidth': 2.0},
+    'Japan_VIX': {'color': 'red', 'label': 'Japan VIX (Nikkei VI)', 'linewidth': 2.0, 'linestyle': '--'},
+    'Taiwan_VIX': {'color': 'green', 'label': 'Taiwan VIX (VIXTWN)', 'linewidth': 2.0}
+}
+
+def render_chart(store, start_date, end_date, output, columns=None, title='VIX Indices', window_label=None):
+    """
+    Draw one chart of `columns` (default: all) over [start_date, end_date] from a VixStore
+    and save it to `output` (format from the extension). Returns False if there was
+    nothing to draw.
+    """
+    df = store.frame(start_date, end_date, columns)
+    level = 'daily'
+    if auto_rollup:
+        # Long windows plot weekly/monthly closes, so drawing cost stays flat as history grows
+        df_filtered, level = vix_rollups.plot_frame(df, start_date, end_date, source=store.fingerprint())
+    else:
+        df_filtered = df
+
+    window_label = window_label or f'Last {years_back} Years'
+    if df_filtered.empty or df_filtered.isna().all().all():
+        print(f"No data in the {window_label.lower()}.")
+        return False
 
     # Plotting - increased figure size for better clarity
     plt.figure(figsize=(16, 8), dpi=150)  # Higher DPI for sharper image
-    
-    # Define styles for each known column
-    styles = {
-        'US_VIX': {'color': 'blue', 'label': 'US VIX (^VIX)', 'linewidth': 1.5},
-        'Japan_VIX': {'color': 'red', 'label': 'Japan VIX (Nikkei VI)', 'linewidth': 1.5, 'linestyle': '--'},
-        'Taiwan_VIX': {'color': 'green', 'label': 'Taiwan VIX (VIXTWN)', 'linewidth': 1.5}
-    }
 
     # Add Risk Zones (Background Color Bands)
     # Note: alpha controls transparency
-    plt.axhspan(0, 15, facecolor='green', alpha=0.1, label='Safe (<15)')
-    plt.axhspan(15, 20, facecolor='yellow', alpha=0.15, label='Warning (15-20)')
-    plt.axhspan(20, 30, facecolor='orange', alpha=0.15, label='Dangerous (20-30)')
-    plt.axhspan(30, 100, facecolor='red', alpha=0.1, label='Very Dangerous (>30)')
+    zone_alphas = [0.1, 0.15, 0.15, 0.1]
+    if shade_regimes:
+        # Shade the periods the market actually spent in each zone (vix_regimes)
+        labelled = set()
+        for start, end, zone in vix_regimes.regime_intervals(df, shade_regimes, start_date, end_date,
+                                                             source=store.fingerprint()):
+            label = None if zone in labelled else f'{shade_regimes} {vix_regimes.zone_names[zone]}'
+            labelled.add(zone)
+            plt.axvspan(max(pd.Timestamp(start), start_date), pd.Timestamp(end) + timedelta(days=1),
+                        facecolor=vix_regimes.zone_colors[zone], alpha=zone_alphas[zone], linewidth=0, label=label)
+    else:
+        plt.axhspan(0, 15, facecolor='green', alpha=0.1, label='Safe (<15)')
+        plt.axhspan(15, 20, facecolor='yellow', alpha=0.15, label='Warning (15-20)')
+        plt.axhspan(20, 30, facecolor='orange', alpha=0.15, label='Dangerous (20-30)')
+        plt.axhspan(30, 100, facecolor='red', alpha=0.1, label='Very Dangerous (>30)')
 
     # Add Bold Threshold Line for Very Dangerous
     plt.axhline(y=30, color='darkred', linewidth=3, linestyle='--', alpha=0.8)
-    plt.text(df_filtered.index.min(), 30.5, ' VERY DANGEROUS THRESHOLD', color='darkred', fontsize=10, fontweight='bold', va='bottom')
+    plt.text(df_filtered.dropna(how='all').index.min(), 30.5, ' VERY DANGEROUS THRESHOLD', color='darkred', fontsize=10, fontweight='bold', va='bottom')
 
     # Add 'Today' indicator
-    latest_date = df_filtered.index.max()
+    latest_date = end_date
     plt.axvline(x=latest_date, color='gray', linestyle=':', linewidth=2, label='Today')
 
     for col in df_filtered.columns:
         if col in styles:
-            # Increase linewidth to 2.0 for better visibility
-            styles[col]['linewidth'] = 2.0
             plt.plot(df_filtered.index, df_filtered[col], **styles[col])
         else:
             plt.plot(df_filtered.index, df_filtered[col], label=col, linewidth=2.0)
 
-    plt.title(f'VIX Indices (Last {years_back} Years)', fontsize=16, pad=20)
+    level_note = '' if level == 'daily' else f', {level} closes'
+    plt.title(f'{title} ({window_label}{level_note})', fontsize=16, pad=20)
     plt.xlabel('Date', fontsize=12)
     plt.ylabel('VIX Value', fontsize=12)
     
     # Set Y-axis limits to make charts look good but capture spikes
-    max_val = df_filtered.max().max()
+    max_val = store.max(start_date, end_date, columns)
     plt.ylim(0, max(40, max_val * 1.1)) # At least go up to 40 to show the red zone start
 
     plt.grid(True, which='both', linestyle='--', linewidth=0.5)
@@ -105,10 +152,23 @@ def plot_vix(df):
     
     plt.tight_layout()
 
-    # Save as SVG (vector format for perfect quality at any size)
-    plt.savefig(output_image, format='svg', bbox_inches='tight')
-    print(f"Chart saved to {output_image} (SVG vector format)")
+    # Save (SVG is vector format for perfect quality at any size)
+    plt.savefig(output, format=os.path.splitext(output)[1][1:] or 'svg', bbox_inches='tight', metadata={'Date': None})
+    plt.close()
+    return True
+
+@vix_metrics.instrument('render_svg')
+def plot_vix(data):
+    """Render the static SVG chart (all markets, last `years_back` years) from a VixStore (or merged DataFrame)."""
+    store = vix_store.as_store(data)
+    if store.empty:
+        print("No data to plot.")
+        return
+
+    start_date, end_date = plot_window(store)
+    if render_chart(store, start_date, end_date, output_image):
+        print(f"Chart saved to {output_image} (SVG vector format)")
 
 if __name__ == "__main__":
-    df = get_data()
-    plot_vix(df)
+    store = get_data()
+    plot_vix(store)
@@ -1,57 +1,163 @@
 import pandas as pd
+import plotly
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import os
 from datetime import datetime, timedelta
 import pytz
+import base64
+import numpy as np
+import vix_build
+import vix_columnar
+import vix_downsample
+import vix_metrics
+import vix_regimes
+import vix_rollups
+import vix_store
+import vix_tiles
 
 # Configuration
-csv_file = "global_vix_merged.csv"
+csv_file = vix_columnar.csv_file
+store_dir = vix_columnar.store_dir
 output_html = "vix_chart_interactive.html"
 years_back = 2
+# Compact mode: whole history, LTTB-downsampled typed-array traces, plotly.js as a shared asset file
+compact_output = True
+plotlyjs_asset = "plotly.min.js"  # Written next to output_html by plotly (include_plotlyjs='directory')
+max_points_per_series = 500  # Whole-history overview; the initial window is embedded at full resolution
+write_tiles = True  # Per-year gzip JSON tiles next to output_html, fetched by the page on zoom/pan
+tiles_dir = vix_tiles.tiles_dir
+auto_rollup = True  # Long views (and the compact overview) use the weekly/monthly rollups (vix_rollups)
+shade_regimes = None  # Market (e.g. 'US_VIX') whose actual risk-zone periods are shaded instead of static bands
 
 def get_data():
-    """Load VIX data from CSV file."""
-    if os.path.exists(csv_file):
-        print(f"Loading data from {csv_file}...")
+    """Load the plotted VIX data (whole history in compact mode) as a VixStore."""
+    if vix_columnar.store_exists(store_dir) or os.path.exists(csv_file):
+        print(f"Loading data from {store_dir if vix_columnar.store_exists(store_dir) else csv_file}...")
         try:
-            df = pd.read_csv(csv_file, index_col='Date', parse_dates=True)
-            return df
+            start = None
+            if not compact_output and vix_columnar.store_exists(store_dir):
+                start = vix_columnar.latest_date(store_dir) - np.timedelta64(years_back * 365, 'D')
+            return vix_store.VixStore.load(start=start, directory=store_dir, fallback_csv=csv_file)
         except Exception as e:
-            print(f"Error reading CSV: {e}")
-    return pd.DataFrame()
+            print(f"Error reading stored data: {e}")
+    return vix_store.VixStore.from_frame(pd.DataFrame())
 
-def plot_vix_interactive(df):
-    """Create interactive Plotly chart with zoom, pan, and hover capabilities."""
-    if df.empty:
+def typed_array(values, dtype):
+    """Plotly typed-array spec: base64-encoded binary instead of a JSON number list."""
+    arr = np.ascontiguousarray(values, dtype=dtype)
+    return {'dtype': arr.dtype.str.lstrip('<|'), 'bdata': base64.b64encode(arr.tobytes()).decode('ascii')}
+
+def compact_trace_data(series, max_points, detail_start=None, overview=None):
+    """
+    LTTB-downsample one series (or its `overview` rollup, if given) and encode x (epoch ms)
+    and y as typed arrays. Points of `series` from `detail_start` on are kept at full resolution.
+    """
+    source = series if overview is None else overview
+    x_ms = vix_tiles.epoch_ms(source.index).astype(np.float64)
+    x, y = vix_downsample.lttb(x_ms, source.to_numpy(dtype=np.float64), max_points)
+    if detail_start is not None:
+        detail = series[series.index >= detail_start].dropna()
+        cut = vix_tiles.epoch_ms(detail.index[:1])[0] if len(detail) else np.inf
+        keep = x < cut
+        x = np.concatenate([x[keep], vix_tiles.epoch_ms(detail.index).astype(np.float64)])
+        y = np.concatenate([y[keep], detail.to_numpy(dtype=np.float64)])
+    return typed_array(x, 'f8'), typed_array(y, 'f4')
+
+def build_outputs():
+    outputs = [output_html]
+    if compact_output:
+        outputs.append(os.path.join(os.path.dirname(output_html), plotlyjs_asset))
+        if write_tiles:
+            outputs.append(os.path.join(os.path.dirname(output_html), tiles_dir, vix_tiles.index_file))
+    return outputs
+
+def build_key(data):
+    """Content hash of everything plot_vix_interactive(data) depends on: data, settings and code."""
+    store = vix_store.as_store(data)
+    start = None
+    if not compact_output and not store.empty:
+        start = pd.Timestamp(store.last_date) - timedelta(days=years_back * 365)
+    data = store.frame(start)
+    config = {'output_html': output_html, 'years_back': years_back, 'compact_output': compact_output,
+              'max_points_per_series': max_points_per_series, 'write_tiles': write_tiles,
+              'tiles_dir': tiles_dir, 'tile_levels': vix_tiles.tile_levels, 'auto_rollup': auto_rollup,
+              'shade_regimes': shade_regimes, 'bands': vix_regimes.bands,
+              'plotly': plotly.__version__}
+    return vix_build.stage_key(data=data, config=config,
+                               code=[__file__, vix_downsample.__file__, vix_tiles.__file__, vix_rollups.__file__,
+                                     vix_regimes.__file__, vix_store.__file__])
+
+@vix_metrics.instrument('render_html')
+def plot_vix_interactive(data, compact=None):
+    """
+    Create interactive Plotly chart with zoom, pan, and hover capabilities.
+    In compact mode the chart covers the whole history (initially zoomed to the last
+    `years_back` years): older data is an LTTB overview of `max_points_per_series`
+    points per series, everything is stored as binary typed arrays, and plotly.js is
+    loaded from a shared asset file. With `write_tiles`, per-year tiles are exported
+    next to the page, which swaps them in for whatever window is on screen.
+    `data` is a VixStore or a merged DataFrame.
+    """
+    compact = compact_output if compact is None else compact
+    store = vix_store.as_store(data)
+    if store.empty:
         print("No data to plot.")
         return
 
     # Filter for last 2 years
-    end_date = df.index.max()
+    end_date = pd.Timestamp(store.last_date)
     start_date = end_date - timedelta(days=years_back * 365)
-    df_filtered = df.loc[start_date:end_date]
+    df_filtered = store.frame(start_date, end_date)
+    df = store.frame() if compact else df_filtered
 
     if df_filtered.empty:
         print("No data in the last 2 years.")
         return
 
+    df_plot = df if compact else df_filtered
+    overview = None
+    if auto_rollup and compact:
+        # Older history is summarized from the rollup level that fits the whole span
+        overview, level = vix_rollups.plot_frame(df, df.index.min(), end_date, source=store.fingerprint())
+        overview = None if level == 'daily' else overview
+    elif auto_rollup:
+        df_plot, _ = vix_rollups.plot_frame(df, start_date, end_date, source=store.fingerprint())
+
     # Create figure
     fig = go.Figure()
 
     # Add risk zone backgrounds
-    fig.add_hrect(y0=0, y1=15, fillcolor="green", opacity=0.1,
-                  layer="below", line_width=0,
-                  annotation_text="Safe Zone (<15)", annotation_position="top left")
-    fig.add_hrect(y0=15, y1=20, fillcolor="yellow", opacity=0.15,
-                  layer="below", line_width=0,
-                  annotation_text="Warning (15-20)", annotation_position="top left")
-    fig.add_hrect(y0=20, y1=30, fillcolor="orange", opacity=0.15,
-                  layer="below", line_width=0,
-                  annotation_text="Dangerous (20-30)", annotation_position="top left")
-    fig.add_hrect(y0=30, y1=100, fillcolor="red", opacity=0.1,
-                  layer="below", line_width=0,
-                  annotation_text="Very Dangerous (>30)", annotation_position="top left")
+    if shade_regimes:
+        # Shade the periods the market actually spent in each zone (vix_regimes): one filled
+        # trace per zone with a rectangle per interval, far cheaper than a layout shape each
+        zone_opacity = [0.1, 0.15, 0.15, 0.1]
+        plot_start = df_plot.index.min()
+        rects = {zone: ([], []) for zone in range(len(vix_regimes.zone_names))}
+        for start, end, zone in vix_regimes.regime_intervals(df, shade_regimes, plot_start, end_date,
+                                                             source=store.fingerprint()):
+            x0, x1 = max(pd.Timestamp(start), plot_start), pd.Timestamp(end) + timedelta(days=1)
+            rects[zone][0].extend([x0, x0, x1, x1, x0, None])
+            rects[zone][1].extend([0, 100, 100, 0, 0, None])
+        for zone, (xs, ys) in rects.items():
+            if xs:
+                fig.add_trace(go.Scatter(
+                    x=xs, y=ys, mode='lines', fill='toself', line_width=0, hoverinfo='skip',
+                    fillcolor=vix_regimes.zone_colors[zone], opacity=zone_opacity[zone],
+                    name=f'{shade_regimes} {vix_regimes.zone_names[zone]}'))
+    else:
+        fig.add_hrect(y0=0, y1=15, fillcolor="green", opacity=0.1,
+                      layer="below", line_width=0,
+                      annotation_text="Safe Zone (<15)", annotation_position="top left")
+        fig.add_hrect(y0=15, y1=20, fillcolor="yellow", opacity=0.15,
+                      layer="below", line_width=0,
+                      annotation_text="Warning (15-20)", annotation_position="top left")
+        fig.add_hrect(y0=20, y1=30, fillcolor="orange", opacity=0.15,
+                      layer="below", line_width=0,
+                      annotation_text="Dangerous (20-30)", annotation_position="top left")
+        fig.add_hrect(y0=30, y1=100, fillcolor="red", opacity=0.1,
+                      layer="below", line_width=0,
+                      annotation_text="Very Dangerous (>30)", annotation_position="top left")
 
     # Add threshold line at 30
     fig.add_hline(y=30, line_dash="dash", line_color="darkred", line_width=3,
@@ -68,14 +174,20 @@ def plot_vix_interactive(df):
     }
 
     # Add VIX lines
-    for col in df_filtered.columns:
+    for col in df_plot.columns:
         if col in line_configs:
             config = line_configs[col]
+            if compact:
+                x, y = compact_trace_data(df_plot[col], max_points_per_series, detail_start=start_date,
+                                          overview=None if overview is None else overview.get(col))
+            else:
+                x, y = df_plot.index, df_plot[col]
             fig.add_trace(go.Scatter(
-                x=df_filtered.index,
-                y=df_filtered[col],
+                x=x,
+                y=y,
                 mode='lines',
                 name=config['name'],
+                meta=col,
                 line=dict(
                     color=config['color'],
                     width=config['width'],
@@ -88,7 +200,7 @@ def plot_vix_interactive(df):
             ))
 
     # Add vertical line for today
-    latest_date = df_filtered.index.max()
+    latest_date = end_date
     fig.add_vline(x=latest_date, line_dash="dot", line_color="gray", line_width=2)
 
     # Get timestamp
@@ -98,12 +210,13 @@ def plot_vix_interactive(df):
     # Update layout
     fig.update_layout(
         title=dict(
-            text=f'VIX Indices (Last {years_back} Years)<br><sub>Generated: {timestamp}</sub>',
+            text=(f'VIX Indices ({df_plot.index.min():%Y}-{df_plot.index.max():%Y}, showing last {years_back} years)' if compact
+                  else f'VIX Indices (Last {years_back} Years)') + f'<br><sub>Generated: {timestamp}</sub>',
             font=dict(size=20)
         ),
         xaxis_title='Date',
         yaxis_title='VIX Value',
-        yaxis=dict(range=[0, max(40, df_filtered.max().max() * 1.1)]),
+        yaxis=dict(range=[0, max(40, store.max(start_date, end_date) * 1.1)]),
         hovermode='x unified',
         template='plotly_white',
         height=600,
@@ -132,6 +245,7 @@ def plot_vix_interactive(df):
                 activecolor="lightblue"
             ),
             rangeslider=dict(visible=True, thickness=0.05),
+            range=[start_date, end_date] if compact else None,
             type="date"
         )
     )
@@ -141,8 +255,14 @@ def plot_vix_interactive(df):
     fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='LightGray')
 
     # Save as interactive HTML
+    tiles = compact and write_tiles
+    if tiles:
+        vix_tiles.write_tiles(df_plot, os.path.join(os.path.dirname(output_html), tiles_dir))
+
     fig.write_html(
         output_html,
+        include_plotlyjs='directory' if compact else True,
+        post_script=vix_tiles.loader_script(tiles_dir) if tiles else None,
         config={
             'displayModeBar': True,
             'displaylogo': False,
@@ -165,5 +285,5 @@ def plot_vix_interactive(df):
     print(f"  - Hover: See exact values")
 
 if __name__ == "__main__":
-    df = get_data()
-    plot_vix_interactive(df)
+    store = get_data()
+    plot_vix_interactive(store)
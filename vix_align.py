@@ -0,0 +1,175 @@
+"""
+Single-pass k-way alignment of per-market series onto one date calendar.
+
+Joining markets one at a time (`merged.join(df, how='outer')` in a loop) rebuilds
+the index and copies every earlier column on each join: O(k^2 * n) for k markets.
+`align` does the job in one pass instead. It builds the union calendar once from
+all the date arrays. For daily data that means marking each market's days in a
+presence array over the span, with no sort. The same pass gives every observation
+its row, so each market is scattered straight into its row of one preallocated
+(markets x dates) matrix. The cost is O(k * n).
+
+Per-market trading calendars and a forward-fill policy decide what fills the dates
+a market has no value for:
+
+    'none'      leave them NaN (an outer join; what the store keeps)
+    'calendar'  carry the last value onto the market's own trading days that lack
+                one (feed gaps), keeping its holidays NaN. Needs a calendar for the
+                market; without one, its observed dates are its trading days, so
+                nothing is filled.
+    'all'       carry the last value onto every later date (as-of values, e.g. for
+                cross-market comparisons)
+
+`fill_limit` (days) caps how far a value is carried. Policies can be given per market.
+
+Usage:
+    dates, values = vix_align.align({'US_VIX': (us_dates, us_values), ...})
+    df = vix_align.align_frames(frames, calendars={'Taiwan_VIX': taifex_days}, fill='calendar')
+"""
+import numpy as np
+import pandas as pd
+
+# Configuration
+default_fill = 'none'
+fill_limit = None  # Max days a value is carried forward (None = unlimited)
+fill_policies = ('none', 'calendar', 'all')
+max_bucket_days = 200 * 366  # Widest date span aligned by day buckets rather than sorting
+
+
+def _day_buckets(days):
+    """(calendar days, positions) by marking days in a presence array: no sort, O(n + days spanned)."""
+    first = days.min()
+    offset = days - first
+    present = np.zeros(int(offset.max()) + 1, dtype=bool)
+    present[offset] = True
+    return np.flatnonzero(present) + first, (np.cumsum(present) - 1)[offset]
+
+
+def _sorted_unique(dates):
+    """(calendar, positions) from a stable argsort, which merges already-sorted runs like a k-way merge."""
+    keys = dates.view(np.int64)
+    order = np.argsort(keys, kind='stable')
+    ordered = keys[order]
+    first = np.empty(len(ordered), dtype=bool)
+    first[0] = True
+    np.not_equal(ordered[1:], ordered[:-1], out=first[1:])
+    positions = np.empty(len(keys), dtype=np.intp)
+    positions[order] = np.cumsum(first) - 1
+    return dates[order[first]], positions
+
+
+def union_calendar(date_arrays, positions=False):
+    """
+    Sorted unique union of several date arrays. With `positions`, also returns where
+    each input date landed in it (one index array per input).
+
+    Daily data (every date at midnight, spanning a sane range) goes through a
+    presence array over the days spanned: one pass, no sort. Anything else is
+    merged with a stable argsort.
+    """
+    date_arrays = [np.asarray(d) for d in date_arrays]
+    if not any(len(d) for d in date_arrays):
+        calendar = np.array([], dtype='datetime64[ns]')
+        return (calendar, [np.array([], dtype=np.intp) for _ in date_arrays]) if positions else calendar
+    dates = np.concatenate(date_arrays)
+    day_ticks = np.timedelta64(1, 'D') // np.timedelta64(1, np.datetime_data(dates.dtype)[0])
+    days, remainder = np.divmod(dates.view(np.int64), day_ticks)
+    if not remainder.any() and days.max() - days.min() <= max_bucket_days:
+        calendar, where = _day_buckets(days)
+        calendar = (calendar * day_ticks).view(dates.dtype)
+    else:
+        calendar, where = _sorted_unique(dates)
+    if not positions:
+        return calendar
+    return calendar, np.split(where, np.cumsum([len(d) for d in date_arrays])[:-1])
+
+
+def forward_fill(values, dates=None, limit=None, where=None):
+    """
+    Carry the last non-NaN value forward over NaNs (vectorized). With `dates` and
+    `limit` (days), a value is not carried further than `limit` days. With `where`
+    (a boolean mask), only those positions are filled.
+    """
+    valid = ~np.isnan(values)
+    source = np.where(valid, np.arange(len(values)), -1)
+    np.maximum.accumulate(source, out=source)
+    fill = ~valid & (source >= 0)
+    if where is not None:
+        fill &= where
+    if limit is not None and dates is not None:
+        age = (dates - dates[np.maximum(source, 0)]) / np.timedelta64(1, 'D')
+        fill &= age <= limit
+    out = values.copy()
+    out[fill] = values[source[fill]]
+    return out
+
+
+def _policy(fill, column):
+    policy = fill.get(column, default_fill) if isinstance(fill, dict) else (fill or default_fill)
+    if policy not in fill_policies:
+        raise ValueError(f"Unknown fill policy for {column}: {policy!r} (expected one of {', '.join(fill_policies)})")
+    return policy
+
+
+def align(series, calendar=None, calendars=None, fill=None, limit=fill_limit, dtype=np.float64):
+    """
+    Align {column: (dates, values)} onto one calendar.
+
+    calendar   sorted dates to align onto; by default the union of every market's dates
+               (observations off an explicit calendar are dropped)
+    calendars  {column: trading dates}; used by the 'calendar' fill policy
+    fill       a policy name, or {column: policy} (see the module docstring)
+    limit      max days to carry a value forward
+
+    Returns (dates, matrix): matrix[i] holds the i-th column's values, in input order.
+    """
+    calendars = calendars or {}
+    market_dates = [np.asarray(d) for d, _ in series.values()]
+    if calendar is None:
+        dates, positions = union_calendar(market_dates, positions=True)
+    else:
+        dates = np.asarray(calendar)
+        positions = []
+        for d in market_dates:
+            pos = np.searchsorted(dates, d)
+            on_calendar = pos < len(dates)
+            on_calendar[on_calendar] = dates[pos[on_calendar]] == d[on_calendar]
+            positions.append(np.where(on_calendar, pos, -1))
+
+    matrix = np.full((len(series), len(dates)), np.nan, dtype=dtype)
+    for row, col, (_, values), pos in zip(matrix, series, series.values(), positions):
+        keep = pos >= 0
+        row[pos[keep]] = np.asarray(values)[keep]
+
+        policy = _policy(fill, col)
+        if policy == 'all':
+            row[:] = forward_fill(row, dates, limit)
+        elif policy == 'calendar' and col in calendars:
+            trading = np.isin(dates, np.asarray(calendars[col], dtype=dates.dtype))
+            row[:] = forward_fill(row, dates, limit, where=trading)
+    return dates, matrix
+
+
+def _frame_series(frames):
+    """{column: (dates, values)} from Date-indexed frames; a column may come from only one frame."""
+    series = {}
+    for df in frames:
+        for col in df.columns:
+            if col in series:
+                raise ValueError(f"Column {col} is provided by more than one frame")
+            series[col] = (df.index.values, df[col].to_numpy(dtype=np.float64))
+    return series
+
+
+def align_frames(frames, calendar=None, calendars=None, fill=None, limit=fill_limit, dtype=np.float64):
+    """
+    Align Date-indexed frames (a list, or {name: frame}) into one Date-indexed frame.
+    This replaces the chain of outer joins. Empty frames are skipped; see `align`
+    for the other arguments.
+    """
+    frames = [df for df in (frames.values() if isinstance(frames, dict) else frames) if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    series = _frame_series(frames)
+    dates, matrix = align(series, calendar, calendars, fill, limit, dtype)
+    return pd.DataFrame(matrix.T, index=pd.DatetimeIndex(dates, name=frames[0].index.name), columns=list(series))
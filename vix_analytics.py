@@ -0,0 +1,314 @@
+"""
+Rolling analytics over the merged VIX dataset, maintained incrementally.
+
+For every market column M of the merged frame:
+    M_pctile     percentile rank (0-100) of the close within its trailing `percentile_window` closes
+    M_zscore     (close - rolling mean) / rolling std over `zscore_window` closes
+    M_realized   annualized realized volatility (%) of the market's underlying index
+                 over `realized_window` daily log returns (see `underlying_symbols`)
+    M_spread     implied minus realized: M - M_realized
+and for every pair of markets A, B:
+    corr_A_B     rolling correlation of daily log changes over `correlation_window` common days
+
+Windows count each market's own observations, so different holiday calendars don't
+leave gaps. Everything is computed with NumPy sliding windows.
+
+Results are kept in `global_vix_analytics/`, a columnar store in the same format as the
+main store (see vix_columnar). `state.json` records the windows and the last
+`tail_rows` input rows. `update` compares the merged frame with that tail and computes
+only the rows from the first new or revised date on, using just the preceding window
+of observations as context. Appending a day therefore costs O(window), not a full
+recompute. A change of windows or markets triggers a full rebuild.
+
+Usage:
+    python vix_analytics.py update    # bring the analytics up to date with the store
+    python vix_analytics.py rebuild   # recompute everything
+    python vix_analytics.py show      # latest values
+"""
+import itertools
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import vix_cache
+import vix_columnar
+import vix_http
+import vix_metrics
+
+# Configuration
+analytics_dir = "global_vix_analytics"
+state_file = "state.json"
+percentile_window = 252  # ~1 trading year
+zscore_window = 63  # ~3 months
+realized_window = 21  # ~1 month, the horizon VIX-style indices imply
+correlation_window = 63
+trading_days = 252
+tail_rows = 64  # Input rows remembered to detect revisions (collectors re-fetch a 7-day overlap)
+underlying_symbols = {
+    'US_VIX': '^GSPC',
+    'Japan_VIX': '^N225',
+    'Taiwan_VIX': '^TWII',
+}
+
+
+def windows():
+    return {'percentile': percentile_window, 'zscore': zscore_window,
+            'realized': realized_window, 'correlation': correlation_window}
+
+
+def _windowed(values, window):
+    return np.lib.stride_tricks.sliding_window_view(values, window)
+
+
+def rolling_percentile(values, window):
+    """Percent of the trailing `window` values <= each value (NaN until the window fills)."""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        w = _windowed(values, window)
+        out[window - 1:] = np.count_nonzero(w <= w[:, -1:], axis=1) * (100.0 / window)
+    return out
+
+
+def rolling_zscore(values, window):
+    """(value - trailing mean) / trailing sample std (NaN until the window fills)."""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        w = _windowed(values, window)
+        std = w.std(axis=1, ddof=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[window - 1:] = np.where(std > 0, (values[window - 1:] - w.mean(axis=1)) / std, np.nan)
+    return out
+
+
+def realized_volatility(closes, window):
+    """Annualized % volatility of log returns over the trailing `window` returns."""
+    out = np.full(len(closes), np.nan)
+    returns = np.diff(np.log(closes))
+    if len(returns) >= window:
+        out[window:] = _windowed(returns, window).std(axis=1, ddof=1) * np.sqrt(trading_days) * 100
+    return out
+
+
+def rolling_correlation(a, b, window):
+    """Pearson correlation of a and b over trailing windows (NaN until the window fills)."""
+    out = np.full(len(a), np.nan)
+    if len(a) >= window:
+        wa, wb = _windowed(a, window), _windowed(b, window)
+        da = wa - wa.mean(axis=1, keepdims=True)
+        db = wb - wb.mean(axis=1, keepdims=True)
+        den = np.sqrt((da * da).sum(axis=1) * (db * db).sum(axis=1))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[window - 1:] = np.where(den > 0, (da * db).sum(axis=1) / den, np.nan)
+    return out
+
+
+def _log_changes(df):
+    return {col: np.log(df[col].dropna()).diff().dropna() for col in df.columns}
+
+
+def compute(df, underlying=None, start=None):
+    """
+    All metrics for the rows of a Date-indexed merged frame, optionally only from `start` on.
+    `underlying` maps a market column to its underlying index closes (a Date-indexed Series).
+    """
+    underlying = underlying or {}
+    out = {}
+    for col in df.columns:
+        series = df[col].dropna()
+        values = series.to_numpy(dtype=np.float64)
+        out[f'{col}_pctile'] = pd.Series(rolling_percentile(values, percentile_window), index=series.index)
+        out[f'{col}_zscore'] = pd.Series(rolling_zscore(values, zscore_window), index=series.index)
+        closes = underlying.get(col)
+        if closes is not None and not closes.empty:
+            realized = pd.Series(realized_volatility(closes.to_numpy(dtype=np.float64), realized_window),
+                                 index=closes.index)
+            realized = realized.reindex(series.index, method='ffill', limit=3)
+            out[f'{col}_realized'] = realized
+            out[f'{col}_spread'] = series - realized
+
+    changes = _log_changes(df)
+    for a, b in itertools.combinations(df.columns, 2):
+        pair = pd.concat([changes[a], changes[b]], axis=1, join='inner')
+        corr = rolling_correlation(pair.iloc[:, 0].to_numpy(), pair.iloc[:, 1].to_numpy(), correlation_window)
+        out[f'corr_{a}_{b}'] = pd.Series(corr, index=pair.index)
+
+    result = pd.DataFrame(out).reindex(df.index)
+    result.index.name = vix_columnar.date_column
+    return result if start is None else result.loc[start:]
+
+
+def context_start(df, start):
+    """Earliest date of `df` needed to compute every metric for the rows from `start` on."""
+    before = (df.index < start)
+    candidates = [pd.Timestamp(start)]
+    need = max(percentile_window, zscore_window)
+    valid = {col: df[col].notna().to_numpy() for col in df.columns}
+    for col in df.columns:
+        dates = df.index[before & valid[col]]
+        if len(dates):
+            candidates.append(dates[-min(need, len(dates))])
+    for a, b in itertools.combinations(df.columns, 2):
+        common = df.index[before & valid[a] & valid[b]]
+        if not len(common):
+            continue
+        first = common[-min(correlation_window, len(common))]
+        candidates.append(first)
+        # Each log change also needs the market's own previous observation
+        for col in (a, b):
+            previous = df.index[(df.index < first) & valid[col]]
+            if len(previous):
+                candidates.append(previous[-1])
+    return min(candidates)
+
+
+def fetch_underlying(columns, start, end):
+    """Underlying index closes per market column via yfinance, through the response cache."""
+    import yfinance as yf  # Imported lazily: only needed when realized volatility is refreshed
+
+    start = pd.Timestamp(start).strftime('%Y-%m-%d')
+    end = (pd.Timestamp(end) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')  # yfinance `end` is exclusive
+    settled = pd.Timestamp(end) <= pd.Timestamp.now().normalize()
+    wanted = [(col, underlying_symbols[col]) for col in columns if col in underlying_symbols]
+
+    def fetch(item):
+        _, symbol = item
+        return vix_cache.cached_call(f"yfinance:{symbol}:history:{start}:{end}",
+                                     lambda: yf.Ticker(symbol).history(start=start, end=end),
+                                     immutable=settled)
+
+    closes = {}
+    for (col, symbol), (df, error) in zip(wanted, vix_http.fetch_all(wanted, fetch)):
+        if error is not None or df is None or df.empty:
+            print(f"  No underlying data for {col} ({symbol}): {error or 'empty response'}")
+            continue
+        series = df['Close'].astype(float)
+        if series.index.tz is not None:
+            series.index = series.index.tz_localize(None)
+        series.index = series.index.normalize()
+        closes[col] = series[~series.index.duplicated(keep='last')].sort_index()
+    return closes
+
+
+def _state_path(directory):
+    return os.path.join(directory, state_file)
+
+
+def read_state(directory=analytics_dir):
+    path = _state_path(directory)
+    if not vix_columnar.store_exists(directory) or not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_state(directory, df, realized):
+    tail = df.tail(tail_rows)
+    state = {
+        'windows': windows(),
+        'underlying': underlying_symbols,
+        'realized': sorted(realized),
+        'columns': list(df.columns),
+        'first': df.index[0].strftime('%Y-%m-%d'),
+        'last': df.index[-1].strftime('%Y-%m-%d'),
+        'inputs': {
+            'dates': [d.strftime('%Y-%m-%d') for d in tail.index],
+            'values': {col: [None if np.isnan(v) else v for v in vix_columnar.canonicalize(tail[col]).tolist()]
+                       for col in df.columns},
+        },
+    }
+    vix_columnar._write_json(_state_path(directory), state)
+
+
+def pending_start(df, state):
+    """
+    Where an update has to start: None for a full rebuild, NaT if nothing changed,
+    else the first new or revised date.
+    """
+    if (state is None or state['windows'] != windows() or state['underlying'] != underlying_symbols
+            or state['columns'] != list(df.columns) or df.index[0].strftime('%Y-%m-%d') != state['first']):
+        return None
+
+    inputs = state['inputs']
+    tail_dates = pd.DatetimeIndex(pd.to_datetime(inputs['dates']))
+    current = vix_columnar.canonicalize(df.reindex(tail_dates)[state['columns']].to_numpy(dtype=np.float64))
+    recorded = np.array([[np.nan if v is None else v for v in inputs['values'][col]]
+                         for col in state['columns']], dtype=np.float64).T
+    same = (current == recorded) | (np.isnan(current) & np.isnan(recorded))
+    revised = tail_dates[~same.all(axis=1)]
+    new = df.index[df.index > pd.Timestamp(state['last'])]
+
+    starts = [d for d in (revised.min() if len(revised) else None, new.min() if len(new) else None) if d is not None]
+    return min(starts) if starts else pd.NaT
+
+
+@vix_metrics.instrument('analytics')
+def update(df, directory=analytics_dir, full=False, underlying=None):
+    """
+    Bring the analytics store up to date with the merged frame `df`.
+    `underlying` overrides the yfinance fetch ({market: closes}); returns the rows written.
+    """
+    df = df.sort_index()
+    if df.empty:
+        print("  No data for analytics.")
+        return pd.DataFrame()
+
+    state = None if full else read_state(directory)
+    start = None if state is None else pending_start(df, state)
+    if start is pd.NaT:
+        print("  Analytics up to date.")
+        return pd.DataFrame()
+
+    fetch = underlying is None
+    context = df if start is None else df.loc[context_start(df, start):]
+    if fetch:
+        underlying = _fetch_for(context, df)
+    if start is not None and set(underlying) - set(state.get('realized', [])):
+        # Realized vol just became available for a market: its history needs backfilling
+        print(f"  Underlying data now available for {sorted(set(underlying) - set(state['realized']))}")
+        start, context = None, df
+        if fetch:
+            underlying = _fetch_for(context, df)
+
+    result = compute(context, underlying, start=start)
+    if start is None:
+        print(f"  Rebuilding analytics: {len(result)} rows x {len(result.columns)} metrics")
+        vix_columnar.write_store(result, directory)
+        realized = set(underlying)
+    else:
+        print(f"  Updating analytics from {start:%Y-%m-%d}: {len(result)} rows "
+              f"(context {len(context)} of {len(df)} rows)")
+        vix_columnar.append_rows(result, directory)
+        # Only markets fetched this run: rows appended without realized vol are backfilled
+        # by the rebuild once their underlying is available again
+        realized = set(underlying)
+    _write_state(directory, df, realized)
+    return result
+
+
+def _fetch_for(context, df):
+    # Enough underlying history before the context to fill the realized-vol window
+    fetch_from = context.index[0] - pd.Timedelta(days=realized_window * 2 + 14)
+    return fetch_underlying(df.columns, fetch_from, df.index[-1])
+
+
+def load_analytics(columns=None, start=None, end=None, directory=analytics_dir):
+    """Load stored analytics (a column/date-range slice) as a Date-indexed DataFrame."""
+    if not vix_columnar.store_exists(directory):
+        return pd.DataFrame()
+    return vix_columnar.read_store(directory, columns, start, end)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'update'
+    if command in ('update', 'rebuild'):
+        update(vix_columnar.load_merged(), full=command == 'rebuild')
+    elif command == 'show':
+        latest = load_analytics().ffill().tail(1)
+        for col in latest.columns:
+            print(f"  {col:<32} {latest[col].iloc[0]:10.4f}")
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,88 @@
+"""
+Content-hash build manifest: skip render stages whose inputs have not changed.
+
+Each stage is described by a key, the sha256 of everything its output depends on:
+the data slice it draws, its style/config settings and the source of the code that
+renders it. `build_manifest.json` records, per stage, the last key plus a hash of each
+output file. A stage is current when the key matches and the outputs on disk are the
+ones it wrote, so a day with no new data re-renders nothing and commits nothing.
+
+    key = vix_build.stage_key(data=df_slice, config={...}, code=[__file__])
+    if not vix_build.is_current('svg', key, ['vix_chart.svg']):
+        render()
+        vix_build.record('svg', key, ['vix_chart.svg'])
+"""
+import hashlib
+import json
+import os
+
+# Configuration
+manifest_file = "build_manifest.json"
+
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def data_hash(df):
+    """Hash of a DataFrame's index, columns and values (NaN-stable, dtype-aware)."""
+    import pandas as pd
+    h = hashlib.sha256()
+    h.update(json.dumps([str(c) for c in df.columns]).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def stage_key(data=None, config=None, code=()):
+    """Combine a data slice (DataFrame or JSON-able), config dict and code files into one key."""
+    h = hashlib.sha256()
+    if data is not None:
+        h.update(data_hash(data).encode('ascii') if hasattr(data, 'columns')
+                 else json.dumps(data, sort_keys=True, default=str).encode('utf-8'))
+    h.update(json.dumps(config or {}, sort_keys=True, default=str).encode('utf-8'))
+    for path in code:
+        h.update(os.path.basename(path).encode('utf-8'))
+        h.update(_file_sha256(path).encode('ascii'))
+    return h.hexdigest()
+
+
+def load_manifest(path=None):
+    path = path or manifest_file
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def is_current(stage, key, outputs, path=None):
+    """True if `stage` last ran with `key` and its outputs are unchanged since."""
+    entry = load_manifest(path).get(stage)
+    if not entry or entry.get('key') != key:
+        return False
+    recorded = entry.get('outputs', {})
+    for output in outputs:
+        if not os.path.exists(output) or recorded.get(output) != _file_sha256(output):
+            return False
+    return True
+
+
+def record(stage, key, outputs, path=None):
+    """Store `key` and the current output hashes for `stage`."""
+    path = path or manifest_file
+    manifest = load_manifest(path)
+    manifest[stage] = {
+        'key': key,
+        'outputs': {output: _file_sha256(output) for output in outputs if os.path.exists(output)},
+    }
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp, path)
@@ -0,0 +1,217 @@
+"""
+Persistent on-disk cache for raw source responses.
+
+Entries are keyed by request (method, URL and form data) and stored under `cache_dir`
+as a body file plus a small JSON metadata file. Rules:
+  - Entries stored as immutable (e.g. closed TAIFEX months) are served without revalidation.
+  - Other entries are revalidated with ETag/Last-Modified once older than their TTL.
+  - Total size is bounded by `max_cache_bytes`; least recently used entries are evicted first.
+  - In offline mode everything is served from the cache and misses return None.
+
+Usage:
+    python vix_cache.py stats
+    python vix_cache.py evict [--max-mb N]
+    python vix_cache.py clear
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+
+import vix_metrics
+
+# Configuration
+cache_dir = os.environ.get('VIX_CACHE_DIR', '.vix_cache')
+max_cache_bytes = 256 * 1024 * 1024
+default_ttl = 6 * 3600  # Seconds before a mutable entry is revalidated
+offline = os.environ.get('VIX_OFFLINE', '') not in ('', '0')
+
+
+def cache_key(method, url, data=None):
+    raw = json.dumps([method.upper(), url, sorted((data or {}).items())])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _paths(key):
+    folder = os.path.join(cache_dir, key[:2])
+    return os.path.join(folder, key + '.body'), os.path.join(folder, key + '.json')
+
+
+def _read(key):
+    body_path, meta_path = _paths(key)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+    except (OSError, ValueError):
+        return None, None
+    # Touch the body so eviction sees this entry as recently used
+    try:
+        os.utime(body_path, None)
+    except OSError:
+        pass
+    return meta, body
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write(key, meta, body=None):
+    body_path, meta_path = _paths(key)
+    os.makedirs(os.path.dirname(body_path), exist_ok=True)
+    if body is not None:
+        _write_atomic(body_path, body)
+        meta['size'] = len(body)
+    _write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+
+
+def _is_fresh(meta, immutable, ttl):
+    if meta.get('immutable'):
+        return True
+    if immutable:
+        # Stored while still mutable: revalidate once before trusting it forever
+        return False
+    return time.time() - meta.get('fetched_at', 0) < ttl
+
+
+def fetch(url, method='GET', data=None, immutable=False, ttl=None, timeout=30):
+    """
+    Fetch `url` through the cache and return the response body as bytes, or None
+    if the server did not return 200 (or, offline, if the entry is not cached).
+    Network errors propagate as requests exceptions.
+    """
+    ttl = default_ttl if ttl is None else ttl
+    key = cache_key(method, url, data)
+    meta, body = _read(key)
+
+    if meta is not None and (offline or _is_fresh(meta, immutable, ttl)):
+        vix_metrics.count('cache_hits')
+        return body
+    vix_metrics.count('cache_misses')
+    if offline:
+        return None
+
+    import vix_http
+    headers = {}
+    if meta is not None:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    response = vix_http.request(method, url, data=data, headers=headers, timeout=timeout)
+
+    if response.status_code == 304 and meta is not None:
+        vix_metrics.count('cache_revalidated')
+        meta['fetched_at'] = time.time()
+        meta['immutable'] = bool(immutable)
+        _write(key, meta)
+        return body
+    if response.status_code != 200:
+        return None
+
+    meta = {
+        'url': url,
+        'method': method.upper(),
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'fetched_at': time.time(),
+        'immutable': bool(immutable),
+    }
+    _write(key, meta, response.content)
+    return response.content
+
+
+def cached_call(name, fn, immutable=False, ttl=None):
+    """
+    Memoize a non-HTTP source call (e.g. a yfinance history request) on disk.
+    The result is pickled; in offline mode a miss returns None without calling `fn`.
+    """
+    ttl = default_ttl if ttl is None else ttl
+    key = cache_key('CALL', name)
+    meta, body = _read(key)
+    if meta is not None and (offline or _is_fresh(meta, immutable, ttl)):
+        try:
+            result = pickle.loads(body)
+            vix_metrics.count('cache_hits')
+            return result
+        except Exception:
+            pass
+    vix_metrics.count('cache_misses')
+    if offline:
+        return None
+
+    result = fn()
+    meta = {'url': name, 'method': 'CALL', 'fetched_at': time.time(), 'immutable': bool(immutable)}
+    _write(key, meta, pickle.dumps(result))
+    return result
+
+
+def _entries():
+    if not os.path.isdir(cache_dir):
+        return []
+    entries = []
+    for folder in os.listdir(cache_dir):
+        folder_path = os.path.join(cache_dir, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for name in os.listdir(folder_path):
+            if name.endswith('.body'):
+                path = os.path.join(folder_path, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, name[:-len('.body')]))
+    return entries
+
+
+def evict(max_bytes=None):
+    """Remove least recently used entries until the cache fits in `max_bytes`. Returns bytes freed."""
+    max_bytes = max_cache_bytes if max_bytes is None else max_bytes
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+    freed = 0
+    for _, size, key in entries:
+        if total <= max_bytes:
+            break
+        for path in _paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= size
+        freed += size
+    return freed
+
+
+def clear():
+    return evict(0)
+
+
+def stats():
+    entries = _entries()
+    return {'entries': len(entries), 'bytes': sum(size for _, size, _ in entries)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the local VIX source cache.")
+    parser.add_argument('command', choices=['stats', 'evict', 'clear'])
+    parser.add_argument('--max-mb', type=float, default=None, help="Size bound for evict (default from config)")
+    args = parser.parse_args()
+
+    if args.command == 'stats':
+        info = stats()
+        print(f"{cache_dir}: {info['entries']} entries, {info['bytes'] / 1024 / 1024:.2f} MB")
+    elif args.command == 'evict':
+        limit = None if args.max_mb is None else int(args.max_mb * 1024 * 1024)
+        print(f"Freed {evict(limit) / 1024 / 1024:.2f} MB")
+    else:
+        print(f"Freed {clear() / 1024 / 1024:.2f} MB")
@@ -0,0 +1,191 @@
+"""
+Batch rendering of static charts: one per (market, window), plus comparisons.
+
+A chart spec is a dict:
+
+    {'name': 'US_VIX_1y', 'columns': ['US_VIX'], 'window': '1y', 'title': 'US VIX (^VIX)'}
+
+`default_specs` gives every market over every window in `chart_windows`, plus one
+all-markets comparison per window. `render_batch` renders a list of specs into
+`charts_dir` with a process pool, drawing each one with visualize_vix.render_chart.
+
+matplotlib is CPU-bound and holds the GIL, so a batch of dozens of charts is spread over
+processes:
+
+    - The dataset is written once to a snapshot directory (Date.npy plus one .npy per
+      market). Each worker memory-maps it when it starts, so no data is pickled per
+      task; a task is just its spec.
+    - Each worker imports matplotlib and visualize_vix (fonts, rcParams) and resolves the
+      fonts once, in the pool initializer, not per chart.
+
+Usage:
+    python vix_charts.py [--workers N] [--markets US_VIX ...] [--windows 1m 1y ...] [--format svg|png]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import vix_build
+import vix_columnar
+import vix_store
+
+# Configuration
+charts_dir = "vix_charts"
+chart_format = 'svg'
+chart_windows = {  # name: (days back from the latest date, None = whole history; title label)
+    '1m': (31, 'Last 1 Month'),
+    '3m': (92, 'Last 3 Months'),
+    '1y': (365, 'Last 1 Year'),
+    '5y': (5 * 365, 'Last 5 Years'),
+    'all': (None, 'All History'),
+}
+compare = True  # Also render one all-markets chart per window
+max_workers = None  # Pool size (None = one per CPU, at most one per chart)
+start_method = 'spawn'  # Fresh workers; a forked pool would inherit the collectors' threads and locks
+
+# Per-worker state, set by _init_worker
+_store = None
+
+
+def default_specs(columns, windows=None):
+    """A chart per market per window, plus the comparison charts."""
+    import visualize_vix
+    windows = windows or list(chart_windows)
+    specs = []
+    for col in columns:
+        title = visualize_vix.styles.get(col, {}).get('label', col)
+        specs += [{'name': f'{col}_{w}', 'columns': [col], 'window': w, 'title': title} for w in windows]
+    if compare and len(columns) > 1:
+        specs += [{'name': f'compare_{w}', 'columns': list(columns), 'window': w, 'title': 'VIX Indices'}
+                  for w in windows]
+    return specs
+
+
+def chart_path(spec, directory=charts_dir):
+    return os.path.join(directory, f"{spec['name']}.{chart_format}")
+
+
+def build_outputs(specs, directory=charts_dir):
+    return [chart_path(spec, directory) for spec in specs]
+
+
+def build_key(data, specs):
+    """Content hash of the batch: data, specs, settings and the drawing code."""
+    import visualize_vix
+    store = vix_store.as_store(data)
+    config = {'specs': specs, 'windows': chart_windows, 'format': chart_format,
+              'auto_rollup': visualize_vix.auto_rollup, 'shade_regimes': visualize_vix.shade_regimes}
+    return vix_build.stage_key(data=store.frame(), config=config, code=[__file__, visualize_vix.__file__])
+
+
+def write_snapshot(store, directory):
+    """Write the dataset as plain .npy files that workers memory-map."""
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, 'Date.npy'), store.dates)
+    for i, col in enumerate(store.names):
+        np.save(os.path.join(directory, f'{i}.npy'), store.columns[col])
+    vix_columnar._write_json(os.path.join(directory, 'columns.json'), store.names)
+
+
+def open_snapshot(directory):
+    with open(os.path.join(directory, 'columns.json'), 'r', encoding='utf-8') as f:
+        names = json.load(f)
+    dates = np.load(os.path.join(directory, 'Date.npy'), mmap_mode='r')
+    return vix_store.VixStore(dates, {col: np.load(os.path.join(directory, f'{i}.npy'), mmap_mode='r')
+                                      for i, col in enumerate(names)})
+
+
+def _renderer_settings():
+    """visualize_vix settings to carry into the workers (spawned workers start from module defaults)."""
+    import visualize_vix
+    return {'auto_rollup': visualize_vix.auto_rollup, 'shade_regimes': visualize_vix.shade_regimes}
+
+
+def _init_worker(snapshot_dir, settings, backend='Agg'):
+    """Once per worker: map the dataset, set up matplotlib and resolve fonts."""
+    global _store
+    import matplotlib
+    if backend:
+        matplotlib.use(backend)
+    import matplotlib.font_manager
+    import visualize_vix  # Applies the font and SVG rcParams
+    for name, value in settings.items():
+        setattr(visualize_vix, name, value)
+    matplotlib.font_manager.findfont(matplotlib.font_manager.FontProperties(family=['sans-serif']))
+    matplotlib.font_manager.findfont(matplotlib.font_manager.FontProperties(family=['sans-serif'], weight='bold'))
+    _store = open_snapshot(snapshot_dir)
+
+
+def _render(spec, output):
+    """Render one spec to `output` with the worker's store. Returns (name, written, seconds)."""
+    import pandas as pd
+    import visualize_vix
+    t0 = time.perf_counter()
+    days, label = chart_windows[spec['window']]
+    columns = [c for c in spec['columns'] if c in _store.columns]
+    end_date = pd.Timestamp(_store.last_date)
+    start_date = pd.Timestamp(_store.first_date) if days is None else end_date - pd.Timedelta(days=days)
+    written = bool(columns) and visualize_vix.render_chart(_store, start_date, end_date, output, columns,
+                                                           spec.get('title', 'VIX Indices'), label)
+    return spec['name'], written, time.perf_counter() - t0
+
+
+def render_batch(data, specs=None, directory=charts_dir, workers=max_workers):
+    """
+    Render chart specs (default: `default_specs` for every market) from a VixStore or
+    merged DataFrame. With workers=1 the charts are drawn in this process. Returns the
+    paths written.
+    """
+    store = vix_store.as_store(data)
+    if store.empty:
+        print("No data to plot.")
+        return []
+    specs = default_specs(store.names) if specs is None else specs
+    os.makedirs(directory, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, len(specs)) or 1
+    outputs = build_outputs(specs, directory)
+
+    t0 = time.perf_counter()
+    snapshot_dir = tempfile.mkdtemp(prefix='vix_charts_')
+    try:
+        write_snapshot(store, snapshot_dir)
+        if workers == 1:
+            _init_worker(snapshot_dir, _renderer_settings(), backend=None)
+            results = [_render(spec, output) for spec, output in zip(specs, outputs)]
+        else:
+            context = multiprocessing.get_context(start_method)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                     initargs=(snapshot_dir, _renderer_settings())) as pool:
+                results = list(pool.map(_render, specs, outputs))
+    finally:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+    written = [output for output, (_, ok, _) in zip(outputs, results) if ok]
+    skipped = [name for name, ok, _ in results if not ok]
+    print(f"Rendered {len(written)} charts to {directory}/ in {time.perf_counter() - t0:.2f}s "
+          f"({workers} worker{'s' if workers > 1 else ''}, {sum(s for _, _, s in results):.2f}s of drawing)")
+    if skipped:
+        print(f"  No data for: {', '.join(skipped)}")
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render per-market and comparison charts in a process pool.")
+    parser.add_argument('--workers', type=int, default=max_workers, help="Worker processes (1 = draw in this process)")
+    parser.add_argument('--markets', nargs='*', help="Markets to chart (default: all in the store)")
+    parser.add_argument('--windows', nargs='*', choices=list(chart_windows), help="Windows to chart (default: all)")
+    parser.add_argument('--format', choices=['svg', 'png', 'pdf'], default=chart_format)
+    parser.add_argument('--output', default=charts_dir, help="Output directory")
+    args = parser.parse_args()
+    chart_format = args.format
+
+    store = vix_store.VixStore.load()
+    markets = [m for m in (args.markets or store.names) if m in store.columns]
+    render_batch(store, default_specs(markets, args.windows), args.output, args.workers)
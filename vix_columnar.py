@@ -0,0 +1,431 @@
+"""
+Columnar, year-partitioned on-disk store for the merged VIX dataset.
+
+Layout of `global_vix_store/`:
+    meta.json               columns, row count, first/last date, delta count per partition
+    latest.json             each market's latest value, for fast-start readers (vix_now.py)
+    YYYY/Date.npy           partition base: sorted datetime64[D] dates ...
+    YYYY/<column>.npy       ... and one float64 array per market
+    YYYY/delta-NNNN/*.npy   append-only segments of new or revised rows for that year
+
+Writes are append-only: a daily run writes one small delta segment into each year it
+touched, so write I/O stays constant as history grows. Readers memory-map the bases,
+prune partitions by date range, and apply deltas in order (later non-NaN values win).
+`compact` folds a partition's deltas back into its base; it also runs automatically
+once a partition has `max_deltas` segments.
+
+Values are stored as float32 (`value_dtype`), rounded to a fixed number of decimals
+per column: the precision each source quotes (2 for the VIX indices, see
+vix_sources), else `canonical_decimals`. meta.json records the precision, so
+exports and readers can print values exactly. float32 keeps 4 decimals exact below
+~1000 and 2 decimals far beyond; rounding a float32 value back to its column's
+decimals gives the canonical number. Re-fetching the same data never produces a
+different file. Older float64 stores remain readable.
+
+This is the system of record; `global_vix_merged.csv` is exported from it.
+
+Usage:
+    python vix_columnar.py import [csv_file]   # (re)build the store from a CSV export
+    python vix_columnar.py export [csv_file]   # write the CSV export from the store
+    python vix_columnar.py compact             # fold all delta segments into their bases
+"""
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+# Configuration
+store_dir = "global_vix_store"
+csv_file = "global_vix_merged.csv"
+date_column = 'Date'
+latest_file = 'latest.json'
+canonical_decimals = 4  # Precision of columns without a declared one (analytics, rollups)
+value_dtype = np.float32
+max_deltas = 32  # Compact a partition automatically once it has this many delta segments
+
+
+def canonicalize(values, decimals=None):
+    """Round values (as float64) to `decimals`, by default the canonical stored precision."""
+    return np.round(np.asarray(values, dtype=np.float64), canonical_decimals if decimals is None else decimals)
+
+
+def canonical_float(value, decimals=None):
+    """Stable text form of a stored value: fixed decimals with trailing zeros removed."""
+    text = f"{value:.{canonical_decimals if decimals is None else decimals}f}".rstrip('0')
+    return text[:-1] if text.endswith('.') else text
+
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def _read_meta(directory):
+    return _read_json(os.path.join(directory, 'meta.json'))
+
+
+def store_exists(directory=store_dir):
+    return os.path.exists(os.path.join(directory, 'meta.json'))
+
+
+def store_columns(directory=store_dir):
+    return _read_meta(directory)['columns']
+
+
+def store_decimals(directory=store_dir):
+    """{column: decimals} recorded in the store (columns without an entry use canonical_decimals)."""
+    if not store_exists(directory):
+        return {}
+    return _read_meta(directory).get('decimals', {})
+
+
+def _column_decimals(columns, decimals=None, previous=None):
+    """Declared precision per column: explicit `decimals`, else what the store recorded, else the default."""
+    decimals, previous = decimals or {}, previous or {}
+    return {col: int(decimals.get(col, previous.get(col, canonical_decimals))) for col in columns}
+
+
+def latest_date(directory=store_dir):
+    """Last date in the store (from metadata only), or None if the store is empty."""
+    last = _read_meta(directory).get('last')
+    return np.datetime64(last, 'D') if last else None
+
+
+def _save_segment(path, dates, values, decimals):
+    """Write one segment (a base or a delta) as Date.npy plus one `value_dtype` array per column."""
+    tmp_path = path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    np.save(os.path.join(tmp_path, f'{date_column}.npy'), dates.astype('datetime64[D]'))
+    for col, arr in values.items():
+        np.save(os.path.join(tmp_path, f'{col}.npy'), canonicalize(arr, decimals[col]).astype(value_dtype))
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(tmp_path, path)
+
+
+def _load_segment(path, columns, mmap=True):
+    """Return (dates, {column: values}) of a segment; columns it lacks come back all-NaN."""
+    mode = 'r' if mmap else None
+    dates = np.load(os.path.join(path, f'{date_column}.npy'), mmap_mode=mode)
+    values = {}
+    for col in columns:
+        col_path = os.path.join(path, f'{col}.npy')
+        if os.path.exists(col_path):
+            values[col] = np.load(col_path, mmap_mode=mode)
+        else:
+            values[col] = np.full(len(dates), np.nan, dtype=value_dtype)
+    return dates, values
+
+
+def _delta_dirs(partition_path):
+    if not os.path.isdir(partition_path):
+        return []
+    return sorted(os.path.join(partition_path, name) for name in os.listdir(partition_path)
+                  if name.startswith('delta-') and not name.endswith('.tmp'))
+
+
+def _apply(dates, values, delta_dates, delta_values):
+    """Overlay a delta on (dates, values): new dates are inserted, non-NaN delta values win."""
+    union = np.union1d(dates, delta_dates)
+    out = {}
+    base_pos = np.searchsorted(union, dates)
+    delta_pos = np.searchsorted(union, delta_dates)
+    for col in values:
+        update = np.asarray(delta_values[col])
+        merged = np.full(len(union), np.nan, dtype=np.result_type(values[col], update))
+        merged[base_pos] = values[col]
+        has_value = ~np.isnan(update)
+        merged[delta_pos[has_value]] = update[has_value]
+        out[col] = merged
+    return union, out
+
+
+def _read_partition(directory, year, columns, mmap=True):
+    path = os.path.join(directory, str(year))
+    if os.path.exists(os.path.join(path, f'{date_column}.npy')):
+        dates, values = _load_segment(path, columns, mmap)
+    else:
+        dates, values = np.array([], dtype='datetime64[D]'), {c: np.array([], dtype=value_dtype) for c in columns}
+    for delta_path in _delta_dirs(path):
+        delta_dates, delta_values = _load_segment(delta_path, columns, mmap=False)
+        dates, values = _apply(np.asarray(dates), {c: np.asarray(v) for c, v in values.items()},
+                               delta_dates, delta_values)
+    return dates, values
+
+
+def _years(dates):
+    return dates.astype('datetime64[Y]').astype(int) + 1970
+
+
+def _update_latest(directory, dates, values, decimals, latest=None):
+    """Merge the last valid value of each column in (dates, values) into latest.json."""
+    path = os.path.join(directory, latest_file)
+    if latest is None:
+        latest = _read_json(path) if os.path.exists(path) else {}
+    for col, arr in values.items():
+        arr = canonicalize(arr, decimals[col])
+        valid = np.flatnonzero(~np.isnan(arr))
+        if len(valid):
+            date = str(dates[valid[-1]])
+            if col not in latest or date >= latest[col]['date']:
+                latest[col] = {'date': date, 'value': float(arr[valid[-1]])}
+    _write_json(path, latest)
+
+
+def _frame_arrays(df):
+    df = df.sort_index()
+    dates = df.index.values.astype('datetime64[D]')
+    values = {str(col): df[col].to_numpy(dtype=np.float64) for col in df.columns}
+    return dates, values
+
+
+def write_store(df, directory=store_dir, decimals=None):
+    """
+    Write a Date-indexed DataFrame as a fresh store (one base per year, no deltas).
+    `decimals` ({column: n}) declares column precision; by default the existing store's is kept.
+    """
+    dates, values = _frame_arrays(df)
+    decimals = _column_decimals(values, decimals, store_decimals(directory))
+    tmp_dir = directory + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    years = _years(dates)
+    partitions = {}
+    for year in np.unique(years):
+        mask = years == year
+        _save_segment(os.path.join(tmp_dir, str(year)), dates[mask], {c: v[mask] for c, v in values.items()},
+                      decimals)
+        partitions[str(year)] = 0
+
+    meta = {
+        'columns': list(values),
+        'rows': int(len(dates)),
+        'first': str(dates[0]) if len(dates) else None,
+        'last': str(dates[-1]) if len(dates) else None,
+        'partitions': partitions,
+        'dtype': np.dtype(value_dtype).name,
+        'decimals': decimals,
+    }
+    _write_json(os.path.join(tmp_dir, 'meta.json'), meta)
+    _update_latest(tmp_dir, dates, values, decimals, latest={})
+
+    old_dir = directory + '.old'
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(directory):
+        os.rename(directory, old_dir)
+    os.rename(tmp_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def changed_rows(history_df, merged_df, decimals=None):
+    """Rows of `merged_df` that are new or differ from `history_df` at stored precision."""
+    if history_df.empty:
+        return merged_df
+    old = history_df.reindex(index=merged_df.index, columns=merged_df.columns)
+    places = np.array(list(_column_decimals(merged_df.columns, decimals).values()))
+    new_values = np.round(merged_df.to_numpy(dtype=np.float64) * 10.0 ** places)
+    old_values = np.round(old.to_numpy(dtype=np.float64) * 10.0 ** places)
+    differs = ~((new_values == old_values) | (np.isnan(new_values) & np.isnan(old_values)))
+    return merged_df[differs.any(axis=1)]
+
+
+def append_rows(df, directory=store_dir, decimals=None):
+    """
+    Append new or revised rows as one delta segment per affected year.
+    Only the touched partitions are written; returns the list of years written.
+    """
+    if df.empty:
+        return []
+    if not store_exists(directory):
+        write_store(df, directory, decimals)
+        return sorted({int(y) for y in _years(df.index.values.astype('datetime64[D]'))})
+
+    meta = _read_meta(directory)
+    dates, values = _frame_arrays(df)
+    columns = meta['columns'] + [c for c in values if c not in meta['columns']]
+    meta['decimals'] = _column_decimals(columns, decimals, meta.get('decimals'))
+
+    years = _years(dates)
+    written = []
+    new_rows = 0
+    for year in np.unique(years):
+        mask = years == year
+        part_path = os.path.join(directory, str(year))
+        os.makedirs(part_path, exist_ok=True)
+
+        # Count genuinely new dates for the row total
+        existing, _ = _read_partition(directory, year, [], mmap=True)
+        new_rows += int(np.count_nonzero(~np.isin(dates[mask], existing)))
+
+        n = meta['partitions'].get(str(year), 0) + 1
+        _save_segment(os.path.join(part_path, f'delta-{n:04d}'), dates[mask],
+                      {c: v[mask] for c, v in values.items()}, meta['decimals'])
+        meta['partitions'][str(year)] = n
+        written.append(int(year))
+
+    meta['columns'] = columns
+    meta['rows'] += new_rows
+    meta['first'] = min(filter(None, [meta.get('first'), str(dates[0])]))
+    meta['last'] = max(filter(None, [meta.get('last'), str(dates[-1])]))
+    _write_json(os.path.join(directory, 'meta.json'), meta)
+    _update_latest(directory, dates, values, meta['decimals'])
+
+    for year in written:
+        if meta['partitions'][str(year)] >= max_deltas:
+            compact(directory, [year])
+    return written
+
+
+def compact(directory=store_dir, years=None):
+    """Fold delta segments into their partition bases. Returns the years compacted."""
+    meta = _read_meta(directory)
+    columns = meta['columns']
+    decimals = _column_decimals(columns, previous=meta.get('decimals'))
+    targets = [str(y) for y in years] if years is not None else list(meta['partitions'])
+    compacted = []
+    for year in targets:
+        if not meta['partitions'].get(year):
+            continue
+        dates, values = _read_partition(directory, int(year), columns, mmap=False)
+        part_path = os.path.join(directory, year)
+        _save_segment(part_path + '.compact', dates, values, decimals)
+        shutil.rmtree(part_path)
+        os.rename(part_path + '.compact', part_path)
+        meta['partitions'][year] = 0
+        compacted.append(int(year))
+    _write_json(os.path.join(directory, 'meta.json'), meta)
+    return compacted
+
+
+def read_arrays(directory=store_dir, columns=None, start=None, end=None):
+    """
+    Return (dates, {column: values}) for the requested columns and inclusive date range.
+    Only partitions overlapping the range are opened; bases are memory-mapped and
+    sliced before copying. No pandas import is needed.
+    """
+    meta = _read_meta(directory)
+    wanted = meta['columns'] if columns is None else [c for c in columns if c in meta['columns']]
+    start = None if start is None else np.datetime64(start, 'D')
+    end = None if end is None else np.datetime64(end, 'D')
+    first_year = None if start is None else int(_years(np.array([start]))[0])
+    last_year = None if end is None else int(_years(np.array([end]))[0])
+
+    date_parts, value_parts = [], {col: [] for col in wanted}
+    for year in sorted(meta['partitions'], key=int):
+        if (first_year is not None and int(year) < first_year) or (last_year is not None and int(year) > last_year):
+            continue
+        dates, values = _read_partition(directory, int(year), wanted)
+        lo, hi = 0, len(dates)
+        if start is not None:
+            lo = int(np.searchsorted(dates, start, side='left'))
+        if end is not None:
+            hi = int(np.searchsorted(dates, end, side='right'))
+        date_parts.append(np.array(dates[lo:hi]))
+        for col in wanted:
+            value_parts[col].append(np.array(values[col][lo:hi]))
+
+    if not date_parts:
+        return np.array([], dtype='datetime64[D]'), {col: np.array([], dtype=value_dtype) for col in wanted}
+    return np.concatenate(date_parts), {col: np.concatenate(parts) for col, parts in value_parts.items()}
+
+
+def read_store(directory=store_dir, columns=None, start=None, end=None):
+    """Load the store (or a column/date-range slice of it) as a Date-indexed DataFrame."""
+    import pandas as pd
+
+    dates, values = read_arrays(directory, columns, start, end)
+    index = pd.DatetimeIndex(dates.astype('datetime64[ns]'), name=date_column)
+    return pd.DataFrame(values, index=index)
+
+
+def load_merged(columns=None, start=None, end=None, directory=store_dir, fallback_csv=csv_file):
+    """
+    Load the merged dataset, preferring the columnar store and falling back to the CSV export.
+    Returns an empty DataFrame if neither is available.
+    """
+    import pandas as pd
+
+    if store_exists(directory):
+        return read_store(directory, columns, start, end)
+
+    if os.path.exists(fallback_csv):
+        df = pd.read_csv(fallback_csv, index_col=date_column, parse_dates=True, float_precision='round_trip')
+        df = df.astype(value_dtype)
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        return df.loc[start:end]
+    return pd.DataFrame()
+
+
+def _csv_lines(df, decimals=None):
+    places = list(_column_decimals(df.columns, decimals).values())
+    rows = []
+    for date, row in zip(df.index.strftime('%Y-%m-%d'), df.to_numpy(dtype=np.float64)):
+        rows.append(','.join([date] + ['' if np.isnan(v) else canonical_float(v, d) for v, d in zip(row, places)]))
+    return rows
+
+
+def _csv_tail(path):
+    """Return (header columns, last date string) of a CSV export without reading all of it."""
+    with open(path, 'rb') as f:
+        header = f.readline().decode('utf-8').strip().split(',')
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 4096))
+        tail = f.read().decode('utf-8').strip().splitlines()
+    last = tail[-1].split(',')[0] if tail else None
+    return header, (last if last != date_column else None)
+
+
+def export_csv(df, path=csv_file, changed=None, decimals=None):
+    """
+    Write the CSV export with canonical number formatting (`decimals` per column).
+
+    If `changed` (the rows just appended to the store) only adds dates after the end of
+    the existing export with the same columns, those lines are appended instead of
+    rewriting the file.
+    """
+    df = df.sort_index()
+    columns = [str(c) for c in df.columns]
+    if changed is not None and os.path.exists(path):
+        if changed.empty:
+            return
+        header, last = _csv_tail(path)
+        if header == [date_column] + columns and last and changed.index.min().strftime('%Y-%m-%d') > last:
+            with open(path, 'a', encoding='utf-8', newline='') as f:
+                f.write('\n'.join(_csv_lines(changed.sort_index()[df.columns], decimals)) + '\n')
+            return
+
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(','.join([date_column] + columns) + '\n')
+        f.write('\n'.join(_csv_lines(df, decimals)) + '\n')
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'import'
+    path = sys.argv[2] if len(sys.argv) > 2 else csv_file
+    if command == 'import':
+        import pandas as pd
+        df = pd.read_csv(path, index_col=date_column, parse_dates=True, float_precision='round_trip')
+        write_store(df)
+        print(f"Imported {len(df)} rows from {path} into {store_dir}/")
+    elif command == 'export':
+        df = read_store()
+        export_csv(df, path, decimals=store_decimals())
+        print(f"Exported {len(df)} rows from {store_dir}/ to {path}")
+    elif command == 'compact':
+        years = compact()
+        print(f"Compacted {len(years)} partitions: {', '.join(map(str, years)) or 'none'}")
+    else:
+        print(f"Unknown command: {command} (expected 'import', 'export' or 'compact')")
+        sys.exit(1)
@@ -0,0 +1,49 @@
+"""
+Shape-preserving downsampling for chart output.
+
+`lttb` implements Largest-Triangle-Three-Buckets (Steinarsson, 2013): it keeps the
+first and last points and, from each bucket in between, the point forming the largest
+triangle with the previously kept point and the next bucket's average. Spikes survive,
+which matters for VIX charts where the spikes are the story.
+"""
+import numpy as np
+
+
+def lttb_indices(x, y, n_out):
+    """Indices of the points LTTB keeps from (x, y); all indices if n_out >= len(x)."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Bucket boundaries over the interior points [1, n - 1)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    # Averages of every bucket (plus the last point as the final "next bucket") up front
+    bounds = np.append(edges, n)
+    sizes = np.diff(bounds)
+    avg_x = np.add.reduceat(x, bounds[:-1]) / sizes
+    avg_y = np.add.reduceat(y, bounds[:-1]) / sizes
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Twice the triangle area for every candidate in this bucket
+        area = np.abs((x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def lttb(x, y, n_out):
+    """Downsample (x, y) to at most n_out points with LTTB; NaNs in y are dropped first."""
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+    idx = lttb_indices(x.astype(np.float64), y, n_out)
+    return x[idx], y[idx]
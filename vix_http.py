@@ -0,0 +1,131 @@
+"""
+Shared HTTP plumbing for the VIX collectors.
+
+Provides one pooled keep-alive session, a polite per-host rate limiter and a
+bounded-concurrency fetcher that returns results in the order they were requested.
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import vix_metrics
+
+# Configuration
+default_headers = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+max_workers = 8
+min_request_interval = 0.1  # Minimum seconds between request starts to the same host
+max_retries = 2  # Extra attempts on connection errors and 5xx responses
+retry_backoff = 1.0  # Seconds before the first retry, doubled each time
+
+_session = None
+_session_pool_size = 0
+_session_lock = threading.Lock()
+
+# time.monotonic() by which the current caller gives up (set per source by vix_sources.run_all).
+# It is a context variable, so fetch_all's workers inherit it; requests are cut short to meet it.
+deadline = contextvars.ContextVar('vix_http_deadline', default=None)
+
+
+def get_session(pool_size=None):
+    """
+    Return the process-wide keep-alive session, creating it on first use. With
+    `pool_size`, its connection pools grow to hold at least that many connections per host.
+    """
+    global _session, _session_pool_size
+    pool_size = max(pool_size or max_workers, 1)
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update(default_headers)
+        if pool_size > _session_pool_size:
+            # Keep one pooled connection per worker so concurrent fetches reuse TLS sessions
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+            _session_pool_size = pool_size
+        return _session
+
+
+class HostRateLimiter:
+    """Spaces out request starts per host by at least `min_interval` seconds."""
+
+    def __init__(self, min_interval=None):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        interval = min_request_interval if self.min_interval is None else self.min_interval
+        if interval <= 0:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+rate_limiter = HostRateLimiter()
+
+
+def request(method, url, **kwargs):
+    """Issue a rate-limited request over the shared session, retrying transient failures."""
+    kwargs.setdefault('timeout', 30)
+    for attempt in range(max_retries + 1):
+        if attempt:
+            vix_metrics.count('http_retries')
+            time.sleep(retry_backoff * 2 ** (attempt - 1))
+        end = deadline.get()
+        if end is not None:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                raise requests.exceptions.Timeout(f"Deadline passed before requesting {url}")
+            kwargs['timeout'] = min(kwargs['timeout'], remaining)
+        rate_limiter.wait(url)
+        vix_metrics.count('http_requests')
+        try:
+            response = get_session().request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt == max_retries:
+                raise
+            continue
+        if response.status_code >= 500 and attempt < max_retries:
+            continue
+        vix_metrics.count('http_bytes', len(response.content))
+        return response
+
+
+def fetch_all(items, fetch, workers=None):
+    """
+    Run `fetch(item)` for every item with at most `workers` threads.
+
+    Returns a list of (result, error) tuples in the same order as `items`, so callers
+    can reassemble output exactly as a serial loop would.
+    """
+    workers = max_workers if workers is None else workers
+
+    def run(item):
+        try:
+            return fetch(item), None
+        except Exception as e:
+            return None, e
+
+    if workers <= 1 or len(items) <= 1:
+        return [run(item) for item in items]
+
+    # Size the connection pool for the workers, so none of them opens an unpooled connection
+    get_session(pool_size=workers)
+    # Run each item in a copy of the caller's context so metrics reach the open stages
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, run, item) for item in items]
+        return [future.result() for future in futures]
@@ -0,0 +1,273 @@
+"""
+Intraday VIX store: int64 epoch timestamps and float32 values in memory-mappable chunks.
+
+Layout of `global_vix_intraday/`:
+    meta.json                 per series: its chunks (first/last timestamp, point count)
+    <series>/NNNNNN.ts.npy    sorted int64 timestamps, UTC epoch milliseconds
+    <series>/NNNNNN.val.npy   float32 values, one per timestamp
+
+A point costs 12 bytes. Ten years of one-minute data (~750k points) is therefore about
+9 MB. Appends go into the open (last) chunk until it holds `chunk_points`, then a new
+chunk is started, so an append rewrites at most one chunk. Points at or before the last
+stored timestamp are treated as revisions: the chunks they fall in are rewritten, and
+the new values win. Readers memory-map only the chunks overlapping the requested time
+range and bisect within them.
+
+Timestamps without a timezone are taken as exchange local time (`exchange_tz`).
+
+Ingestion hooks (`parsers`) turn a source payload into {series: (timestamps, values)}:
+    taifex   TAIFEX YYYYMMnew.txt bodies: the daily index and the Last 1 min AVG, each
+             stamped at the closing time (series Taiwan_VIX, Taiwan_VIX_1min_avg)
+    ticks    tick files with one "date time value" per line, e.g.
+             "20250102 084500 18.52", "2025-01-02 08:45:00.250,18.52"
+collect_vix_data feeds the TAIFEX files it downloads through the `taifex` hook when
+run with --intraday.
+
+Usage:
+    python vix_intraday.py ingest FILE [--format ticks|taifex] [--series NAME]
+    python vix_intraday.py show [SERIES] [--start 2025-01-02] [--end 2025-01-03]
+    python vix_intraday.py stats
+"""
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+
+import vix_columnar
+
+# Configuration
+intraday_dir = "global_vix_intraday"
+chunk_points = 1 << 15  # Points per chunk (~384 KB on disk)
+exchange_tz = 'Asia/Taipei'
+tick_series = 'Taiwan_VIX_tick'
+
+
+def to_epoch_ms(times, tz=exchange_tz):
+    """Datetime-likes (naive = exchange local time) -> int64 UTC epoch milliseconds."""
+    import pandas as pd
+
+    index = pd.DatetimeIndex(pd.to_datetime(times))
+    if index.tz is None:
+        index = index.tz_localize(tz, ambiguous='NaT', nonexistent='NaT')
+    return index.tz_convert('UTC').as_unit('ms').asi8
+
+
+def _bound_ms(value, tz=exchange_tz):
+    return None if value is None else int(to_epoch_ms([value], tz)[0])
+
+
+# Store
+
+def read_meta(directory=intraday_dir):
+    path = os.path.join(directory, 'meta.json')
+    if not os.path.exists(path):
+        return {'series': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _chunk_path(directory, series, name, kind):
+    return os.path.join(directory, series, f"{name}.{kind}.npy")
+
+
+def _save_chunk(directory, series, name, ts, values):
+    folder = os.path.join(directory, series)
+    os.makedirs(folder, exist_ok=True)
+    for kind, arr in (('ts', ts.astype(np.int64)), ('val', values.astype(np.float32))):
+        path = _chunk_path(directory, series, name, kind)
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, arr)
+        os.replace(path + '.tmp', path)
+    return {'name': name, 'first': int(ts[0]), 'last': int(ts[-1]), 'count': int(len(ts))}
+
+
+def _load_chunk(directory, series, chunk, mmap=True):
+    mode = 'r' if mmap else None
+    return (np.load(_chunk_path(directory, series, chunk['name'], 'ts'), mmap_mode=mode),
+            np.load(_chunk_path(directory, series, chunk['name'], 'val'), mmap_mode=mode))
+
+
+def append(series, timestamps, values, directory=intraday_dir):
+    """
+    Add points (int64 epoch ms, values) to a series. Returns the number of chunks written.
+    Later duplicates win, both within the batch and over stored points.
+    """
+    ts = np.asarray(timestamps, dtype=np.int64)
+    vals = np.asarray(values, dtype=np.float32)
+    keep = ~np.isnan(vals)
+    ts, vals = ts[keep], vals[keep]
+    if not len(ts):
+        return 0
+
+    # Sort, keeping the last of duplicate timestamps
+    order = np.argsort(ts, kind='stable')
+    ts, vals = ts[order], vals[order]
+    last = np.r_[ts[1:] != ts[:-1], True]
+    ts, vals = ts[last], vals[last]
+
+    meta = read_meta(directory)
+    chunks = meta['series'].setdefault(series, {'chunks': []})['chunks']
+
+    # Rewrite the chunks the batch reaches back into, plus the open last chunk if it has room
+    reopen = int(np.searchsorted([c['last'] for c in chunks], ts[0], side='left'))
+    if reopen == len(chunks) and chunks and chunks[-1]['count'] < chunk_points:
+        reopen -= 1
+    if reopen < len(chunks):
+        old = [_load_chunk(directory, series, c, mmap=False) for c in chunks[reopen:]]
+        old_ts = np.concatenate([o[0] for o in old])
+        old_vals = np.concatenate([o[1] for o in old])
+        stale = np.isin(old_ts, ts)
+        merged_ts = np.concatenate([old_ts[~stale], ts])
+        merged_vals = np.concatenate([old_vals[~stale], vals])
+        order = np.argsort(merged_ts, kind='stable')
+        ts, vals = merged_ts[order], merged_vals[order]
+
+    next_id = int(chunks[-1]['name']) + 1 if chunks else 0
+    names = [c['name'] for c in chunks[reopen:]]
+    written = []
+    for i, lo in enumerate(range(0, len(ts), chunk_points)):
+        name = names[i] if i < len(names) else f"{next_id + i - len(names):06d}"
+        written.append(_save_chunk(directory, series, name, ts[lo:lo + chunk_points], vals[lo:lo + chunk_points]))
+    for stale_chunk in chunks[reopen + len(written):]:  # Only if re-chunking needed fewer files
+        for kind in ('ts', 'val'):
+            os.remove(_chunk_path(directory, series, stale_chunk['name'], kind))
+    chunks[reopen:] = written
+    meta['series'][series]['points'] = sum(c['count'] for c in chunks)
+    vix_columnar._write_json(os.path.join(directory, 'meta.json'), meta)
+    return len(written)
+
+
+def read(series, start=None, end=None, directory=intraday_dir, tz=exchange_tz):
+    """(int64 epoch ms, float32 values) of a series within [start, end], memory-mapped where possible."""
+    chunks = read_meta(directory)['series'].get(series, {}).get('chunks', [])
+    lo_ms, hi_ms = _bound_ms(start, tz), _bound_ms(end, tz)
+    parts = []
+    for chunk in chunks:
+        if (lo_ms is not None and chunk['last'] < lo_ms) or (hi_ms is not None and chunk['first'] > hi_ms):
+            continue
+        ts, vals = _load_chunk(directory, series, chunk)
+        lo = 0 if lo_ms is None else int(np.searchsorted(ts, lo_ms, side='left'))
+        hi = len(ts) if hi_ms is None else int(np.searchsorted(ts, hi_ms, side='right'))
+        parts.append((ts[lo:hi], vals[lo:hi]))
+    if not parts:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+    if len(parts) == 1:
+        return parts[0]
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+def read_series(series, start=None, end=None, directory=intraday_dir, tz=exchange_tz):
+    """A series window as a pandas Series indexed by exchange-local timestamps."""
+    import pandas as pd
+
+    ts, vals = read(series, start, end, directory, tz)
+    index = pd.DatetimeIndex(ts.astype('datetime64[ms]'), name='Time').tz_localize('UTC').tz_convert(tz)
+    return pd.Series(np.asarray(vals), index=index, name=series)
+
+
+def delete(series, directory=intraday_dir):
+    meta = read_meta(directory)
+    if meta['series'].pop(series, None) is not None:
+        shutil.rmtree(os.path.join(directory, series), ignore_errors=True)
+        vix_columnar._write_json(os.path.join(directory, 'meta.json'), meta)
+
+
+# Ingestion hooks
+
+def parse_taifex(texts):
+    """TAIFEX monthly TXT bodies -> the daily index and Last 1 min AVG stamped at the closing time."""
+    from collect_vix_data import parse_taifex_txt
+
+    parsed, _ = parse_taifex_txt('\n'.join(texts) if isinstance(texts, (list, tuple)) else texts)
+    parsed = parsed.dropna(subset=['Closing_Time'])
+    ts = to_epoch_ms(parsed['Closing_Time'])
+    return {'Taiwan_VIX': (ts, parsed['Taiwan_VIX'].to_numpy()),
+            'Taiwan_VIX_1min_avg': (ts, parsed['Last_1min_AVG'].to_numpy())}
+
+
+def parse_ticks(text, series=tick_series):
+    """
+    Tick lines "date time value" (date YYYYMMDD or YYYY-MM-DD / YYYY/MM/DD; time HHMMSS or
+    HH:MM:SS, optional fraction; separated by spaces, tabs or commas) in one vectorized pass.
+    Unparseable lines (headers, blanks) are skipped.
+    """
+    import pandas as pd
+
+    lines = pd.Series(text.splitlines(), dtype=object)
+    fields = lines.str.extract(r'^\s*(\d{4}[-/]?\d{2}[-/]?\d{2})[\sT,]+(\d{1,2}:?\d{2}:?\d{2})(\.\d+)?[\s,]+(-?\d+(?:\.\d*)?)\s*$')
+    fields = fields.dropna(subset=[0, 1, 3])
+    if fields.empty:
+        return {series: (np.array([], dtype=np.int64), np.array([], dtype=np.float32))}
+    dates = fields[0].str.replace(r'[-/]', '', regex=True)
+    clock = fields[1].str.replace(':', '', regex=False).str.zfill(6)
+    stamps = (dates + clock + fields[2].fillna('.0')).to_numpy(dtype=str)
+    times = pd.to_datetime(stamps, format='%Y%m%d%H%M%S.%f', errors='coerce')
+    valid = ~pd.isna(times)
+    return {series: (to_epoch_ms(times[valid]), pd.to_numeric(fields[3]).to_numpy()[valid])}
+
+
+parsers = {
+    'taifex': parse_taifex,
+    'ticks': parse_ticks,
+}
+
+
+def ingest(payload, parser='taifex', directory=intraday_dir, **kwargs):
+    """Parse a payload with one of `parsers` and append every series it yields. Returns {series: points}."""
+    counts = {}
+    for series, (ts, vals) in parsers[parser](payload, **kwargs).items():
+        append(series, ts, vals, directory)
+        counts[series] = len(ts)
+    print("  Intraday: " + (", ".join(f"{s} {n} points" for s, n in counts.items()) or "nothing to ingest"))
+    return counts
+
+
+def stats(directory=intraday_dir):
+    """{series: {'points', 'chunks', 'bytes', 'first', 'last'}} from the metadata and file sizes."""
+    import pandas as pd
+
+    out = {}
+    for series, entry in read_meta(directory)['series'].items():
+        chunks = entry['chunks']
+        size = sum(os.path.getsize(_chunk_path(directory, series, c['name'], kind))
+                   for c in chunks for kind in ('ts', 'val'))
+        stamp = lambda ms: str(pd.Timestamp(ms, unit='ms', tz='UTC').tz_convert(exchange_tz))
+        out[series] = {'points': entry.get('points', 0), 'chunks': len(chunks), 'bytes': size,
+                       'first': stamp(chunks[0]['first']) if chunks else None,
+                       'last': stamp(chunks[-1]['last']) if chunks else None}
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Intraday VIX store.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_ingest = sub.add_parser('ingest', help="Append a TAIFEX TXT or tick file")
+    p_ingest.add_argument('file')
+    p_ingest.add_argument('--format', choices=sorted(parsers), default='ticks')
+    p_ingest.add_argument('--series', default=tick_series, help="Series name for tick files")
+    p_show = sub.add_parser('show', help="Print a series window")
+    p_show.add_argument('series', nargs='?', default='Taiwan_VIX')
+    p_show.add_argument('--start')
+    p_show.add_argument('--end')
+    sub.add_parser('stats', help="Points, chunks and bytes per series")
+    parser.add_argument('--dir', default=intraday_dir)
+    args = parser.parse_args(argv)
+
+    if args.command == 'ingest':
+        with open(args.file, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        kwargs = {'series': args.series} if args.format == 'ticks' else {}
+        ingest(text, args.format, args.dir, **kwargs)
+    elif args.command == 'show':
+        print(read_series(args.series, args.start, args.end, args.dir).to_string())
+    else:
+        for series, info in stats(args.dir).items():
+            print(f"  {series:<24} {info['points']:>9} points {info['chunks']:>4} chunks "
+                  f"{info['bytes'] / 1024 / 1024:8.2f} MB  {info['first']} .. {info['last']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
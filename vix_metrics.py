@@ -0,0 +1,146 @@
+"""
+Structured per-stage metrics for the VIX collectors and renderers.
+
+Wrap work in `stage(name, source)` (or decorate with `instrument`) and every stage emits
+one JSON-lines record with wall and CPU time, HTTP requests/bytes/retries, cache hits,
+rows parsed/rejected and peak memory. Counters raised with `count()` go to every open
+stage in the current context, so a pipeline stage also sees its collectors' requests;
+vix_http propagates the context into its worker threads.
+
+Configuration (module settings, or environment variables of the same name upper-cased):
+    metrics_file  VIX_METRICS       JSON-lines output path ('' = don't write, records are still returned)
+    profile_dir   VIX_PROFILE       write a cProfile dump per stage into this directory
+    trace_memory  VIX_TRACEMALLOC   measure peak Python allocations with tracemalloc
+"""
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Configuration
+metrics_file = os.environ.get('VIX_METRICS', '')
+profile_dir = os.environ.get('VIX_PROFILE', '')
+trace_memory = os.environ.get('VIX_TRACEMALLOC', '') not in ('', '0')
+
+counter_names = ['http_requests', 'http_bytes', 'http_retries', 'cache_hits', 'cache_misses',
+                 'cache_revalidated', 'rows_parsed', 'rows_rejected', 'parse_fallbacks']
+
+run_id = uuid.uuid4().hex[:12]
+_active = contextvars.ContextVar('vix_metrics_active', default=())
+_lock = threading.Lock()
+
+
+def count(name, n=1):
+    """Add `n` to counter `name` on every stage open in the current context."""
+    records = _active.get()
+    if not records:
+        return
+    with _lock:
+        for record in records:
+            record[name] = record.get(name, 0) + n
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1)
+
+
+def emit(record):
+    """Append one record to the metrics file (if configured)."""
+    if not metrics_file:
+        return
+    line = json.dumps(record, default=str)
+    with _lock:
+        with open(metrics_file, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+@contextmanager
+def stage(name, source=None):
+    """Measure a block of work and emit its record when it ends. Yields the record dict."""
+    parent = _active.get()
+    record = {'run_id': run_id, 'stage': name, 'source': source,
+              'parent': parent[-1]['stage'] if parent else None,
+              'started': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    record.update({key: 0 for key in counter_names})
+    token = _active.set(parent + (record,))
+
+    tracing = False
+    if trace_memory:
+        import tracemalloc
+        tracing = not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+
+    profiler = None
+    if profile_dir:
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # Another profiler is already active (nested stage)
+            profiler = None
+
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record['wall_s'] = round(time.perf_counter() - wall0, 4)
+        record['cpu_s'] = round(time.process_time() - cpu0, 4)
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(profile_dir, exist_ok=True)
+            label = f"{name}-{source}" if source else name
+            profiler.dump_stats(os.path.join(profile_dir, f"{run_id}-{label}.prof"))
+        if trace_memory:
+            import tracemalloc
+            record['peak_traced_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+            if tracing:
+                tracemalloc.stop()
+        record['peak_rss_mb'] = _peak_rss_mb()
+        _active.reset(token)
+        emit(record)
+
+
+def instrument(name, source=None):
+    """Decorator form of `stage`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name, source):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def summarize(path=None):
+    """Print a per-stage table of the records in a metrics file."""
+    path = path or metrics_file
+    with open(path, 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    print(f"  {'run':<12} {'stage':<16} {'source':<12} {'wall':>8} {'cpu':>8} {'req':>5} {'KB':>8} {'hits':>5} {'rows':>6} {'rej':>4}")
+    for r in records:
+        print(f"  {r['run_id']:<12} {r['stage']:<16} {str(r.get('source') or ''):<12} "
+              f"{r['wall_s']:8.3f} {r['cpu_s']:8.3f} {r['http_requests']:5d} {r['http_bytes'] / 1024:8.1f} "
+              f"{r['cache_hits']:5d} {r['rows_parsed']:6d} {r['rows_rejected']:4d}")
+
+
+if __name__ == "__main__":
+    summarize(sys.argv[1] if len(sys.argv) > 1 else None)
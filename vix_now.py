@@ -0,0 +1,110 @@
+"""
+Fast-start query for "what is the VIX right now" (or on a given date).
+
+Only the standard library is imported up front. Latest values come from the tiny
+`latest.json` sidecar the collector writes into the columnar store; as-of-date queries
+lazily import NumPy and memory-map one market column, one year partition at a time.
+
+Usage:
+    python vix_now.py                      # latest value for every market
+    python vix_now.py taiwan               # latest Taiwan VIX
+    python vix_now.py us --as-of 2024-08-05
+    python vix_now.py --json
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+
+# Configuration
+store_dir = "global_vix_store"
+latest_file = "latest.json"
+
+aliases = {
+    'us': 'US_VIX', 'vix': 'US_VIX',
+    'jp': 'Japan_VIX', 'japan': 'Japan_VIX', 'nikkei': 'Japan_VIX',
+    'tw': 'Taiwan_VIX', 'taiwan': 'Taiwan_VIX', 'vixtwn': 'Taiwan_VIX',
+}
+
+
+def resolve_market(name):
+    return aliases.get(name.lower(), name)
+
+
+def latest_values(directory=store_dir):
+    """Return {column: {'date': ..., 'value': ...}} from the sidecar, or {} if it is missing."""
+    path = os.path.join(directory, latest_file)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def parse_date(text):
+    """argparse type for --as-of: a calendar date, reported as a usage error if invalid."""
+    try:
+        return datetime.date.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {text!r} (expected YYYY-MM-DD)")
+
+
+def value_as_of(column, date, directory=store_dir):
+    """
+    Value of `column` on `date`, forward-filled from the last trading day on or before it.
+    Returns {'date': ..., 'value': ...} or None.
+    """
+    import numpy as np
+    import vix_columnar
+
+    meta = vix_columnar._read_meta(directory)
+    if column not in meta['columns']:
+        return None
+    end = np.datetime64(date, 'D')
+    # Only open the year partitions needed, walking back over this market's holidays
+    for year in sorted((int(y) for y in meta['partitions']), reverse=True):
+        if np.datetime64(f'{year}-01-01', 'D') > end:
+            continue
+        dates, values = vix_columnar.read_arrays(directory, [column], start=f'{year}-01-01', end=end)
+        valid = np.flatnonzero(~np.isnan(values[column]))
+        if len(valid):
+            j = int(valid[-1])
+            decimals = meta.get('decimals', {}).get(column, vix_columnar.canonical_decimals)
+            return {'date': str(dates[j]), 'value': round(float(values[column][j]), decimals)}
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the latest (or as-of) VIX values.")
+    parser.add_argument('markets', nargs='*', help="Markets to show: us, japan, taiwan or a column name (default: all)")
+    parser.add_argument('--as-of', dest='as_of', type=parse_date,
+                        help="Date (YYYY-MM-DD); forward-fills across market holidays")
+    parser.add_argument('--json', action='store_true', help="Print JSON instead of text")
+    parser.add_argument('--store', default=store_dir, help="Columnar store directory")
+    args = parser.parse_args(argv)
+
+    latest = latest_values(args.store)
+    markets = [resolve_market(m) for m in args.markets] or list(latest)
+
+    results = {}
+    for column in markets:
+        if args.as_of:
+            results[column] = value_as_of(column, args.as_of, args.store)
+        else:
+            results[column] = latest.get(column)
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        if not results:
+            print(f"No data found in {args.store}/")
+        for column, entry in results.items():
+            if entry is None:
+                print(f"{column}: N/A")
+            else:
+                print(f"{column}: {entry['value']:.2f} (as of {entry['date']})")
+    return 0 if results and all(results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
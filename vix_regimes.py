@@ -0,0 +1,245 @@
+"""
+Risk-zone regime index: when each market entered and left each VIX zone.
+
+The zones are the bands the charts shade (`bands` = 15/20/30):
+    0 Safe (<15), 1 Warning (15-20), 2 Dangerous (20-30), 3 Very Dangerous (>=30)
+
+For every market the index keeps a run-length encoded interval table (start, end,
+zone, trading days) and a per-year count of trading days in each zone. Both are built
+with NumPy and stored in `global_vix_regimes.json`. `update` extends it from the
+interval containing the first new or revised date (`overlap_days` back), so a daily run
+touches only the open interval and the current year's counts.
+
+The index records the fingerprint (vix_store.fingerprint) of the data it was built
+from, and chart shading uses it only for that data.
+
+Queries such as "days at or above 30 this year" and "current streak" are dictionary
+lookups plus at most a few additions (O(1)). Interval lookups by date are binary
+searches.
+
+Usage:
+    python vix_regimes.py update     # extend the index from the store
+    python vix_regimes.py rebuild    # rebuild it from scratch
+    python vix_regimes.py show       # current zone, streak and this year's counts
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+import vix_columnar
+import vix_metrics
+import vix_store
+
+# Configuration
+regimes_file = "global_vix_regimes.json"
+bands = [15, 20, 30]
+zone_names = ['Safe', 'Warning', 'Dangerous', 'Very Dangerous']
+zone_colors = ['green', 'yellow', 'orange', 'red']
+overlap_days = 7  # Matches the collectors' re-fetch window
+
+
+def classify(values):
+    """Zone number of each value (NaN-free input)."""
+    return np.searchsorted(np.asarray(bands, dtype=np.float64), values, side='right')
+
+
+def run_lengths(dates, zones):
+    """RLE of a zone sequence: (start dates, end dates, zones, trading days) per run."""
+    if not len(zones):
+        empty = np.array([], dtype='datetime64[D]')
+        return empty, empty, np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    change = np.flatnonzero(np.diff(zones)) + 1
+    first = np.r_[0, change]
+    last = np.r_[change - 1, len(zones) - 1]
+    return dates[first], dates[last], zones[first].astype(np.int64), last - first + 1
+
+
+def year_counts(dates, zones):
+    """{year: [trading days in each zone]} for the given observations."""
+    years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+    counts = {}
+    for year in np.unique(years):
+        counts[str(int(year))] = np.bincount(zones[years == year], minlength=len(zone_names)).tolist()
+    return counts
+
+
+class RegimeIndex:
+    """Per-market interval tables and yearly zone counts, with O(1) summary queries."""
+
+    def __init__(self, markets=None, zone_bands=None, fingerprint=None):
+        self.bands = list(zone_bands or bands)
+        self.markets = markets or {}
+        self.fingerprint = fingerprint  # Of the merged data last encoded (see update)
+
+    # Persistence
+
+    @classmethod
+    def load(cls, path=regimes_file):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        markets = {}
+        for market, entry in data['markets'].items():
+            markets[market] = {
+                'start': np.array(entry['start'], dtype='datetime64[D]'),
+                'end': np.array(entry['end'], dtype='datetime64[D]'),
+                'zone': np.array(entry['zone'], dtype=np.int64),
+                'days': np.array(entry['days'], dtype=np.int64),
+                'years': entry['years'],
+            }
+        return cls(markets, data['bands'], data.get('fingerprint'))
+
+    def save(self, path=regimes_file):
+        data = {'bands': self.bands, 'zones': zone_names, 'fingerprint': self.fingerprint, 'markets': {}}
+        for market, entry in self.markets.items():
+            data['markets'][market] = {
+                'start': [str(d) for d in entry['start']],
+                'end': [str(d) for d in entry['end']],
+                'zone': entry['zone'].tolist(),
+                'days': entry['days'].tolist(),
+                'years': entry['years'],
+            }
+        vix_columnar._write_json(path, data)
+
+    # Building
+
+    def build(self, market, dates, values):
+        """(Re)build one market's table from its observations."""
+        zones = classify(values)
+        start, end, zone, days = run_lengths(dates, zones)
+        self.markets[market] = {'start': start, 'end': end, 'zone': zone, 'days': days,
+                                'years': year_counts(dates, zones)}
+
+    def extend(self, market, dates, values, since):
+        """
+        Re-encode one market from the interval containing `since` on. `dates`/`values` must
+        reach back at least to the start of that interval's year; earlier runs are kept.
+        """
+        entry = self.markets[market]
+        keep = max(int(np.searchsorted(entry['start'], np.datetime64(since, 'D'), side='right')) - 1, 0)
+        resume = entry['start'][keep] if len(entry['start']) else np.datetime64(since, 'D')
+        mask = dates >= resume
+        start, end, zone, days = run_lengths(dates[mask], classify(values[mask]))
+        entry['start'] = np.concatenate([entry['start'][:keep], start])
+        entry['end'] = np.concatenate([entry['end'][:keep], end])
+        entry['zone'] = np.concatenate([entry['zone'][:keep], zone])
+        entry['days'] = np.concatenate([entry['days'][:keep], days])
+
+        # Recount every year from the resumed interval's year on
+        first_year = resume.astype('datetime64[Y]')
+        entry['years'] = {y: c for y, c in entry['years'].items() if int(y) < int(str(first_year))}
+        recount = dates >= first_year.astype('datetime64[D]')
+        entry['years'].update(year_counts(dates[recount], classify(values[recount])))
+
+    # O(1) queries
+
+    def current(self, market):
+        """(zone, trading days in the current streak, streak start date) or None."""
+        entry = self.markets.get(market)
+        if entry is None or not len(entry['zone']):
+            return None
+        return int(entry['zone'][-1]), int(entry['days'][-1]), str(entry['start'][-1])
+
+    def days_in_zone(self, market, zone, year):
+        """Trading days `market` spent in `zone` during `year`."""
+        return self.markets[market]['years'].get(str(year), [0] * len(zone_names))[zone]
+
+    def days_at_or_above(self, market, level, year):
+        """Trading days at or above band `level` (15, 20 or 30) during `year`."""
+        counts = self.markets[market]['years'].get(str(year), [0] * len(zone_names))
+        return sum(counts[self.bands.index(level) + 1:])
+
+    # Range queries (binary search)
+
+    def zone_at(self, market, date):
+        """Zone of the interval covering `date` (None if before the data)."""
+        entry = self.markets[market]
+        i = int(np.searchsorted(entry['start'], np.datetime64(date, 'D'), side='right')) - 1
+        return None if i < 0 else int(entry['zone'][i])
+
+    def intervals(self, market, start=None, end=None):
+        """[(start, end, zone)] of the intervals overlapping [start, end], as datetime64[D]."""
+        entry = self.markets.get(market)
+        if entry is None:
+            return []
+        lo, hi = 0, len(entry['start'])
+        if start is not None:
+            lo = int(np.searchsorted(entry['end'], np.datetime64(start, 'D'), side='left'))
+        if end is not None:
+            hi = int(np.searchsorted(entry['start'], np.datetime64(end, 'D'), side='right'))
+        return list(zip(entry['start'][lo:hi], entry['end'][lo:hi], entry['zone'][lo:hi].tolist()))
+
+
+def _observations(df, market):
+    series = df[market].dropna()
+    return series.index.values.astype('datetime64[D]'), series.to_numpy(dtype=np.float64)
+
+
+@vix_metrics.instrument('regimes')
+def update(df, path=regimes_file, full=False):
+    """Build or extend the regime index for every market in the merged frame `df`."""
+    index = RegimeIndex() if full else RegimeIndex.load(path)
+    if index.bands != list(bands):
+        index = RegimeIndex()
+
+    for market in df.columns:
+        dates, values = _observations(df, market)
+        entry = index.markets.get(market)
+        if entry is None or not len(entry['end']):
+            index.build(market, dates, values)
+            print(f"  {market}: built {len(index.markets[market]['zone'])} intervals")
+            continue
+        last = entry['end'][-1]
+        since = last - np.timedelta64(overlap_days, 'D')
+        new = dates[dates > last]
+        if len(new):
+            since = min(since, new[0])
+        before = len(entry['zone'])
+        index.extend(market, dates, values, since)
+        print(f"  {market}: extended from {since}, {len(index.markets[market]['zone']) - before:+d} intervals")
+
+    df = df.sort_index()
+    index.fingerprint = vix_store.fingerprint(df.index.values, {col: df[col].to_numpy() for col in df.columns})
+    index.save(path)
+    return index
+
+
+def load(path=regimes_file):
+    return RegimeIndex.load(path)
+
+
+def regime_intervals(df, market, start=None, end=None, path=regimes_file, source=None):
+    """
+    Regime intervals of `market` overlapping [start, end] for chart shading. The stored
+    index is used when `source`, the fingerprint of the full data `df` was cut from
+    (VixStore.fingerprint), is the one it was built from; otherwise the intervals are
+    encoded in memory from `df` itself.
+    """
+    if market not in df.columns:
+        return []
+    dates, values = _observations(df, market)
+    index = load(path) if source is not None else RegimeIndex()
+    entry = index.markets.get(market)
+    if entry is None or index.bands != list(bands) or index.fingerprint != source:
+        index = RegimeIndex()
+        index.build(market, dates, values)
+    return index.intervals(market, start, end)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'show'
+    if command in ('update', 'rebuild'):
+        update(vix_columnar.load_merged(), full=command == 'rebuild')
+    elif command == 'show':
+        index = load()
+        for market in index.markets:
+            zone, days, since = index.current(market)
+            last_year = str(index.markets[market]['end'][-1])[:4]
+            print(f"  {market:<12} {zone_names[zone]:<15} {days:4d} trading days since {since}; "
+                  f"{last_year}: {index.days_at_or_above(market, 30, last_year)} days >= 30")
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,188 @@
+"""
+Weekly and monthly rollups of the merged VIX dataset.
+
+For every market M and period the rollup stores M_open, M_high (the period max),
+M_low, M_close and M_mean. Periods are labelled by their first calendar day (weeks
+start on Monday). Each level is a columnar store in the main store's format:
+
+    global_vix_rollups/weekly/    ... one row per week
+    global_vix_rollups/monthly/   ... one row per month
+    global_vix_rollups/state.json    last daily date rolled up, the market columns and the
+                                     fingerprint of the daily data rolled up
+
+`update` recomputes only the periods touched since the last run: from the period that
+contains the first new date, reaching back `overlap_days` for revised rows (as the
+collectors re-fetch). A daily run therefore rewrites one week and one month.
+
+`select_level` / `plot_frame` let the visualizers pick the coarsest level that still
+gives enough points for a window, so long-range charts draw a roughly constant
+number of points however long the history gets. The stored level is used only for
+data whose fingerprint (vix_store.fingerprint) matches the one recorded. Any other
+frame is rolled up in memory.
+
+Usage:
+    python vix_rollups.py update     # roll up new days from the store
+    python vix_rollups.py rebuild    # recompute every period
+"""
+import json
+import os
+import sys
+
+import pandas as pd
+
+import vix_columnar
+import vix_metrics
+import vix_store
+
+# Configuration
+rollup_dir = "global_vix_rollups"
+state_file = "state.json"
+overlap_days = 7  # Matches the collectors' re-fetch window, so revised days are re-rolled
+fields = ['open', 'high', 'low', 'close', 'mean']
+levels = {
+    'weekly': 'W-SUN',  # Weeks Monday..Sunday
+    'monthly': 'M',
+}
+# Longest window (days) each level is used for; longer windows go to the next level
+level_max_span_days = {
+    'daily': 3 * 366,
+    'weekly': 15 * 366,
+    'monthly': None,
+}
+plot_field = 'close'
+
+
+def period_start(index, level):
+    """First calendar day of the period each date falls in."""
+    return index.to_period(levels[level]).start_time
+
+
+def rollup(df, level):
+    """Vectorized rollup of a Date-indexed frame to one level; one row per period with data."""
+    keys = period_start(df.index, level)
+    grouped = df.groupby(keys)
+    parts = {
+        'open': grouped.first(),
+        'high': grouped.max(),
+        'low': grouped.min(),
+        'close': grouped.last(),
+        'mean': grouped.mean(),
+    }
+    out = pd.concat({field: parts[field] for field in fields}, axis=1)
+    # ('open', 'US_VIX') -> 'US_VIX_open', grouped by market
+    out.columns = [f"{col}_{field}" for field, col in out.columns]
+    out = out[[f"{col}_{field}" for col in df.columns for field in fields]]
+    out.index.name = vix_columnar.date_column
+    return out
+
+
+def level_dir(level, directory=rollup_dir):
+    return os.path.join(directory, level)
+
+
+def read_state(directory=rollup_dir):
+    path = os.path.join(directory, state_file)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@vix_metrics.instrument('rollups')
+def update(df, directory=rollup_dir, full=False):
+    """Bring every rollup level up to date with the merged frame `df`. Returns rows written per level."""
+    df = df.sort_index()
+    if df.empty:
+        print("  No data to roll up.")
+        return {}
+
+    state = None if full else read_state(directory)
+    if state is not None and (state['columns'] != list(df.columns)
+                              or not all(vix_columnar.store_exists(level_dir(lv, directory)) for lv in levels)):
+        state = None
+
+    since = None
+    if state is not None:
+        last = pd.Timestamp(state['last'])
+        since = last - pd.Timedelta(days=overlap_days)
+        new = df.index[df.index > last]
+        if len(new):
+            since = min(since, new[0])
+
+    written = {}
+    for level in levels:
+        if since is None:
+            rows = rollup(df, level)
+            vix_columnar.write_store(rows, level_dir(level, directory))
+        else:
+            first_period = period_start(pd.DatetimeIndex([since]), level)[0]
+            rows = rollup(df.loc[first_period:], level)
+            vix_columnar.append_rows(rows, level_dir(level, directory))
+        written[level] = len(rows)
+
+    action = "Rebuilt" if since is None else f"Updated from {since:%Y-%m-%d}:"
+    print(f"  {action} " + ", ".join(f"{level} {n} rows" for level, n in written.items()))
+    vix_columnar._write_json(os.path.join(directory, state_file),
+                             {'columns': list(df.columns), 'last': df.index[-1].strftime('%Y-%m-%d'),
+                              'fingerprint': vix_store.fingerprint(df.index.values,
+                                                                   {col: df[col].to_numpy() for col in df.columns})})
+    return written
+
+
+def select_level(start, end):
+    """Coarsest-needed level for a date window: 'daily', 'weekly' or 'monthly'."""
+    span = (pd.Timestamp(end) - pd.Timestamp(start)).days
+    for level, max_span in level_max_span_days.items():
+        if max_span is None or span <= max_span:
+            return level
+    return 'daily'
+
+
+def load_level(level, columns=None, start=None, end=None, field=plot_field, directory=rollup_dir):
+    """
+    One field of a rollup level as a frame shaped like the daily data ({market: values}).
+    Returns an empty frame if the level has not been built.
+    """
+    path = level_dir(level, directory)
+    if not vix_columnar.store_exists(path):
+        return pd.DataFrame()
+    suffix = f"_{field}"
+    markets = [c[:-len(suffix)] for c in vix_columnar.store_columns(path) if c.endswith(suffix)]
+    if columns is not None:
+        markets = [m for m in markets if m in columns]
+    df = vix_columnar.read_store(path, [m + suffix for m in markets], start, end)
+    df.columns = markets
+    return df
+
+
+def plot_frame(df, start, end, field=plot_field, directory=rollup_dir, source=None):
+    """
+    The data a chart of [start, end] should draw: the daily rows for short windows,
+    otherwise the rollup level for the window. The stored level is read only when
+    `source`, the fingerprint of the full data `df` was cut from (VixStore.fingerprint),
+    matches the data the store was rolled up from, and the store has every market of
+    `df`. Otherwise `df` is rolled up in memory.
+    """
+    level = select_level(start, end)
+    window = df.loc[start:end]
+    if level == 'daily' or window.empty:
+        return window, level
+
+    state = read_state(directory) if source is not None else None
+    if (state is not None and state.get('fingerprint') == source
+            and all(col in state['columns'] for col in window.columns)):
+        stored = load_level(level, list(df.columns), start, end, field, directory)
+        if not stored.empty:
+            return stored[list(window.columns)], level
+    rolled = rollup(window, level)
+    rolled = rolled[[f"{col}_{field}" for col in window.columns]]
+    rolled.columns = list(window.columns)
+    return rolled, level
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'update'
+    if command not in ('update', 'rebuild'):
+        print(__doc__)
+        sys.exit(1)
+    update(vix_columnar.load_merged(), full=command == 'rebuild')
@@ -0,0 +1,349 @@
+"""
+Local HTTP service for the VIX data (asyncio, standard library only).
+
+The columnar store, the rollups and the regime index are loaded into memory once, as
+VixStore / RegimeIndex objects. Every request is then answered from memory:
+
+    GET /health                                   load time, data version, last date
+    GET /latest[/<market>]                        latest value per market
+    GET /asof?date=YYYY-MM-DD[&markets=us,tw]     values on a date, forward-filled over holidays
+    GET /range?start=&end=[&markets=]             daily values for a date range
+    GET /rollups/<weekly|monthly>?start=&end=[&markets=][&field=close]
+    GET /regimes[/<market>][?year=YYYY]           current zone and streak, zone-day counts
+
+Markets accept the vix_now aliases (us, japan, taiwan, ...). Responses are JSON, with an
+ETag (a hash of the body) and `Cache-Control: no-cache`. A request carrying a matching
+If-None-Match gets a 304 with no body. Encoded responses are cached per URL until the data
+changes. A watcher polls the data files every `reload_interval` seconds. When the
+collector has written new data, it reloads everything off the event loop and drops the
+response cache.
+
+Usage:
+    python vix_service.py [--host 127.0.0.1] [--port 8750] [--store DIR] [--reload-interval 5]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import vix_columnar
+import vix_regimes
+import vix_rollups
+from vix_now import resolve_market
+from vix_store import VixStore
+
+# Configuration
+default_host = "127.0.0.1"
+default_port = 8750
+reload_interval = 5.0  # Seconds between data-file checks
+keepalive_timeout = 15.0
+max_header_bytes = 16 * 1024
+max_cached_responses = 1024
+
+reasons = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _number(value):
+    return None if value is None or math.isnan(value) else round(float(value), vix_columnar.canonical_decimals)
+
+
+def _entry(latest):
+    return None if latest is None else {'date': str(latest[0]), 'value': _number(latest[1])}
+
+
+class VixService:
+    """In-memory VIX data plus request routing, ETags and hot reload."""
+
+    def __init__(self, store_dir=vix_columnar.store_dir, rollup_dir=vix_rollups.rollup_dir,
+                 regimes_file=vix_regimes.regimes_file, fallback_csv=vix_columnar.csv_file):
+        self.store_dir = store_dir
+        self.rollup_dir = rollup_dir
+        self.regimes_file = regimes_file
+        self.fallback_csv = fallback_csv
+        self.store = None
+        self.rollups = {}
+        self.regimes = None
+        self.version = None
+        self.loaded_at = None
+        self.reloads = 0
+        self._signature = None
+        self._cache = {}
+
+    # Loading and hot reload
+
+    def _watched_files(self):
+        files = [os.path.join(self.store_dir, 'meta.json'), self.fallback_csv, self.regimes_file]
+        files += [os.path.join(self.rollup_dir, level, 'meta.json') for level in vix_rollups.levels]
+        return files
+
+    def signature(self):
+        """(path, mtime_ns, size) of every data file the service serves; changes when data is written."""
+        sig = []
+        for path in self._watched_files():
+            try:
+                st = os.stat(path)
+                sig.append((path, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                sig.append((path, None, None))
+        return tuple(sig)
+
+    def load(self):
+        """(Re)load every dataset into memory and invalidate cached responses."""
+        signature = self.signature()
+        store = VixStore.load(directory=self.store_dir, fallback_csv=self.fallback_csv)
+        rollups = {}
+        for level in vix_rollups.levels:
+            path = vix_rollups.level_dir(level, self.rollup_dir)
+            if vix_columnar.store_exists(path):
+                rollups[level] = VixStore(*vix_columnar.read_arrays(path))
+        regimes = vix_regimes.RegimeIndex.load(self.regimes_file)
+
+        # Swap everything at once so a request never sees a half-loaded state
+        self.store, self.rollups, self.regimes = store, rollups, regimes
+        self._signature = signature
+        self.version = hashlib.sha1(repr(signature).encode('utf-8')).hexdigest()[:12]
+        self.loaded_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self._cache = {}
+        self.reloads += 1
+        print(f"  Loaded {len(store)} rows x {len(store.names)} markets, "
+              f"rollups {sorted(rollups)}, regimes {sorted(regimes.markets)} (version {self.version})")
+
+    def changed(self):
+        return self.signature() != self._signature
+
+    async def watch(self, interval=None):
+        """Poll the data files and reload (in a worker thread) when they change."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(reload_interval if interval is None else interval)
+            if self.changed():
+                try:
+                    await loop.run_in_executor(None, self.load)
+                except Exception as e:  # Half-written files: keep serving the old data, retry next tick
+                    print(f"  Reload failed, keeping version {self.version}: {e}")
+
+    # Routing
+
+    def _markets(self, query, available):
+        wanted = query.get('markets', [''])[0]
+        if not wanted:
+            return list(available)
+        markets = [resolve_market(m.strip()) for m in wanted.split(',') if m.strip()]
+        unknown = [m for m in markets if m not in available]
+        if unknown:
+            raise RequestError(404, f"Unknown market(s): {', '.join(unknown)}")
+        return markets
+
+    def _series(self, store, query, columns=None):
+        start, end = query.get('start', [None])[0], query.get('end', [None])[0]
+        try:
+            dates, values = store.window(start, end, columns)
+        except ValueError as e:
+            raise RequestError(400, f"Bad date: {e}")
+        return {'start': start, 'end': end, 'dates': [str(d) for d in dates],
+                'values': {col: [_number(v) for v in arr.tolist()] for col, arr in values.items()}}
+
+    def route(self, path, query):
+        """Return the JSON payload for a GET path; raises RequestError for 4xx."""
+        parts = [p for p in path.split('/') if p]
+        head = parts[0] if parts else 'health'
+        store = self.store
+
+        if head == 'health' and len(parts) <= 1:
+            return {'status': 'ok', 'version': self.version, 'loaded_at': self.loaded_at,
+                    'reloads': self.reloads, 'rows': len(store), 'markets': store.names,
+                    'first': str(store.first_date), 'last': str(store.last_date)}
+
+        if head == 'latest' and len(parts) <= 2:
+            markets = self._markets({'markets': [parts[1]]} if len(parts) == 2 else query, store.names)
+            return {m: _entry(store.latest(m)) for m in markets}
+
+        if head == 'asof' and len(parts) == 1:
+            date = query.get('date', [None])[0]
+            if not date:
+                raise RequestError(400, "Missing ?date=YYYY-MM-DD")
+            markets = self._markets(query, store.names)
+            try:
+                return {'date': date, 'values': {m: _entry(store.as_of(m, date)) for m in markets}}
+            except ValueError as e:
+                raise RequestError(400, f"Bad date: {e}")
+
+        if head == 'range' and len(parts) == 1:
+            return self._series(store, query, self._markets(query, store.names))
+
+        if head == 'rollups' and len(parts) == 2:
+            level = self.rollups.get(parts[1])
+            if level is None:
+                raise RequestError(404, f"No rollup level {parts[1]!r} (have: {', '.join(sorted(self.rollups))})")
+            field = query.get('field', [vix_rollups.plot_field])[0]
+            if field not in vix_rollups.fields and field != 'all':
+                raise RequestError(400, f"Unknown field {field!r}")
+            markets = self._markets(query, list(dict.fromkeys(c.rsplit('_', 1)[0] for c in level.names)))
+            columns = [f"{m}_{f}" for m in markets for f in (vix_rollups.fields if field == 'all' else [field])]
+            return dict(self._series(level, query, columns), level=parts[1], field=field)
+
+        if head == 'regimes' and len(parts) <= 2:
+            regimes = self.regimes
+            markets = self._markets({'markets': [parts[1]]} if len(parts) == 2 else query, regimes.markets)
+            year = query.get('year', [None])[0]
+            out = {}
+            for m in markets:
+                current = regimes.current(m)
+                entry = {'zones': vix_regimes.zone_names, 'bands': regimes.bands}
+                if current is not None:
+                    zone, days, since = current
+                    entry['current'] = {'zone': vix_regimes.zone_names[zone], 'days': days, 'since': since}
+                if year:
+                    entry['year'] = year
+                    entry['days_in_zone'] = [regimes.days_in_zone(m, z, year) for z in range(len(vix_regimes.zone_names))]
+                    entry['days_at_or_above'] = {str(b): regimes.days_at_or_above(m, b, year) for b in regimes.bands}
+                else:
+                    entry['years'] = regimes.markets[m]['years']
+                out[m] = entry
+            return out
+
+        raise RequestError(404, f"No route for /{'/'.join(parts)}")
+
+    # HTTP
+
+    def respond(self, method, target, headers):
+        """(status, headers, body) for a request; GET/HEAD only, with ETag revalidation (HEAD drops the body on write)."""
+        if method not in ('GET', 'HEAD'):
+            return self._json(405, {'error': f"Method {method} not allowed"}, extra={'Allow': 'GET, HEAD'})
+
+        cached = self._cache.get(target)
+        if cached is None:
+            url = urlsplit(target)
+            try:
+                cached = self._json(200, self.route(url.path, parse_qs(url.query)))
+            except RequestError as e:
+                return self._json(e.status, {'error': str(e)})
+            if len(self._cache) >= max_cached_responses:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[target] = cached
+
+        status, response_headers, body = cached
+        if headers.get('if-none-match') in (response_headers['ETag'], '*'):
+            return 304, {k: v for k, v in response_headers.items() if k != 'Content-Type'}, b''
+        return status, response_headers, body
+
+    def _json(self, status, payload, extra=None):
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        headers = {'Content-Type': 'application/json; charset=utf-8',
+                   'ETag': '"' + hashlib.sha1(body).hexdigest()[:20] + '"',
+                   'Cache-Control': 'no-cache',
+                   'X-Data-Version': self.version or ''}
+        headers.update(extra or {})
+        return status, headers, body
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection (keep-alive)."""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), keepalive_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, *self._json(400, {'error': 'Headers too large'}), close=True)
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    await self._write(writer, *self._json(400, {'error': 'Bad request line'}), close=True)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self._write(writer, *self._json(400, {'error': 'Bad Content-Length'}), close=True)
+                    break
+                if length:
+                    try:
+                        await reader.readexactly(length)  # Ignored: GET/HEAD only
+                    except (asyncio.IncompleteReadError, ConnectionError):
+                        break
+
+                close = (headers.get('connection', '').lower() == 'close'
+                         or (version == 'HTTP/1.0' and headers.get('connection', '').lower() != 'keep-alive'))
+                try:
+                    status, response_headers, body = self.respond(method, target, headers)
+                except Exception as e:
+                    status, response_headers, body = self._json(500, {'error': f"{type(e).__name__}: {e}"})
+                await self._write(writer, status, response_headers, body, close=close, head=method == 'HEAD')
+                if close:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _write(self, writer, status, headers, body, close=False, head=False):
+        lines = [f"HTTP/1.1 {status} {reasons.get(status, '')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        if status != 304:
+            lines.append(f"Content-Length: {len(body)}")
+        lines.append(f"Connection: {'close' if close else 'keep-alive'}")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (b'' if head else body))
+        await writer.drain()
+
+    async def start(self, host=default_host, port=default_port, watch=True):
+        """Load the data, start listening and (optionally) the reload watcher. Returns the server."""
+        if self.store is None:
+            self.load()
+        server = await asyncio.start_server(self.handle, host, port, limit=max_header_bytes)
+        self._watcher = asyncio.ensure_future(self.watch()) if watch else None
+        return server
+
+
+async def serve(host=default_host, port=default_port, **kwargs):
+    service = VixService(**kwargs)
+    server = await service.start(host, port)
+    bound = server.sockets[0].getsockname()
+    print(f"Serving VIX data on http://{bound[0]}:{bound[1]}/ (reload check every {reload_interval:g}s)")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    global reload_interval
+    parser = argparse.ArgumentParser(description="Serve the VIX data over local HTTP.")
+    parser.add_argument('--host', default=default_host)
+    parser.add_argument('--port', type=int, default=default_port)
+    parser.add_argument('--store', default=vix_columnar.store_dir, help="Columnar store directory")
+    parser.add_argument('--rollups', default=vix_rollups.rollup_dir, help="Rollups directory")
+    parser.add_argument('--regimes', default=vix_regimes.regimes_file, help="Regime index file")
+    parser.add_argument('--reload-interval', type=float, default=reload_interval)
+    args = parser.parse_args(argv)
+    reload_interval = args.reload_interval
+    try:
+        asyncio.run(serve(args.host, args.port, store_dir=args.store, rollup_dir=args.rollups,
+                          regimes_file=args.regimes))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,195 @@
+"""
+Pluggable market sources and a concurrent collector.
+
+A source produces one market column. It has three hooks:
+
+    watermark(history_df)             last stored date of its column (where collection resumes)
+    fetch(start, end, workers)        the raw payload: network or file I/O only
+    parse(raw, start, end)            raw payload -> Date-indexed frame with the one column
+
+plus an optional `fallback(start, end)` used when fetch/parse fail or return nothing.
+`decimals` is the precision the source quotes. Collected values are rounded to it,
+and the store keeps the column at that precision (see vix_columnar).
+Register a source once and the collector picks it up, with no change to
+collect_vix_data.main:
+
+    class VStoxxSource(vix_sources.Source):
+        column = 'VSTOXX'
+        description = 'VSTOXX (STOXX)'
+        timeout = 120
+
+        def fetch(self, start_date, end_date, workers=None): ...
+        def parse(self, raw, start_date, end_date): ...
+
+    vix_sources.register(VStoxxSource())
+
+collect_vix_data registers US, Japan and Taiwan. Other modules listed in
+`source_modules` are imported by `load_sources()` so they can register theirs.
+
+`run_all` runs every source in its own daemon thread. Each source has its own timeout,
+and one source failing or timing out leaves the others' results intact. End-to-end time
+is therefore that of the slowest source, not the sum. A timed-out source is abandoned:
+run_all returns without it, its thread cannot keep the process alive at exit, and its
+vix_http requests are cut short to its deadline (`vix_http.deadline`). Each source's progress output
+is buffered and printed as one block when it finishes, so concurrent logs don't
+interleave.
+"""
+import contextvars
+import importlib
+import io
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+import vix_http
+import vix_metrics
+
+# Configuration
+default_timeout = 300  # Seconds a source may take before its result is abandoned
+source_modules = []  # Extra modules that register sources when imported, e.g. ['vix_source_vstoxx']
+
+registry = {}
+
+
+class Source:
+    """One market column: fetch a raw payload, parse it, resume from a watermark."""
+
+    column = None
+    description = None
+    timeout = default_timeout
+    decimals = 2  # Volatility indices are published to two decimals
+
+    def watermark(self, history_df):
+        """Last date with a value for this column in the stored history, or None."""
+        if self.column not in history_df.columns:
+            return None
+        series = history_df[self.column].dropna()
+        return None if series.empty else series.index[-1]
+
+    def fetch(self, start_date, end_date, workers=None):
+        raise NotImplementedError
+
+    def parse(self, raw, start_date, end_date):
+        return raw
+
+    def fallback(self, start_date, end_date):
+        return pd.DataFrame()
+
+    def collect(self, start_date, end_date, workers=None):
+        """fetch + parse, falling back (with the error printed) when they fail or find nothing."""
+        print(f"Collecting {self.description or self.column}...")
+        try:
+            df = self.parse(self.fetch(start_date, end_date, workers=workers), start_date, end_date)
+        except Exception as e:
+            print(f"  Error collecting {self.column}: {e}")
+            df = None
+        if df is None or df.empty:
+            df = self.fallback(start_date, end_date)
+        # Drop float noise (e.g. yfinance's float32 closes) down to the published precision
+        return pd.DataFrame() if df is None else df.round(self.decimals)
+
+
+def register(source):
+    """Add (or replace) the source for `source.column`. Returns the source."""
+    registry[source.column] = source
+    return source
+
+
+def decimals():
+    """{column: decimals} of every registered source, for the store's column precision."""
+    return {column: source.decimals for column, source in registry.items()}
+
+
+def load_sources():
+    """Import `source_modules` so their sources register; returns the registered sources in order."""
+    for name in source_modules:
+        importlib.import_module(name)
+    return list(registry.values())
+
+
+# Per-source output capture: writes from a source's thread (and the worker threads it
+# starts through vix_http, which copy its context) go to that source's buffer.
+_buffer = contextvars.ContextVar('vix_sources_buffer', default=None)
+
+
+class _RoutedOutput(io.TextIOBase):
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        buffer = _buffer.get()
+        return (self.stream if buffer is None else buffer).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+@contextmanager
+def _routed_stdout():
+    stdout = sys.stdout
+    sys.stdout = _RoutedOutput(stdout)
+    try:
+        yield
+    finally:
+        sys.stdout = stdout
+
+
+def _run(source, start_date, end_date, workers, buffer, results):
+    """Thread body: collect one source and post (column, frame, error) to `results`."""
+    _buffer.set(buffer)
+    vix_http.deadline.set(time.monotonic() + source.timeout)
+    try:
+        with vix_metrics.stage('collect', source=source.column):
+            frame = source.collect(start_date, end_date, workers=workers)
+    except Exception as e:
+        results.put((source.column, None, e))
+    else:
+        results.put((source.column, frame, None))
+
+
+def run_all(jobs, end_date, workers=None):
+    """
+    Collect every (source, start_date) job concurrently. Returns {column: frame} in job
+    order; a source that raised or exceeded its timeout contributes an empty frame.
+    """
+    frames = {source.column: pd.DataFrame() for source, _ in jobs}
+    if not jobs:
+        return frames
+
+    results = queue.Queue()
+    started = time.monotonic()
+    pending = {}
+    with _routed_stdout():
+        for source, start_date in jobs:
+            buffer = io.StringIO()
+            pending[source.column] = (source, buffer)
+            # Daemon threads: a timed-out source is abandoned, and can't hold up interpreter exit
+            threading.Thread(target=contextvars.copy_context().run, name=f'vix-source-{source.column}',
+                             args=(_run, source, start_date, end_date, workers, buffer, results),
+                             daemon=True).start()
+
+        while pending:
+            deadline = min(started + source.timeout for source, _ in pending.values())
+            try:
+                column, frame, error = results.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                column = None
+            if column in pending:
+                source, buffer = pending.pop(column)
+                print(buffer.getvalue(), end='')
+                elapsed = time.monotonic() - started
+                if error is None:
+                    frames[column] = frame
+                    print(f"  [{column}: {len(frame)} rows in {elapsed:.2f}s]")
+                else:
+                    print(f"  [{column}: failed after {elapsed:.2f}s: {type(error).__name__}: {error}]")
+            for column, (source, buffer) in list(pending.items()):
+                if time.monotonic() >= started + source.timeout:
+                    del pending[column]
+                    print(buffer.getvalue(), end='')
+                    print(f"  [{column}: timed out after {source.timeout}s, skipped this run]")
+    return frames
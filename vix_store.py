@@ -0,0 +1,200 @@
+"""
+In-memory query API over the merged VIX dataset.
+
+`VixStore` holds the data as one sorted datetime64[D] array plus a float array per
+market (float32, as stored by vix_columnar), and precomputes what every consumer used
+to rebuild from a DataFrame:
+
+    window(start, end) / frame()   bisect range slicing (O(log n), views, no copies)
+    latest(col)                    last valid value, from a precomputed index (O(1))
+    as_of(col, date)               value on a date, forward-filled across that market's
+                                   holidays (bisect + precomputed last-valid-at index)
+    max(start, end) / min(...)     range max/min from sparse tables (O(1) after the bisect)
+    running_max(col) / running_min cumulative max/min, NaN-skipping (computed once per column)
+    fingerprint()                  content hash, to check derived data (rollups, regimes) was built from it
+
+    store = VixStore.load()                    # columnar store, or the CSV export
+    store = VixStore.from_frame(merged_df)     # from an in-memory merged frame
+    store = as_store(store_or_frame)           # what the renderers accept
+"""
+import hashlib
+import json
+
+import numpy as np
+
+import vix_columnar
+
+
+def as_store(data):
+    """Accept a VixStore or a merged DataFrame; return a VixStore."""
+    return data if isinstance(data, VixStore) else VixStore.from_frame(data)
+
+
+def _values(values):
+    """Column values as a float array, keeping a compact float32 dtype."""
+    values = np.asarray(values)
+    return values.astype(np.result_type(values.dtype, np.float32), copy=False)
+
+
+def fingerprint(dates, columns):
+    """
+    Content hash of dated columns ({name: values}, dates sorted). It doesn't depend on the
+    date unit or float width, so a merged frame and the store read back hash the same.
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps([str(name) for name in columns]).encode('utf-8'))
+    h.update(np.asarray(dates).astype('datetime64[D]').astype(np.int64).tobytes())
+    for values in columns.values():
+        h.update(np.asarray(values, dtype=np.float32).tobytes())
+    return h.hexdigest()
+
+
+def _sparse_table(values, op):
+    """levels[k][i] = op over values[i : i + 2**k] (NaNs ignored)."""
+    levels = [values]
+    k = 1
+    while 2 * k <= len(values):
+        prev = levels[-1]
+        levels.append(op(prev[:-k], prev[k:]))
+        k *= 2
+    return levels
+
+
+def _last_valid_at(values):
+    """For every row, the index of the last non-NaN value at or before it (-1 if none)."""
+    idx = np.where(np.isnan(values), -1, np.arange(len(values)))
+    return np.maximum.accumulate(idx) if len(idx) else idx
+
+
+class VixStore:
+    """Sorted, array-backed columns of the merged VIX data with precomputed lookups."""
+
+    def __init__(self, dates, columns):
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        if len(dates) > 1 and not (dates[1:] >= dates[:-1]).all():
+            order = np.argsort(dates, kind='stable')
+            dates = dates[order]
+            columns = {name: _values(values)[order] for name, values in columns.items()}
+        # Already sorted (the columnar store, a chart snapshot): keep the arrays as given, so
+        # memory-mapped columns stay shared views instead of private copies
+        self.dates = dates
+        self.columns = {str(name): _values(values) for name, values in columns.items()}
+        self._valid_at = {name: _last_valid_at(v) for name, v in self.columns.items()}
+        self._fingerprint = None
+        self._running = {}
+        self._max = {name: _sparse_table(v, np.fmax) for name, v in self.columns.items()}
+        self._min = {name: _sparse_table(v, np.fmin) for name, v in self.columns.items()}
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from a Date-indexed merged DataFrame."""
+        return cls(df.index.values.astype('datetime64[D]'),
+                   {col: df[col].to_numpy() for col in df.columns})
+
+    @classmethod
+    def load(cls, columns=None, start=None, end=None, directory=vix_columnar.store_dir,
+             fallback_csv=vix_columnar.csv_file):
+        """Load from the columnar store (no pandas import), falling back to the CSV export."""
+        if vix_columnar.store_exists(directory):
+            dates, values = vix_columnar.read_arrays(directory, columns, start, end)
+            return cls(dates, values)
+        return cls.from_frame(vix_columnar.load_merged(columns, start, end, directory, fallback_csv))
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def names(self):
+        return list(self.columns)
+
+    @property
+    def empty(self):
+        return len(self.dates) == 0
+
+    @property
+    def first_date(self):
+        return self.dates[0] if len(self.dates) else None
+
+    @property
+    def last_date(self):
+        return self.dates[-1] if len(self.dates) else None
+
+    # Range slicing
+
+    def bounds(self, start=None, end=None):
+        """Row range [lo, hi) of the inclusive date window, by bisection."""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(start, 'D'), side='left'))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(end, 'D'), side='right'))
+        return lo, max(lo, hi)
+
+    def window(self, start=None, end=None, columns=None):
+        """(dates, {column: values}) views for the inclusive date window."""
+        lo, hi = self.bounds(start, end)
+        names = self.names if columns is None else [c for c in columns if c in self.columns]
+        return self.dates[lo:hi], {name: self.columns[name][lo:hi] for name in names}
+
+    def frame(self, start=None, end=None, columns=None):
+        """The window as a Date-indexed DataFrame (for plotting and pandas consumers)."""
+        import pandas as pd
+
+        dates, values = self.window(start, end, columns)
+        index = pd.DatetimeIndex(dates.astype('datetime64[ns]'), name=vix_columnar.date_column)
+        return pd.DataFrame(values, index=index)
+
+    def fingerprint(self):
+        """Content hash of the whole store (see `fingerprint`), computed once."""
+        if self._fingerprint is None:
+            self._fingerprint = fingerprint(self.dates, self.columns)
+        return self._fingerprint
+
+    # Point lookups
+
+    def latest(self, column):
+        """(date, value) of the column's last valid value, or None."""
+        if column not in self.columns or not len(self.dates):
+            return None
+        i = int(self._valid_at[column][-1])
+        return None if i < 0 else (self.dates[i], float(self.columns[column][i]))
+
+    def as_of(self, column, date):
+        """(date, value) on `date`, forward-filled from the market's last trading day before it."""
+        if column not in self.columns:
+            return None
+        i = int(np.searchsorted(self.dates, np.datetime64(date, 'D'), side='right')) - 1
+        if i < 0:
+            return None
+        j = int(self._valid_at[column][i])
+        return None if j < 0 else (self.dates[j], float(self.columns[column][j]))
+
+    # Range aggregates
+
+    def _range(self, tables, column, lo, hi, op):
+        if hi <= lo:
+            return np.nan
+        levels = tables[column]
+        k = (hi - lo).bit_length() - 1
+        return float(op(levels[k][lo], levels[k][hi - (1 << k)]))
+
+    def max(self, start=None, end=None, columns=None):
+        """Max over the window and columns, NaNs ignored (NaN if there is no data)."""
+        lo, hi = self.bounds(start, end)
+        names = self.names if columns is None else [c for c in columns if c in self.columns]
+        return float(np.fmax.reduce([self._range(self._max, c, lo, hi, np.fmax) for c in names] or [np.nan]))
+
+    def min(self, start=None, end=None, columns=None):
+        """Min over the window and columns, NaNs ignored (NaN if there is no data)."""
+        lo, hi = self.bounds(start, end)
+        names = self.names if columns is None else [c for c in columns if c in self.columns]
+        return float(np.fmin.reduce([self._range(self._min, c, lo, hi, np.fmin) for c in names] or [np.nan]))
+
+    def _accumulate(self, op, column):
+        key = (op.__name__, column)
+        if key not in self._running:
+            self._running[key] = op.accumulate(self.columns[column])
+        return self._running[key]
+
+    def running_max(self, column):
+        return self._accumulate(np.fmax, column)
+
+    def running_min(self, column):
+        return self._accumulate(np.fmin, column)
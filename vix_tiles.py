@@ -0,0 +1,211 @@
+"""
+Per-year data tiles for the interactive chart.
+
+`write_tiles` exports the history as gzip-compressed JSON tiles, one per year and
+resolution level, plus an `index.json` describing them:
+
+    vix_tiles/index.json
+    vix_tiles/daily/2024.json.gz     every point
+    vix_tiles/weekly/2024.json.gz    LTTB-downsampled to ~52 points per year and series
+
+`loader_script` is the page-side half: given as plotly's `post_script`, it watches the
+x-axis range, picks the finest level whose span limit covers the window, fetches just
+the tiles for the years in view and splices them into the embedded overview traces.
+Tiles are only rewritten when their bytes change (gzip mtime is pinned), so a daily
+update touches the current year's tiles and nothing else.
+"""
+import gzip
+import json
+import os
+
+import numpy as np
+
+import vix_downsample
+
+# Configuration
+tiles_dir = "vix_tiles"
+index_file = "index.json"
+# Finest first; the page uses the first level whose max_span_days covers the visible window
+tile_levels = [
+    {'name': 'daily', 'points_per_year': None, 'max_span_days': 3 * 366},
+    {'name': 'weekly', 'points_per_year': 52, 'max_span_days': 15 * 366},
+]
+
+
+def epoch_ms(index):
+    """DatetimeIndex -> int64 milliseconds since the epoch (naive dates taken as UTC)."""
+    return index.values.astype('datetime64[ms]').astype(np.int64)
+
+
+def _encode(payload, compress=True):
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return gzip.compress(raw, compresslevel=9, mtime=0) if compress else raw
+
+
+def _write_if_changed(path, data):
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+
+def tile_payload(frame, level):
+    """One year of data at one level: {column: {'x': [epoch ms], 'y': [values]}}."""
+    columns = {}
+    for col in frame.columns:
+        series = frame[col].dropna()
+        if series.empty:
+            continue
+        x = epoch_ms(series.index)
+        y = series.to_numpy(dtype=np.float64)
+        if level['points_per_year']:
+            keep = vix_downsample.lttb_indices(x.astype(np.float64), y, level['points_per_year'])
+            x, y = x[keep], y[keep]
+        columns[col] = {'x': x.tolist(), 'y': [round(v, 4) for v in y.tolist()]}
+    return columns
+
+
+def write_tiles(df, directory=tiles_dir, levels=None):
+    """Write every (level, year) tile of df whose content changed. Returns the number written."""
+    levels = levels or tile_levels
+    df = df.sort_index()
+    years = sorted(set(int(y) for y in df.index.year))
+    written = 0
+    for year in years:
+        frame = df[df.index.year == year]
+        for level in levels:
+            payload = {'year': year, 'level': level['name'], 'columns': tile_payload(frame, level)}
+            path = os.path.join(directory, level['name'], f"{year}.json.gz")
+            written += _write_if_changed(path, _encode(payload))
+
+    index = {
+        'levels': levels,
+        'years': years,
+        'columns': list(df.columns),
+        'first': int(epoch_ms(df.index[:1])[0]) if len(df) else None,
+        'last': int(epoch_ms(df.index[-1:])[0]) if len(df) else None,
+    }
+    _write_if_changed(os.path.join(directory, index_file), _encode(index, compress=False))
+    print(f"  Tiles: {written} of {len(years) * len(levels)} written to {directory}/")
+    return written
+
+
+def read_tile(directory, level, year):
+    """Load one tile back (for inspection; the page fetches tiles itself)."""
+    with gzip.open(os.path.join(directory, level, f"{year}.json.gz"), 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def loader_script(tiles_url=tiles_dir):
+    """Page script (plotly post_script) that lazily swaps tiles into the traces on zoom/pan.
+
+    Data traces must carry their column name in `meta`; other traces are left alone. If the
+    tiles cannot be fetched (e.g. the page is opened from file://), the embedded overview stays.
+    """
+    return _loader_js.replace('__TILES_URL__', json.dumps(tiles_url.rstrip('/') + '/'))
+
+
+_loader_js = r"""
+(function () {
+  var gd = document.getElementById('{plot_id}');
+  var base = __TILES_URL__;
+  var dayMs = 86400000;
+  var tiles = {};
+  var shown = 'overview';
+  var overview, index, timer, tiled;
+
+  function decode(v) {
+    if (v && v.bdata) {
+      var bin = atob(v.bdata), bytes = new Uint8Array(bin.length);
+      for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+      return Array.from(v.dtype === 'f4' ? new Float32Array(bytes.buffer) : new Float64Array(bytes.buffer));
+    }
+    return Array.from(v || []);
+  }
+
+  function toMs(v) {
+    if (typeof v === 'number') return v;
+    var s = String(v);
+    if (s.length <= 10) s += ' 00:00';
+    return Date.parse(s.replace(' ', 'T') + 'Z');
+  }
+
+  function fetchJson(url) {
+    return fetch(url).then(function (r) {
+      if (!r.ok) throw new Error(url + ': ' + r.status);
+      return r.arrayBuffer();
+    }).then(function (buf) {
+      var head = new Uint8Array(buf, 0, 2);
+      if (head[0] === 0x1f && head[1] === 0x8b) {
+        var stream = new Blob([buf]).stream().pipeThrough(new DecompressionStream('gzip'));
+        return new Response(stream).json();
+      }
+      return JSON.parse(new TextDecoder().decode(buf));  // Server already decoded it
+    });
+  }
+
+  function tile(level, year) {
+    var key = level + '/' + year;
+    if (!tiles[key]) tiles[key] = fetchJson(base + key + '.json.gz');
+    return tiles[key];
+  }
+
+  function splice(level, years) {
+    return Promise.all(years.map(function (y) { return tile(level, y); })).then(function (loaded) {
+      var lo = Date.UTC(years[0], 0, 1), hi = Date.UTC(years[years.length - 1] + 1, 0, 1);
+      var xs = [], ys = [];
+      tiled.forEach(function (i, k) {
+        var trace = gd.data[i], ox = overview[k].x, oy = overview[k].y, x = [], y = [], j;
+        for (j = 0; j < ox.length && ox[j] < lo; j++) { x.push(ox[j]); y.push(oy[j]); }
+        loaded.forEach(function (t) {
+          var c = t.columns[trace.meta];
+          if (c) { x.push.apply(x, c.x); y.push.apply(y, c.y); }
+        });
+        for (j = 0; j < ox.length; j++) if (ox[j] >= hi) { x.push(ox[j]); y.push(oy[j]); }
+        xs.push(x); ys.push(y);
+      });
+      return Plotly.restyle(gd, {x: xs, y: ys}, tiled);
+    });
+  }
+
+  function update() {
+    var range = gd.layout.xaxis.range;
+    if (!range) return;
+    var t0 = toMs(range[0]), t1 = toMs(range[1]);
+    var span = (t1 - t0) / dayMs, level = null;
+    for (var i = 0; i < index.levels.length; i++) {
+      if (span <= index.levels[i].max_span_days) { level = index.levels[i].name; break; }
+    }
+    var years = [];
+    if (level) {
+      for (var y = new Date(t0).getUTCFullYear(); y <= new Date(t1).getUTCFullYear(); y++) {
+        if (index.years.indexOf(y) >= 0) years.push(y);
+      }
+    }
+    var key = level && years.length ? level + ':' + years.join(',') : 'overview';
+    if (key === shown) return;
+    shown = key;
+    if (key === 'overview') {
+      Plotly.restyle(gd, {x: overview.map(function (o) { return o.x; }), y: overview.map(function (o) { return o.y; })}, tiled);
+      return;
+    }
+    splice(level, years).catch(function (e) { shown = 'overview'; console.warn('VIX tiles:', e); });
+  }
+
+  if (!window.fetch || !window.DecompressionStream) return;
+  fetchJson(base + 'index.json').then(function (idx) {
+    index = idx;
+    // Only the data traces (those tagged with their column in `meta`) are tiled
+    tiled = gd.data.map(function (t, i) { return t.meta ? i : -1; }).filter(function (i) { return i >= 0; });
+    overview = tiled.map(function (i) { return {x: decode(gd.data[i].x).map(toMs), y: decode(gd.data[i].y)}; });
+    // The initial window is embedded at full resolution; tiles are only needed once it moves
+    gd.on('plotly_relayout', function () { clearTimeout(timer); timer = setTimeout(update, 150); });
+  }).catch(function (e) { console.info('VIX tiles unavailable, showing embedded overview:', e.message); });
+})();
+"""